@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.http import HttpResponseForbidden
+from django.utils.translation import gettext_lazy as _
 
 
 class ReadonlyMixin:
@@ -34,3 +35,292 @@ class ReadonlyMixin:
             return HttpResponseForbidden("Cannot save in readonly mode")
         
         return super().changeform_view(request, object_id, form_url, extra_context)
+
+
+class KeysetPaginationMixin:
+    """
+    Page the changelist with keyset cursors instead of OFFSET/COUNT(*).
+
+    ``keyset_ordering`` must be a unique ordering backed by an index, ending
+    with the primary key as tie-breaker, e.g. ``('-create_time', '-pk')``.
+    ``keyset_count`` is ``'estimate'`` to show an estimated total taken from
+    the database statistics (unfiltered lists only), or None to show no total.
+    A count strategy (CountStrategyMixin), when present, takes precedence.
+    """
+    keyset_ordering = None
+    keyset_count = 'estimate'
+
+    def get_changelist(self, request, **kwargs):
+        from .changelist import KeysetChangeList
+        return KeysetChangeList
+
+
+class CountStrategyMixin:
+    """
+    Count changelist rows through a pluggable strategy (see counts.py).
+
+    Set ``count_strategy`` to e.g. ``ApproximateCountStrategy()``: exact
+    counts below its threshold, database estimates above it, cached per
+    filter set. Works with the stock templates and with KeysetPaginationMixin.
+    """
+    count_strategy = None
+
+    def get_count_strategy(self, request):
+        return self.count_strategy
+
+    def get_changelist(self, request, **kwargs):
+        from .changelist import CountingChangeList
+        changelist = super().get_changelist(request, **kwargs)
+        # KeysetChangeList already counts through the strategy
+        return changelist if issubclass(changelist, CountingChangeList) else CountingChangeList
+
+
+class ColumnSelectionMixin:
+    """
+    Render only the columns the user picked in the column selector.
+
+    The selection is stored per user and per model (see columns.py), so
+    hidden columns are never queried, formatted or sent to the browser.
+    """
+
+    def get_available_list_display(self, request):
+        """All columns the user can choose from: the unfiltered list_display."""
+        return super().get_list_display(request)
+
+    def get_list_display(self, request):
+        from .columns import apply_column_preference
+        return apply_column_preference(request, self.model._meta, super().get_list_display(request))
+
+    def get_list_display_links(self, request, list_display):
+        list_display_links = super().get_list_display_links(request, list_display)
+        # Keep a link to the change form when the configured link columns are hidden
+        if list_display_links and not any(name in list_display for name in list_display_links):
+            from .columns import FIXED_COLUMNS
+            return [name for name in list_display if name not in FIXED_COLUMNS][:1]
+        return list_display_links
+
+    def get_list_select_related(self, request):
+        list_select_related = super().get_list_select_related(request)
+        if list_select_related is not False:
+            return list_select_related
+        # The stock select_related() skips nullable foreign keys: join the visible ones explicitly
+        from .metadata import get_metadata
+        return get_metadata(self).select_related(self.get_list_display(request)) or False
+
+
+class ReplicaReadsMixin:
+    """
+    Changelist GETs read from the read replica (see routers.py), unless the
+    user saved something within the sticky window. Actions and other POSTs
+    stay on the primary.
+    """
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method not in ('GET', 'HEAD'):
+            return super().changelist_view(request, extra_context)
+        from . import routers
+        with routers.replica_reads(request.user):
+            response = super().changelist_view(request, extra_context)
+            # TemplateResponse renders lazily; render while the reads are routed
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                response.render()
+        return response
+
+
+class RowActionsMixin:
+    """
+    ``action_buttons`` column rendered by a per-request RowActionRenderer.
+
+    Permissions are evaluated once per page (per object only with an
+    object-level permission backend, or when ``row_action_object_permissions``
+    is True) and URLs are reversed once. The request is held in a context
+    variable while the changelist renders, never on the ModelAdmin.
+    """
+    row_action_object_permissions = None
+
+    def changelist_view(self, request, extra_context=None):
+        from . import row_actions
+        with row_actions.activate(self, request):
+            response = super().changelist_view(request, extra_context)
+            # TemplateResponse renders lazily; render while the request context is active
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                response.render()
+        return response
+
+    def action_buttons(self, obj):
+        """操作按钮列 - 根据权限显示不同的按钮"""
+        from . import row_actions
+        renderer = row_actions.get_renderer(self)
+        if renderer is None:
+            return "-"
+        return renderer.render(obj)
+    
+    action_buttons.short_description = _("Actions")
+
+
+class FacetCacheMixin:
+    """
+    Sidebar filters with per-value counts from one cached grouped aggregate
+    per changelist (see facets.py).
+
+    Plain local field names in list_filter use FacetFilter; the cache is
+    dropped whenever an object of the model is saved or deleted. Counts are
+    always shown, so the stock "Show counts" toggle is turned off.
+    """
+    show_facets = admin.ShowFacets.NEVER
+    facet_cache_timeout = 300
+
+    def __init__(self, model, admin_site):
+        super().__init__(model, admin_site)
+        from .facets import connect_invalidation
+        connect_invalidation(model)
+
+    def get_list_filter(self, request):
+        from .facets import FacetFilter
+        list_filter = []
+        for item in super().get_list_filter(request):
+            if isinstance(item, str) and '__' not in item and not self.model._meta.get_field(item).is_relation:
+                item = (item, FacetFilter)
+            list_filter.append(item)
+        return list_filter
+
+
+class SearchIndexMixin:
+    """
+    Answer the search box from an indexed search backend (see search.py).
+
+    Set ``search_index = SearchIndex()`` to index ``search_fields``; the
+    stock search runs when the index has not been installed by a migration.
+    ``search_identifiers`` (IdentifierPattern instances) answer pasted ids
+    and addresses with exact/prefix lookups first. The export views search
+    through get_search_results() too.
+    """
+    search_index = None
+    search_identifiers = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        if self.search_identifiers and search_term.strip():
+            from .search import identifier_search
+            matched = identifier_search(queryset, self.search_identifiers, search_term)
+            if matched is not None:
+                return matched, False
+        if self.search_index is not None and search_term.strip():
+            filtered = self.search_index.filter(queryset, self, search_term)
+            if filtered is not None:
+                return filtered, False
+        return super().get_search_results(request, queryset, search_term)
+
+
+class BulkEditMixin:
+    """
+    Bulk-edit actions for the fields in ``bulk_edits`` (BulkEdit instances,
+    see bulk_edit.py), e.g. ``bulk_edits = [BulkEdit('state')]``.
+
+    Each action asks for the new value on an intermediate page, then updates
+    the selection (select-across included) with chunked UPDATE statements:
+    within the request up to ADMIN_ENHANCED_BULK_EDIT_SYNC_LIMIT rows, as a
+    background BulkEditJob beyond. The rows updated and the time taken are
+    reported as a message.
+    """
+    bulk_edits = ()
+    bulk_edit_template = 'admin/bulk_edit.html'
+
+    def get_actions(self, request):
+        from django.contrib.admin.options import IS_POPUP_VAR
+        actions = super().get_actions(request)
+        if not self.bulk_edits or self.actions is None or IS_POPUP_VAR in request.GET:
+            return actions
+        if not self.has_change_permission(request):
+            return actions
+        for edit in self.bulk_edits:
+            actions[edit.action_name] = (
+                self._bulk_edit_action(edit), edit.action_name, edit.get_description(self.model),
+            )
+        return actions
+
+    def _bulk_edit_action(self, edit):
+        def action(modeladmin, request, queryset):
+            return modeladmin.bulk_edit_view(request, queryset, edit)
+        return action
+
+    def bulk_edit_view(self, request, queryset, edit):
+        """Ask for the new value, then apply it (None redirects back to the changelist)."""
+        from django.contrib.admin import helpers
+        from django.contrib.admin.utils import model_format_dict
+        from django.template.response import TemplateResponse
+        from . import bulk_edit
+
+        form = edit.get_form(self.model, request.POST if request.POST.get('post') == 'yes' else None)
+        select_across = request.POST.get('select_across') == '1'
+        if form.is_bound and form.is_valid():
+            values = edit.get_values(self.model, form.cleaned_data['value'])
+            return self.apply_bulk_edit(request, queryset, values, select_across)
+
+        opts = self.model._meta
+        context = {
+            **self.admin_site.each_context(request),
+            'title': edit.get_description(self.model) % model_format_dict(opts),
+            'opts': opts,
+            'form': form,
+            'action_name': edit.action_name,
+            'count': queryset.count(),
+            'sync_limit': bulk_edit.get_sync_limit(),
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': select_across,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            'has_view_permission': self.has_view_permission(request),
+        }
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, self.bulk_edit_template, context)
+
+    def apply_bulk_edit(self, request, queryset, values, select_across):
+        """Update ``queryset`` now, or queue a BulkEditJob when it is over the limit."""
+        import time
+        from django.contrib import messages
+        from django.contrib.admin.utils import model_ngettext
+        from django.urls import reverse
+        from django.utils.html import format_html
+        from django.utils.translation import ngettext
+        from . import bulk_edit
+
+        count = queryset.count()
+        if count > bulk_edit.get_sync_limit():
+            job = self.enqueue_bulk_edit_job(request, values, select_across)
+            message = _('Updating %(count)d %(name)s in the background (job #%(job)d).') % {
+                'count': count, 'name': model_ngettext(self.opts, count), 'job': job.pk,
+            }
+            status_url = reverse('admin_enhanced:bulk_edit_job_status', args=[job.pk])
+            self.message_user(request, format_html('{} <a href="{}">{}</a>', message, status_url, _('Status')),
+                              messages.INFO)
+            return None
+
+        start = time.perf_counter()
+        updated = bulk_edit.run_update(queryset, values)
+        self.message_user(request, ngettext(
+            'Updated %(count)d %(name)s in %(seconds).2f s.',
+            'Updated %(count)d %(name)s in %(seconds).2f s.',
+            updated,
+        ) % {'count': updated, 'name': model_ngettext(self.opts, updated), 'seconds': time.perf_counter() - start},
+            messages.SUCCESS)
+        return None
+
+    def enqueue_bulk_edit_job(self, request, values, select_across):
+        """Snapshot the selection (changelist parameters, selected rows) and queue it on Celery."""
+        from django.contrib.admin import helpers
+        from django.db import transaction
+        from . import export
+        from .models import BulkEditJob
+        from .tasks import run_bulk_edit_job
+
+        params = export.snapshot_params(request)
+        if not select_across:
+            params['selected_ids[]'] = request.POST.getlist(helpers.ACTION_CHECKBOX_NAME)
+        job = BulkEditJob.objects.create(
+            user=request.user,
+            app_label=self.opts.app_label,
+            model_name=self.opts.model_name,
+            values=values,
+            params=params,
+        )
+        transaction.on_commit(lambda: run_bulk_edit_job.delay(job.pk))
+        return job
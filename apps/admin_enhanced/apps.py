@@ -5,3 +5,16 @@ class AdminEnhancedConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.admin_enhanced"
     verbose_name = "Enhanced Admin"
+
+    def ready(self):
+        from django.contrib import admin
+
+        from . import columns, metadata
+
+        # django.contrib.admin autodiscovers in its own ready(), which runs after
+        # this one; discovering here (a no-op the second time) lets the column
+        # metadata of every registered ModelAdmin be built once, up front.
+        admin.autodiscover()
+        metadata.build(admin.site)
+        # Saved column selections reach the user's other sessions
+        columns.connect_invalidation()
@@ -0,0 +1,133 @@
+"""
+Bulk-edit changelist actions (BulkEditMixin): set one field of the selected
+objects to a value chosen on an intermediate page.
+
+The selection is never loaded as a whole. run_update() walks it in primary
+key order, ``chunk_size`` keys at a time (``WHERE pk > <last key> ORDER BY
+pk LIMIT n``), and runs one ``UPDATE ... WHERE pk IN (<chunk>)`` per chunk in
+its own transaction, so "select all" over millions of rows holds only one
+chunk of keys in memory and never keeps the write lock for long. Keys are
+read from the primary database, even for a selection made on a replica
+(see routers.py).
+
+QuerySet.update() skips ``auto_now``: those fields (``updated_at``, the
+object modal's cache version) are set explicitly in every chunk. Summary
+tables are kept in step by SummaryQuerySet.update() and the facet cache is
+dropped at the end. No model signals are sent.
+
+Selections larger than ``ADMIN_ENHANCED_BULK_EDIT_SYNC_LIMIT`` rows become a
+BulkEditJob run by Celery (tasks.run_bulk_edit_job), which rebuilds the
+selection from the changelist parameters.
+"""
+from django import forms
+from django.conf import settings
+from django.db import models, router
+from django.utils import timezone
+from django.utils.text import format_lazy
+from django.utils.translation import gettext_lazy as _
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_SYNC_LIMIT = 5000
+
+
+def get_chunk_size():
+    """Primary keys per UPDATE statement."""
+    return getattr(settings, 'ADMIN_ENHANCED_BULK_EDIT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def get_sync_limit():
+    """Largest selection updated within the request; larger ones run as a BulkEditJob."""
+    return getattr(settings, 'ADMIN_ENHANCED_BULK_EDIT_SYNC_LIMIT', DEFAULT_SYNC_LIMIT)
+
+
+class BulkEdit:
+    """
+    A changelist action setting ``field`` on the selected objects.
+
+    Foreign keys are chosen from a select box, or typed as the related
+    object's ``to_field`` (e.g. ``BulkEdit('vpc', to_field='vpc_id')``) when
+    there are too many to list. Add instances to ``ModelAdmin.bulk_edits``.
+    """
+
+    def __init__(self, field, to_field=None, description=None):
+        self.field_name = field
+        self.to_field = to_field
+        self.description = description
+        self.allowed_permissions = ('change',)
+
+    @property
+    def action_name(self):
+        return f'bulk_edit_{self.field_name}'
+
+    def get_field(self, model):
+        return model._meta.get_field(self.field_name)
+
+    def get_description(self, model):
+        if self.description:
+            return self.description
+        # The admin fills in %(verbose_name_plural)s
+        return format_lazy(_('Set {} of selected %(verbose_name_plural)s'), self.get_field(model).verbose_name)
+
+    def formfield(self, model):
+        field = self.get_field(model)
+        if self.to_field and field.is_relation:
+            return forms.ModelChoiceField(
+                queryset=field.related_model._default_manager.all(),
+                to_field_name=self.to_field,
+                required=not field.null,
+                widget=forms.TextInput,
+                label=field.verbose_name,
+                help_text=field.related_model._meta.get_field(self.to_field).verbose_name,
+            )
+        return field.formfield()
+
+    def get_form(self, model, data=None):
+        form = forms.Form(data, prefix='bulk_edit')
+        form.fields['value'] = self.formfield(model)
+        form.fields['value'].widget.attrs.setdefault('class', 'form-control')
+        return form
+
+    def get_values(self, model, value):
+        """{column attribute: value} for the UPDATE; JSON-serializable, for jobs."""
+        field = self.get_field(model)
+        if isinstance(value, models.Model):
+            value = value.pk
+        return {field.attname: value}
+
+
+def iter_pk_chunks(queryset, chunk_size):
+    """Lists of at most ``chunk_size`` primary keys of ``queryset``, in key order."""
+    keys = queryset.order_by('pk').values_list('pk', flat=True)
+    last = None
+    while True:
+        chunk = list((keys if last is None else keys.filter(pk__gt=last))[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def _auto_now_fields(model):
+    return [field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+
+
+def run_update(queryset, values, chunk_size=None, progress=None):
+    """
+    Set ``values`` on every row of ``queryset`` chunk by chunk; returns the rows updated.
+
+    ``progress(rows)`` is called after each chunk with the rows updated so far.
+    """
+    from .facets import invalidate
+
+    model = queryset.model
+    using = router.db_for_write(model)
+    manager = model._default_manager.db_manager(using)
+    stamped = _auto_now_fields(model)
+    updated = 0
+    for chunk in iter_pk_chunks(queryset.using(using), chunk_size or get_chunk_size()):
+        now = timezone.now()
+        updated += manager.filter(pk__in=chunk).update(**values, **{field.attname: now for field in stamped})
+        if progress is not None:
+            progress(updated)
+    invalidate(model)
+    return updated
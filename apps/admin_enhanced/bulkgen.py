@@ -0,0 +1,265 @@
+"""
+Streaming bulk data generation for load tests (generate_instances,
+generate_vpcs).
+
+A row factory (e.g. apps.instances.generators.InstanceRows) turns a
+random.Random into a batch of row tuples. Batches are produced one at a
+time, optionally by worker processes, and inserted by this process as they
+arrive (see RowWriter), so memory use depends on the batch size and the
+number of workers, never on the number of rows.
+
+Batch ``n`` is always generated from its own Random seeded with
+``(seed, n)``: the same seed gives the same rows whatever the number of
+workers. Only the parent process touches the database, which suits SQLite
+(one writer at a time). Worker processes import this module and the
+factory's, so neither may import models.
+
+Fields with ``auto_now_add`` get the insert time, as with the ORM, unless
+the factory provides them (e.g. generate_instances --backdate-days).
+"""
+import multiprocessing
+import random
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Seconds between two progress lines
+REPORT_INTERVAL = 2.0
+
+# Batches requested from the workers ahead of the writer, per worker
+PREFETCH_PER_WORKER = 2
+
+# On SQLite the search index's insert trigger is dropped around loads adding
+# at least this share of the table's existing rows, and the new rows are
+# backfilled afterwards: the trigger costs about four times what the
+# backfill costs per row
+DEFER_SEARCH_INDEX_RATIO = 0.3
+
+# SQLite page cache of the loading connection (KiB): the default 2 MB makes
+# every insert into a random-keyed index (instance_id, ip, ...) read pages
+# from disk once the table outgrows it
+LOAD_CACHE_SIZE_KIB = 262144
+
+_worker_factory = None
+
+
+def batch_random(seed, index):
+    """The Random that generates batch ``index`` of a run seeded with ``seed``."""
+    return random.Random(f'{seed}:{index}')
+
+
+def batch_sizes(total, batch_size):
+    """(batch index, rows) pairs covering ``total`` rows."""
+    for index, start in enumerate(range(0, total, batch_size)):
+        yield index, min(batch_size, total - start)
+
+
+def _init_worker(factory):
+    global _worker_factory
+    _worker_factory = factory
+
+
+def _generate(seed, index, size):
+    return _worker_factory.rows(batch_random(seed, index), size)
+
+
+def iter_batches(factory, total, batch_size=DEFAULT_BATCH_SIZE, seed=0, workers=1):
+    """
+    Yield lists of row tuples (in ``factory.fields`` order), ``total`` rows in all.
+
+    With ``workers`` > 1 the batches are generated in that many processes;
+    at most ``PREFETCH_PER_WORKER`` batches per worker wait for the writer.
+    """
+    sizes = batch_sizes(total, batch_size)
+    if workers <= 1:
+        for index, size in sizes:
+            yield factory.rows(batch_random(seed, index), size)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(factory,)) as pool:
+        pending = deque()
+        for index, size in sizes:
+            pending.append(pool.apply_async(_generate, (seed, index, size)))
+            if len(pending) >= workers * PREFETCH_PER_WORKER:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+class Throughput:
+    """Rows written so far and rows per second, reported every ``interval`` seconds."""
+
+    def __init__(self, total, write, interval=REPORT_INTERVAL):
+        self.total = total
+        self.write = write
+        self.interval = interval
+        self.rows = 0
+        self.started = self.reported = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def add(self, rows):
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self.reported >= self.interval or self.rows >= self.total:
+            self.reported = now
+            self.write(f'  {self.rows:,} / {self.total:,} 行，{self.rate:,.0f} 行/秒')
+
+
+# Column types whose Python values the database drivers take as they are
+RAW_INTERNAL_TYPES = {
+    'AutoField', 'BigAutoField', 'BigIntegerField', 'CharField', 'IntegerField', 'PositiveBigIntegerField',
+    'PositiveIntegerField', 'PositiveSmallIntegerField', 'SlugField', 'SmallIntegerField', 'TextField',
+}
+
+
+class RowWriter:
+    """
+    Inserts row tuples of ``fields`` into ``model``'s table, one executemany() per batch.
+
+    bulk_create() compiles SQL and prepares every value of every row in
+    Python, which caps it at a few thousand rows per second; here the
+    statement is built once and only columns that need it (dates, IP
+    addresses, ...) go through get_db_prep_save(). Fields missing from
+    ``fields`` get what the ORM would give them on insert: the insert time
+    for ``auto_now`` / ``auto_now_add``, otherwise their default. The
+    model's summary table (summary.py) is updated in the same transaction.
+    """
+
+    def __init__(self, model, fields, using='default'):
+        from .summary import get_summary
+
+        self.model = model
+        self.using = using
+        self.connection = connections[using]
+        opts = model._meta
+        provided = [opts.get_field(name) for name in fields]
+        self.stamped = []
+        self.defaults = []
+        for field in opts.concrete_fields:
+            if field in provided or field.primary_key and field.db_returning:
+                continue
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                self.stamped.append(field)
+            elif field.has_default() or field.null:
+                self.defaults.append(field)
+            else:
+                raise ValueError(f'{opts.label}.{field.name} has no default and is not generated')
+        self.provided = provided
+        self.preparers = [
+            None if field.get_internal_type() in RAW_INTERNAL_TYPES else field.get_db_prep_save
+            for field in provided
+        ]
+        columns = [field.column for field in provided + self.stamped + self.defaults]
+        qn = self.connection.ops.quote_name
+        self.sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            qn(opts.db_table), ', '.join(qn(column) for column in columns), ', '.join(['%s'] * len(columns)),
+        )
+        self.summary = get_summary(model)
+        if self.summary is not None:
+            self.summary_indexes = [fields.index(name) for name in self.summary.dimensions]
+
+    def _prepare(self, rows):
+        connection = self.connection
+        now = timezone.now()
+        extra = tuple(
+            [field.get_db_prep_save(now, connection) for field in self.stamped]
+            + [field.get_db_prep_save(field.get_default(), connection) for field in self.defaults]
+        )
+        columns = list(zip(*rows))
+        for index, prepare in enumerate(self.preparers):
+            if prepare is not None:
+                columns[index] = [prepare(value, connection) for value in columns[index]]
+        return [row + extra for row in zip(*columns)]
+
+    def write(self, rows):
+        if not rows:
+            return 0
+        with transaction.atomic(using=self.using):
+            with self.connection.cursor() as cursor:
+                cursor.executemany(self.sql, self._prepare(rows))
+            if self.summary is not None:
+                indexes = self.summary_indexes
+                self.summary.apply(Counter(tuple(row[i] for i in indexes) for row in rows), self.using)
+        return len(rows)
+
+
+def write_batches(model, fields, batches, using='default', progress=None):
+    """Insert each batch of row tuples (see RowWriter); returns the number of rows written."""
+    writer = RowWriter(model, fields, using)
+    written = 0
+    for rows in batches:
+        count = writer.write(rows)
+        written += count
+        if progress is not None:
+            progress.add(count)
+    return written
+
+
+def skewed_weights(count, skew):
+    """Cumulative Zipf weights (rank ** -skew) for ``count`` items; ``skew`` 0 is uniform."""
+    weights = []
+    total = 0.0
+    for rank in range(1, count + 1):
+        total += rank ** -skew
+        weights.append(total)
+    return weights
+
+
+def new_seed():
+    """A random seed for runs started without one (print it to reproduce the run)."""
+    return random.SystemRandom().randrange(2 ** 32)
+
+
+@contextmanager
+def _load_cache_size(using):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA cache_size')
+        previous = cursor.fetchone()[0]
+        cursor.execute(f'PRAGMA cache_size = -{LOAD_CACHE_SIZE_KIB}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA cache_size = {int(previous)}')
+
+
+def _search_index_fields(model):
+    from django.contrib import admin
+
+    model_admin = admin.site._registry.get(model)
+    search_index = getattr(model_admin, 'search_index', None)
+    return search_index.get_fields(model_admin) if search_index is not None else None
+
+
+def generate(model, factory, total, batch_size=DEFAULT_BATCH_SIZE, seed=0, workers=1, using='default', write=None):
+    """Generate and insert ``total`` rows of ``model``; returns the Throughput of the run."""
+    from .search import deferred_search_index
+    from .summary import get_summary
+
+    write = write or (lambda line: None)
+    summary = get_summary(model)
+    existing = summary.total(using) if summary is not None else model._base_manager.using(using).count()
+    fields = _search_index_fields(model)
+    defer = fields is not None and total and total >= existing * DEFER_SEARCH_INDEX_RATIO
+    with _load_cache_size(using), deferred_search_index(model, fields, using) if defer else nullcontext():
+        progress = Throughput(total, write)
+        batches = iter_batches(factory, total, batch_size, seed, workers)
+        write_batches(model, factory.fields, batches, using, progress)
+        if defer:
+            write('  为新增的行建立搜索索引...')
+    return progress
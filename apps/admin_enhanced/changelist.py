@@ -0,0 +1,219 @@
+"""
+Keyset (seek) pagination for admin changelists.
+
+Instead of OFFSET, each page continues from the ordering values of the
+last (or first) row of the previous page, so any page costs the same
+index seek. Cursors travel in the URL; no COUNT(*) is run.
+"""
+import base64
+import json
+
+from django.contrib.admin.views.main import ALL_VAR, IS_FACETS_VAR, ORDER_VAR, PAGE_VAR, ChangeList
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+from . import counts
+
+CURSOR_VAR = 'cursor'
+
+# Cursor direction prefixes: continue after the last row / before the first row
+NEXT = 'n'
+PREV = 'p'
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps(values, separators=(',', ':'))
+    return direction + '.' + base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (direction, raw values) or (None, None) for a malformed cursor."""
+    try:
+        direction, token = cursor.split('.', 1)
+        payload = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(payload)
+    except (ValueError, TypeError):
+        return None, None
+    if direction not in (NEXT, PREV) or not isinstance(values, list):
+        return None, None
+    return direction, values
+
+
+class CountingChangeList(ChangeList):
+    """
+    ChangeList that counts through the ModelAdmin's count strategy.
+
+    The filtered count and the unfiltered "total" count both go through the
+    strategy; the total is not queried again when no filter is active.
+    Without a strategy this is the stock ChangeList.
+    """
+    result_count_estimated = False
+
+    def get_count_strategy(self, request):
+        get_strategy = getattr(self.model_admin, 'get_count_strategy', None)
+        return get_strategy(request) if get_strategy else None
+
+    def get_results(self, request):
+        strategy = self.get_count_strategy(request)
+        if strategy is None:
+            return super().get_results(request)
+
+        result_count, estimated = strategy.count(self.queryset)
+        paginator = counts.CountedPaginator(self.queryset, self.list_per_page, result_count, estimated)
+
+        if not self.model_admin.show_full_result_count:
+            full_result_count = None
+        elif self.query or self.queryset.query.has_filters():
+            full_result_count, _estimated = strategy.count(self.root_queryset)
+        else:
+            full_result_count = result_count
+        can_show_all = not estimated and result_count <= self.list_max_show_all
+        multi_page = result_count > self.list_per_page
+
+        if (self.show_all and can_show_all) or not multi_page:
+            result_list = self.queryset._clone()
+        else:
+            try:
+                result_list = paginator.page(self.page_num).object_list
+            except InvalidPage:
+                raise IncorrectLookupParameters
+
+        self.result_count = result_count
+        self.result_count_estimated = estimated
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = not self.show_full_result_count or bool(full_result_count)
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = can_show_all
+        self.multi_page = multi_page
+        self.paginator = paginator
+
+
+class KeysetChangeList(CountingChangeList):
+    """
+    ChangeList that pages with keyset cursors while the default ordering is used.
+
+    Falls back to regular OFFSET pagination when the user sorts by a column,
+    asks for a numbered page (?p=) or "show all", or when list_editable is set.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        # The cursor is not a filter: take it out before filters are built
+        self.cursor = self.params.pop(CURSOR_VAR, None)
+        self.filter_params.pop(CURSOR_VAR, None)
+        self.remove_facet_link = self.get_query_string(remove=[IS_FACETS_VAR])
+        self.add_facet_link = self.get_query_string({IS_FACETS_VAR: True})
+        self.keyset = bool(
+            self.model_admin.keyset_ordering
+            and ORDER_VAR not in self.params
+            and PAGE_VAR not in request.GET
+            and ALL_VAR not in request.GET
+            and not self.list_editable
+        )
+        return super().get_queryset(request, exclude_parameters)
+
+    def get_ordering(self, request, queryset):
+        if self.keyset:
+            return list(self.model_admin.keyset_ordering)
+        return super().get_ordering(request, queryset)
+
+    def _keyset_fields(self):
+        """[(attribute name, model field, descending)] for the keyset ordering."""
+        fields = []
+        for name in self.model_admin.keyset_ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            field = self.lookup_opts.pk if name == 'pk' else self.lookup_opts.get_field(name)
+            fields.append((name, field, descending))
+        return fields
+
+    def _seek(self, queryset, fields, values, forward):
+        """Filter rows strictly after (forward) or before the given ordering values."""
+        condition = Q()
+        equal = Q()
+        for (name, _field, descending), value in zip(fields, values):
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return queryset.filter(condition)
+
+    def _cursor_values(self, fields, raw_values):
+        if raw_values is None or len(raw_values) != len(fields):
+            return None
+        try:
+            return [field.to_python(value) for (_name, field, _desc), value in zip(fields, raw_values)]
+        except Exception:
+            return None
+
+    def get_keyset_count(self, request):
+        """
+        Return ``(total, is_estimate)`` for display; total is None when unknown.
+
+        Uses the ModelAdmin's count strategy when it has one, otherwise table
+        statistics for unfiltered lists (``keyset_count = 'estimate'``).
+        """
+        strategy = self.get_count_strategy(request)
+        if strategy is not None:
+            return strategy.count(self.queryset)
+        if self.model_admin.keyset_count != 'estimate':
+            return None, False
+        # Table statistics only describe the unfiltered table
+        if self.query or self.queryset.query.has_filters():
+            return None, False
+        estimate = counts.estimate_table_rows(self.model)
+        return estimate, estimate is not None
+
+    def get_results(self, request):
+        if not self.keyset:
+            return super().get_results(request)
+
+        try:
+            fields = self._keyset_fields()
+        except FieldDoesNotExist:
+            self.keyset = False
+            return super().get_results(request)
+
+        per_page = self.list_per_page
+        direction, raw_values = decode_cursor(self.cursor) if self.cursor else (None, None)
+        values = self._cursor_values(fields, raw_values)
+        if values is None:
+            direction = None
+
+        queryset = self.queryset
+        if direction == PREV:
+            queryset = self._seek(queryset, fields, values, forward=False).reverse()
+        elif direction == NEXT:
+            queryset = self._seek(queryset, fields, values, forward=True)
+        rows = list(queryset[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if direction == PREV:
+            rows.reverse()
+            has_prev, has_next = has_more, True
+        else:
+            has_prev, has_next = direction == NEXT, has_more
+
+        def cursor_for(obj, cursor_direction):
+            # value_to_string keeps full precision (DjangoJSONEncoder drops microseconds)
+            return encode_cursor(cursor_direction, [field.value_to_string(obj) for _name, field, _desc in fields])
+
+        self.keyset_first_url = self.get_query_string() if has_prev else None
+        self.keyset_prev_url = self.get_query_string({CURSOR_VAR: cursor_for(rows[0], PREV)}) if has_prev and rows else None
+        self.keyset_next_url = self.get_query_string({CURSOR_VAR: cursor_for(rows[-1], NEXT)}) if has_next and rows else None
+
+        total, estimated = self.get_keyset_count(request)
+        self.keyset_total = total
+        self.result_count_estimated = estimated
+        # result_count must stay an int for the action bar's ngettext()
+        self.result_count = total if total is not None else len(rows)
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = rows
+        self.can_show_all = False
+        # multi_page=False keeps the stock pagination tag from asking the paginator for a count;
+        # pagination.html renders the cursor links instead
+        self.multi_page = False
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, per_page)
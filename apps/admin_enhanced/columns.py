@@ -0,0 +1,115 @@
+"""
+Per-user, per-model changelist column selection stored on the server.
+
+The selection lives in the ColumnPreference table and is cached in the
+session, so rendering a changelist costs no extra query once loaded. The
+cached entry carries the user's generation, kept in the default cache and
+bumped whenever one of their ColumnPreference rows is saved or deleted
+(see connect_invalidation()), so a selection saved in another browser
+shows up on the next page. Entries also expire after
+``ADMIN_ENHANCED_COLUMN_PREFERENCE_SECONDS``, which bounds staleness when
+the cache is not shared between processes or rows change through
+QuerySet.update().
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+
+from .models import ColumnPreference
+
+# Columns that are always rendered and never offered in the column selector
+FIXED_COLUMNS = ('action_checkbox', 'action_buttons')
+
+SESSION_KEY = 'admin_enhanced_columns'
+
+DEFAULT_PREFERENCE_SECONDS = 60
+
+
+def get_preference_seconds():
+    return getattr(settings, 'ADMIN_ENHANCED_COLUMN_PREFERENCE_SECONDS', DEFAULT_PREFERENCE_SECONDS)
+
+
+def _key(opts):
+    return f'{opts.app_label}.{opts.model_name}'
+
+
+def _generation_key(user_id):
+    return f'admin_enhanced:columns:{user_id}:generation'
+
+
+def _generation(user_id):
+    return caches['default'].get(_generation_key(user_id), 0)
+
+
+def invalidate(user_id):
+    """Make every session of the user reload its column preferences."""
+    cache = caches['default']
+    key = _generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def _invalidate_on_change(sender, instance, **kwargs):
+    invalidate(instance.user_id)
+
+
+def connect_invalidation():
+    """Invalidate cached preferences on ColumnPreference post_save / post_delete (idempotent)."""
+    uid = 'admin_enhanced.columns'
+    post_save.connect(_invalidate_on_change, sender=ColumnPreference, dispatch_uid=uid)
+    post_delete.connect(_invalidate_on_change, sender=ColumnPreference, dispatch_uid=uid)
+
+
+def get_column_preference(request, opts):
+    """Return the saved column names for ``opts``' model, or None when nothing is saved."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    session = getattr(request, 'session', None)
+    cached = session.get(SESSION_KEY, {}) if session is not None else {}
+    key = _key(opts)
+    generation = _generation(user.pk)
+    entry = cached.get(key)
+    # Entries are [generation, loaded at, columns]; older formats are reloaded
+    if (
+        isinstance(entry, list) and len(entry) == 3 and entry[0] == generation
+        and time.time() - entry[1] < get_preference_seconds()
+    ):
+        return entry[2]
+    preference = ColumnPreference.objects.filter(
+        user=user, app_label=opts.app_label, model_name=opts.model_name
+    ).values_list('columns', flat=True).first()
+    if session is not None:
+        # Cache misses too, so users without a preference do not query on every page
+        session[SESSION_KEY] = {**cached, key: [generation, time.time(), preference]}
+    return preference
+
+
+def save_column_preference(request, opts, columns):
+    """Save the visible columns for ``opts``' model; an empty list resets to list_display."""
+    filters = {'user': request.user, 'app_label': opts.app_label, 'model_name': opts.model_name}
+    if columns:
+        ColumnPreference.objects.update_or_create(**filters, defaults={'columns': list(columns)})
+    else:
+        ColumnPreference.objects.filter(**filters).delete()
+    session = getattr(request, 'session', None)
+    if session is not None:
+        # The signal above bumped the generation; cache the new selection under it
+        entry = [_generation(request.user.pk), time.time(), list(columns) or None]
+        session[SESSION_KEY] = {**session.get(SESSION_KEY, {}), _key(opts): entry}
+
+
+def apply_column_preference(request, opts, list_display):
+    """Filter ``list_display`` down to the user's selection, keeping fixed columns and order."""
+    selected = get_column_preference(request, opts)
+    if not selected:
+        return list_display
+    visible = [name for name in list_display if name in FIXED_COLUMNS or name in selected]
+    # A stale preference that no longer matches any column falls back to the full list
+    if all(name in FIXED_COLUMNS for name in visible):
+        return list_display
+    return visible
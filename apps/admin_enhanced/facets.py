@@ -0,0 +1,209 @@
+"""
+Cached list_filter facets.
+
+The FacetFilters of one changelist share a single grouped aggregate
+(``SELECT f1, f2, ..., COUNT(*) ... GROUP BY f1, f2, ...``) instead of one
+``SELECT DISTINCT`` (plus one facet count query) per filter. Each filter
+derives its values and per-value counts from those rows, counting only the
+rows that match the values selected in the other facets, which is what
+the stock facet counts show.
+
+The aggregate over the admin queryset is cached for ``cache_timeout``
+seconds and dropped when the model is saved or deleted (see
+connect_invalidation()). bulk_create() and QuerySet.update() send no
+signals, so after those the counts are at most ``cache_timeout`` stale.
+With a search term or another filter active, the counts come from one
+extra, uncached aggregate over the narrowed queryset.
+
+When the model has a summary table covering the filter fields (see
+summary.py), the rows are read from it instead and no cache is needed.
+"""
+import hashlib
+
+from django.contrib.admin.filters import FieldListFilter
+from django.contrib.admin.utils import build_q_object_from_lookup_parameters, get_last_value_from_parameters
+from django.core.cache import caches
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+
+from .summary import get_summary
+
+DEFAULT_FACET_CACHE_TIMEOUT = 300
+
+
+def _generation_key(model):
+    return f'admin_enhanced:facets:{model._meta.label_lower}:generation'
+
+
+def invalidate(model, cache_alias='default'):
+    """Drop every cached facet aggregate of ``model``."""
+    cache = caches[cache_alias]
+    key = _generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def _invalidate_on_change(sender, **kwargs):
+    invalidate(sender)
+
+
+def connect_invalidation(model):
+    """Invalidate ``model``'s facets on post_save / post_delete (idempotent)."""
+    uid = f'admin_enhanced.facets:{model._meta.label_lower}'
+    post_save.connect(_invalidate_on_change, sender=model, dispatch_uid=uid)
+    post_delete.connect(_invalidate_on_change, sender=model, dispatch_uid=uid)
+
+
+def facet_rows(queryset, fields):
+    """[(value of each field, ..., row count)] grouped by ``fields``."""
+    return [
+        tuple(row) for row in
+        queryset.order_by().values_list(*fields).annotate(facet_count=Count('pk'))
+    ]
+
+
+def cached_facet_rows(queryset, fields, cache_timeout=DEFAULT_FACET_CACHE_TIMEOUT, cache_alias='default'):
+    """facet_rows(), cached per queryset until the model changes or the timeout passes."""
+    if not cache_timeout:
+        return facet_rows(queryset, fields)
+    cache = caches[cache_alias]
+    generation = cache.get(_generation_key(queryset.model), 0)
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(
+        f'{queryset.db}:{fields!r}:{sql}:{params!r}'.encode(), usedforsecurity=False,
+    ).hexdigest()
+    key = f'admin_enhanced:facets:{queryset.model._meta.label_lower}:{generation}:{digest}'
+    rows = cache.get(key)
+    if rows is None:
+        rows = facet_rows(queryset, fields)
+        cache.set(key, rows, cache_timeout)
+    return rows
+
+
+class _ChangeListFacets:
+    """The grouped rows behind all FacetFilters of one changelist."""
+
+    def __init__(self, changelist, request):
+        model_admin = changelist.model_admin
+        self.filters = [spec for spec in changelist.filter_specs if isinstance(spec, FacetFilter)]
+        self.fields = [spec.field_path for spec in self.filters]
+        cache_timeout = getattr(model_admin, 'facet_cache_timeout', DEFAULT_FACET_CACHE_TIMEOUT)
+        # Values offered by each filter: everything in the admin queryset
+        root = changelist.root_queryset
+        summary = get_summary(root.model)
+        if summary is not None and summary.covers(root, self.fields):
+            self.all_rows = summary.rows(self.fields, root.db)
+        else:
+            self.all_rows = cached_facet_rows(root, self.fields, cache_timeout)
+        narrowed = self._narrowed_queryset(changelist, request)
+        self.rows = self.all_rows if narrowed is None else facet_rows(narrowed, self.fields)
+
+    def _narrowed_queryset(self, changelist, request):
+        """
+        The changelist queryset without the facet selections (they are applied
+        to the rows in Python), or None when nothing else narrows it.
+        """
+        filter_specs, _has_filters, remaining, _duplicates, _active = changelist.get_filters(request)
+        other_specs = [spec for spec in filter_specs if not isinstance(spec, FacetFilter)]
+        if not (changelist.query or remaining or any(spec.used_parameters for spec in other_specs)):
+            return None
+        queryset = changelist.root_queryset
+        for spec in other_specs:
+            filtered = spec.queryset(request, queryset)
+            if filtered is not None:
+                queryset = filtered
+        queryset = queryset.filter(build_q_object_from_lookup_parameters(remaining))
+        if changelist.query:
+            queryset, _may_have_duplicates = changelist.model_admin.get_search_results(
+                request, queryset, changelist.query,
+            )
+        return queryset
+
+    def values(self, facet):
+        index = self.filters.index(facet)
+        return sorted({row[index] for row in self.all_rows}, key=lambda value: (value is None, value))
+
+    def counts(self, facet):
+        """{value: rows} for ``facet``, restricted by the selections of the other facets."""
+        index = self.filters.index(facet)
+        others = [(i, spec) for i, spec in enumerate(self.filters) if spec is not facet and spec.is_active()]
+        counts = {}
+        for row in self.rows:
+            if all(spec.matches(row[i]) for i, spec in others):
+                counts[row[index]] = counts.get(row[index], 0) + row[-1]
+        return counts
+
+
+def get_changelist_facets(changelist, request):
+    facets = getattr(changelist, '_admin_enhanced_facets', None)
+    if facets is None:
+        facets = changelist._admin_enhanced_facets = _ChangeListFacets(changelist, request)
+    return facets
+
+
+class FacetFilter(FieldListFilter):
+    """
+    Filter on a local, non-relational field with per-value counts
+    (see the module docstring). Uses the same query parameters as the
+    stock filters: ``<field>__exact`` for fields with choices, ``<field>``
+    otherwise.
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__exact' if field.flatchoices else field_path
+        self.lookup_kwarg_isnull = f'{field_path}__isnull'
+        self.lookup_val = params.get(self.lookup_kwarg)
+        self.lookup_val_isnull = get_last_value_from_parameters(params, self.lookup_kwarg_isnull)
+        self.empty_value_display = model_admin.get_empty_value_display()
+        self.request = request
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg, self.lookup_kwarg_isnull]
+
+    def is_active(self):
+        return self.lookup_val is not None or self.lookup_val_isnull is not None
+
+    def matches(self, value):
+        """Whether a row with ``value`` passes this filter's selection."""
+        if self.lookup_val_isnull is not None:
+            is_null = self.lookup_val_isnull.lower() not in ('', '0', 'false')
+            if (value is None) != is_null:
+                return False
+        if self.lookup_val is not None:
+            return value is not None and str(value) in self.lookup_val
+        return True
+
+    def choices(self, changelist):
+        facets = get_changelist_facets(changelist, self.request)
+        counts = facets.counts(self)
+        yield {
+            'selected': not self.is_active(),
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull]),
+            'display': _('All'),
+        }
+        if self.field.flatchoices:
+            values = [value for value, _title in self.field.flatchoices]
+            titles = {value: title for value, title in self.field.flatchoices}
+        else:
+            values = facets.values(self)
+            titles = {}
+        include_none = False
+        for value in values:
+            if value is None:
+                include_none = True
+                continue
+            yield {
+                'selected': self.lookup_val is not None and str(value) in self.lookup_val,
+                'query_string': changelist.get_query_string({self.lookup_kwarg: value}, [self.lookup_kwarg_isnull]),
+                'display': f'{titles.get(value, value)} ({counts.get(value, 0)})',
+            }
+        if include_none or None in counts:
+            yield {
+                'selected': bool(self.lookup_val_isnull),
+                'query_string': changelist.get_query_string({self.lookup_kwarg_isnull: 'True'}, [self.lookup_kwarg]),
+                'display': f'{self.empty_value_display} ({counts.get(None, 0)})',
+            }
@@ -0,0 +1,287 @@
+import cProfile
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from apps.admin_enhanced import export
+from apps.instances.models import Instance
+from apps.vpc.models import Vpc
+
+
+def git_commit():
+    """当前提交（短哈希），非 git 环境返回空字符串"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def seed(size, instances_per_vpc, stdout):
+    """用 generate_vpcs / generate_instances 补齐到 size 条实例，新实例均匀地挂到 VPC 上"""
+    vpc_target = max(1, size // instances_per_vpc)
+    vpc_count = Vpc.objects.count()
+    if vpc_count < vpc_target:
+        call_command("generate_vpcs", count=vpc_target - vpc_count, stdout=stdout)
+    instance_count = Instance.objects.count()
+    if instance_count < size:
+        call_command("generate_instances", count=size - instance_count, vpc_skew=0, unlinked=0, stdout=stdout)
+
+    vpc_pks = list(Vpc.objects.values_list("pk", flat=True))
+    unlinked = list(Instance.objects.filter(vpc__isnull=True).values_list("pk", flat=True))
+    by_vpc = {}
+    for index, pk in enumerate(unlinked):
+        by_vpc.setdefault(vpc_pks[index % len(vpc_pks)], []).append(pk)
+    for vpc_pk, pks in by_vpc.items():
+        for start in range(0, len(pks), 500):
+            Instance.objects.filter(pk__in=pks[start:start + 500]).update(vpc_id=vpc_pk)
+    # 让 sqlite_stat1 / pg_class 统计信息与数据量一致（行数估算依赖它）
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def scenarios(formats):
+    """(名称, URL, GET 参数) 列表；URL 依赖当前数据，在每个数据规模下重新生成"""
+    instance = Instance.objects.order_by("pk").first()
+    vpc = Vpc.objects.order_by("pk").first()
+    instance_list = reverse("admin:instances_instance_changelist")
+    vpc_list = reverse("admin:vpc_vpc_changelist")
+    items = [
+        ("instance_changelist", instance_list, {}),
+        ("instance_changelist_sorted_page", instance_list, {"o": "-9", "p": "5"}),
+        ("instance_search", instance_list, {"q": instance.ip.rsplit(".", 1)[0]}),
+        ("instance_search_exact_id", instance_list, {"q": instance.instance_id}),
+        ("instance_filter", instance_list, {"state__exact": "running"}),
+        ("instance_filter_multi", instance_list, {"account__exact": instance.account, "region__exact": instance.region}),
+        ("vpc_changelist", vpc_list, {}),
+        ("vpc_search", vpc_list, {"q": vpc.vpc_name}),
+    ]
+    for format_type in formats:
+        items.append((
+            f"instance_export_{format_type}",
+            reverse("admin_enhanced:export_changelist", args=["instances", "instance", format_type]),
+            {},
+        ))
+    items += [
+        ("instance_modal", reverse("admin_enhanced:view_object_modal", args=["instances", "instance", instance.pk]), {}),
+        ("vpc_modal", reverse("admin_enhanced:view_object_modal", args=["vpc", "vpc", vpc.pk]), {}),
+    ]
+    return items
+
+
+class QueryTimer:
+    """connection.execute_wrapper：统计查询数与查询耗时（比 CaptureQueriesContext 的毫秒精度更细）"""
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - start
+            self.count += 1
+
+
+def measure(client, url, params, repeat, profile_path=None):
+    """执行 repeat 次 GET，返回耗时、查询数与查询耗时（流式响应会被完整读取）"""
+    timings = []
+    query_count = query_time = size = status = None
+    for run in range(repeat):
+        profiler = cProfile.Profile() if profile_path and run == repeat - 1 else None
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            if profiler:
+                profiler.enable()
+            start = time.perf_counter()
+            response = client.get(url, params)
+            body = b"".join(response.streaming_content) if response.streaming else response.content
+            elapsed = time.perf_counter() - start
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(profile_path)
+        timings.append(elapsed * 1000)
+        status = response.status_code
+        size = len(body)
+        query_count = timer.count
+        query_time = timer.elapsed * 1000
+    return {
+        "status": status,
+        "bytes": size,
+        "ms_min": round(min(timings), 2),
+        "ms_median": round(statistics.median(timings), 2),
+        "ms_max": round(max(timings), 2),
+        "queries": query_count,
+        "query_ms": round(query_time, 3),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Admin 性能基准：在独立的 SQLite 数据库中生成 N 条数据，测量 changelist、搜索、筛选、"
+        "各导出格式与详情弹窗的耗时、查询数与查询耗时，并输出 JSON 结果"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1000, 10000],
+            help="实例数据规模，按从小到大依次补齐（默认：1000 10000）",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="每个场景的请求次数，结果取最小/中位数/最大值（默认：5）",
+        )
+        parser.add_argument(
+            "--instances-per-vpc",
+            type=int,
+            default=50,
+            help="每个 VPC 下的实例数，决定生成的 VPC 数量（默认：50）",
+        )
+        parser.add_argument(
+            "--format",
+            dest="formats",
+            nargs="+",
+            choices=sorted(export.STREAM_FORMATS),
+            default=sorted(export.STREAM_FORMATS),
+            help="测量的导出格式（默认：全部）",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            help="只运行名称包含这些关键字的场景",
+        )
+        parser.add_argument(
+            "--db",
+            help="基准数据库文件（默认：临时文件，结束后删除）；不会使用项目数据库",
+        )
+        parser.add_argument(
+            "--output",
+            help="JSON 结果路径（默认：benchmarks/admin-<时间>-<提交>.json）",
+        )
+        parser.add_argument(
+            "--compare",
+            help="与之前保存的 JSON 结果对比中位数耗时与查询数",
+        )
+        parser.add_argument(
+            "--profile",
+            help="把每个场景最后一次请求的 cProfile 数据写入该目录（.prof，可用 snakeviz 等查看）",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("基准测试只支持 SQLite（默认配置）")
+        sizes = sorted(set(options["sizes"]))
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                baseline = json.load(f)
+        if options["profile"]:
+            os.makedirs(options["profile"], exist_ok=True)
+
+        # 独立的测试数据库：与 Django 测试框架相同的创建/销毁流程，不触碰项目数据
+        temp_dir = None
+        db_path = options["db"]
+        if not db_path:
+            temp_dir = tempfile.mkdtemp(prefix="armoryx-bench-")
+            db_path = os.path.join(temp_dir, "bench.sqlite3")
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = db_path
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=bool(options["db"]))
+        try:
+            results = self.run_benchmarks(sizes, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=bool(options["db"]))
+            if temp_dir:
+                for name in os.listdir(temp_dir):
+                    os.remove(os.path.join(temp_dir, name))
+                os.rmdir(temp_dir)
+
+        commit = git_commit()
+        report = {
+            "meta": {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "commit": commit,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": f"sqlite {connection.Database.sqlite_version}",
+                "repeat": options["repeat"],
+                "sizes": sizes,
+            },
+            "results": results,
+        }
+        output = options["output"] or os.path.join(
+            settings.BASE_DIR, "benchmarks",
+            f"admin-{datetime.now():%Y%m%d-%H%M%S}{'-' + commit if commit else ''}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"\n结果已写入 {output}"))
+
+        if baseline:
+            self.print_comparison(baseline, report)
+
+    def run_benchmarks(self, sizes, options):
+        user = get_user_model().objects.create_superuser("bench", "bench@example.com", "bench")
+        client = Client()
+        client.force_login(user)
+        results = []
+        # 测试客户端使用 testserver 作为 Host
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for size in sizes:
+                self.stdout.write(f"\n== {size} 条实例 ==")
+                seed(size, options["instances_per_vpc"], self.stdout)
+                for name, url, params in scenarios(options["formats"]):
+                    if options["only"] and not any(key in name for key in options["only"]):
+                        continue
+                    profile_path = (
+                        os.path.join(options["profile"], f"{name}-{size}.prof") if options["profile"] else None
+                    )
+                    # 预热一次：URL 解析、模板加载与缓存不计入结果
+                    measure(client, url, params, 1)
+                    result = measure(client, url, params, options["repeat"], profile_path)
+                    results.append({"size": size, "scenario": name, "url": url, "params": params, **result})
+                    self.stdout.write(
+                        f"  {name:<36} {result['ms_median']:9.1f} ms  {result['queries']:4d} 查询 "
+                        f"{result['query_ms']:8.1f} ms  {result['bytes']:>10,} 字节  HTTP {result['status']}"
+                    )
+        return results
+
+    def print_comparison(self, baseline, report):
+        self.stdout.write(
+            f"\n与 {baseline['meta'].get('commit') or baseline['meta'].get('created_at')} 对比（中位数耗时）："
+        )
+        previous = {(row["size"], row["scenario"]): row for row in baseline["results"]}
+        for row in report["results"]:
+            old = previous.get((row["size"], row["scenario"]))
+            if not old:
+                continue
+            ratio = old["ms_median"] / row["ms_median"] if row["ms_median"] else 0
+            style = self.style.SUCCESS if ratio >= 1 else self.style.WARNING
+            self.stdout.write(style(
+                f"  {row['size']:>8} {row['scenario']:<36} {old['ms_median']:9.1f} -> {row['ms_median']:9.1f} ms "
+                f"({ratio:.2f}x)  查询 {old['queries']} -> {row['queries']}"
+            ))
@@ -0,0 +1,166 @@
+import json
+import time
+
+from django.contrib import admin
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from django.test import RequestFactory
+from django.utils.encoding import force_str
+
+from apps.admin_enhanced import export
+from apps.instances.models import Instance
+
+
+def legacy_rows(queryset, model, model_admin, columns):
+    """导出流水线改造前的逐单元格序列化（作为基准对照）"""
+    for obj in queryset:
+        row = {}
+        for field_name in columns:
+            try:
+                if hasattr(model_admin, field_name):
+                    value = getattr(model_admin, field_name)(obj)
+                    if value is None or isinstance(value, (str, int, float, bool)):
+                        row[field_name] = value
+                    else:
+                        row[field_name] = force_str(value)
+                elif hasattr(obj, field_name):
+                    try:
+                        field = model._meta.get_field(field_name)
+                    except Exception:
+                        field = None
+                    value = getattr(obj, field_name)
+                    if value is None:
+                        row[field_name] = None
+                    elif field and isinstance(field, models.ForeignKey):
+                        row[field_name] = force_str(value)
+                    elif field and isinstance(field, models.ManyToManyField):
+                        row[field_name] = ', '.join([force_str(item) for item in value.all()])
+                    elif field and isinstance(field, models.DateTimeField):
+                        row[field_name] = value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
+                    elif field and isinstance(field, models.DateField):
+                        row[field_name] = value.strftime('%Y-%m-%d') if value else ''
+                    elif isinstance(value, (str, int, float, bool)):
+                        row[field_name] = value
+                    else:
+                        row[field_name] = force_str(value)
+                else:
+                    row[field_name] = ''
+            except Exception as e:
+                row[field_name] = f'Error: {str(e)}'
+        yield row
+
+
+def legacy_json(queryset, model, model_admin, columns, labels):
+    """改造前的 JSON 导出：整表行列表 + 带标签副本 + json.dumps"""
+    data_rows = list(legacy_rows(queryset, model, model_admin, columns))
+    result = []
+    for row in data_rows:
+        result.append({force_str(labels[i]): value for i, value in enumerate(row.values())})
+    return json.dumps(result, ensure_ascii=False, indent=2)
+
+
+def legacy_excel(queryset, model, model_admin, columns, labels):
+    """改造前的 Excel 导出：openpyxl 完整工作簿 + 第二遍扫描计算列宽"""
+    import io
+
+    import openpyxl
+    from openpyxl.styles import Font, Alignment
+    from openpyxl.utils import get_column_letter
+
+    data_rows = list(legacy_rows(queryset, model, model_admin, columns))
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for col_idx, header in enumerate(labels, start=1):
+        cell = ws.cell(row=1, column=col_idx, value=header)
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+    for row_idx, row in enumerate(data_rows, start=2):
+        for col_idx, field_name in enumerate(row.keys(), start=1):
+            ws.cell(row=row_idx, column=col_idx, value=row[field_name])
+    for col_idx, header in enumerate(labels, start=1):
+        max_length = len(str(header))
+        for row_idx in range(2, len(data_rows) + 2):
+            cell_value = str(ws.cell(row=row_idx, column=col_idx).value or '')
+            if len(cell_value) > max_length:
+                max_length = len(cell_value)
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 2, 50)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+# 有旧实现可对照的格式
+LEGACY_EXPORTS = {
+    "json": legacy_json,
+    "excel": legacy_excel,
+}
+
+
+class Command(BaseCommand):
+    help = "导出性能基准：对比改造前后的 Instance 导出吞吐量（行/秒），支持 JSON 与 Excel 对照"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=500000,
+            help="数据集行数，不足时自动调用 generate_instances 补齐（默认：500000）",
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(export.STREAM_FORMATS),
+            default="json",
+            help="新流水线使用的输出格式（默认：json）",
+        )
+        parser.add_argument(
+            "--columns",
+            nargs="*",
+            help="导出列（默认：InstanceAdmin.list_display）",
+        )
+        parser.add_argument(
+            "--skip-legacy",
+            action="store_true",
+            help="跳过旧实现（大数据集时旧实现内存占用很高）",
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        existing = Instance.objects.count()
+        if existing < rows:
+            self.stdout.write(f"当前 {existing} 条，补齐到 {rows} 条...")
+            call_command("generate_instances", count=rows - existing, stdout=self.stdout)
+
+        model_admin = admin.site._registry.get(Instance)
+        if model_admin is None:
+            raise CommandError("InstanceAdmin 未注册")
+        request = RequestFactory().get("/")
+        queryset = model_admin.get_queryset(request)[:rows]
+        columns = options["columns"] or [
+            col for col in model_admin.list_display if col not in export.EXCLUDED_COLUMNS
+        ]
+
+        format_type = options["format"]
+        plan = export.ExportPlan(Instance, model_admin, columns)
+        self.stdout.write(f"列：{', '.join(columns)}（{'values_list 投影' if plan.projected else '模型对象'}）")
+
+        results = []
+        legacy = LEGACY_EXPORTS.get(format_type)
+        if legacy and not options["skip_legacy"]:
+            try:
+                start = time.perf_counter()
+                legacy(queryset, Instance, model_admin, columns, plan.labels)
+                results.append((f"legacy {format_type}", time.perf_counter() - start))
+            except ImportError as e:
+                self.stdout.write(self.style.WARNING(f"跳过旧实现：{e}"))
+
+        start = time.perf_counter()
+        for _chunk in export.open_stream(format_type, plan.iter_rows(queryset), plan.labels, title="Instances"):
+            pass
+        results.append((f"stream {format_type}", time.perf_counter() - start))
+
+        self.stdout.write("\n结果：")
+        for name, elapsed in results:
+            self.stdout.write(f"  {name:<14} {elapsed:8.2f}s  {rows / elapsed:12,.0f} 行/秒")
+        if len(results) == 2:
+            self.stdout.write(self.style.SUCCESS(f"加速比：{results[0][1] / results[1][1]:.1f}x"))
@@ -0,0 +1,281 @@
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from apps.instances.models import Instance
+
+from .benchmark_admin import git_commit
+
+# 管理后台修改表单提交的字段
+FORM_FIELDS = ["account", "region", "instance_id", "instance_name", "ip", "security_groupid", "vpc", "state"]
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * fraction))], 2)
+
+
+class Worker(threading.Thread):
+    """一个并发用户：到截止时间前循环发送 changelist 读请求或修改表单写请求"""
+
+    def __init__(self, kind, user, pks, start_barrier, deadline_holder, seed):
+        super().__init__(daemon=True)
+        self.kind = kind
+        self.user = user
+        self.pks = pks
+        self.start_barrier = start_barrier
+        self.deadline_holder = deadline_holder
+        self.random = random.Random(seed)
+        self.latencies = []
+        self.errors = Counter()
+
+    def read(self, client):
+        changelist = reverse("admin:instances_instance_changelist")
+        params = self.random.choice([
+            {},
+            {"p": str(self.random.randint(2, 20))},
+            {"state__exact": self.random.choice(["running", "stopped"])},
+            {"q": f"web-{self.random.choice(['server', 'node', 'host'])}"},
+        ])
+        return client.get(changelist, params)
+
+    def write(self, client):
+        pk = self.random.choice(self.pks)
+        values = Instance.objects.filter(pk=pk).values(*[
+            "vpc_id" if name == "vpc" else name for name in FORM_FIELDS
+        ]).first()
+        data = {name: values["vpc_id" if name == "vpc" else name] or "" for name in FORM_FIELDS}
+        data["state"] = self.random.choice(["running", "stopped", "pending"])
+        data["instance_name"] = f"{data['instance_name'].rsplit('#', 1)[0]}#{self.random.randint(1, 9999)}"
+        data["_save"] = "1"
+        return client.post(reverse("admin:instances_instance_change", args=[pk]), data)
+
+    def run(self):
+        client = Client()
+        client.force_login(self.user)
+        request = self.read if self.kind == "read" else self.write
+        self.start_barrier.wait()
+        try:
+            while time.perf_counter() < self.deadline_holder[0]:
+                start = time.perf_counter()
+                try:
+                    response = request(client)
+                except Exception as e:
+                    self.errors[f"{type(e).__name__}: {e}"] += 1
+                    continue
+                if response.status_code not in (200, 302):
+                    self.errors[f"HTTP {response.status_code}"] += 1
+                    continue
+                self.latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "SQLite 并发基准：在独立数据库的副本上分别以各调优配置（见 config/settings/database.py）运行"
+        "并发的 changelist 读请求与后台修改表单写请求，比较吞吐量、延迟与 database is locked 等错误"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=20000,
+            help="实例数据量（默认：20000）",
+        )
+        parser.add_argument(
+            "--readers",
+            type=int,
+            default=8,
+            help="并发读线程数（默认：8）",
+        )
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=4,
+            help="并发写线程数（默认：4）",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=15,
+            help="每个配置的运行秒数（默认：15）",
+        )
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            default=None,
+            help="对比的配置（默认：SQLITE_PROFILES 中的全部）",
+        )
+        parser.add_argument(
+            "--output",
+            help="JSON 结果路径（默认：benchmarks/sqlite-<时间>-<提交>.json）",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("基准测试只支持 SQLite")
+        profiles = options["profiles"] or list(settings.SQLITE_PROFILES)
+        unknown = [name for name in profiles if name not in settings.SQLITE_PROFILES]
+        if unknown:
+            raise CommandError(f"未知的配置：{', '.join(unknown)}")
+
+        temp_dir = tempfile.mkdtemp(prefix="armoryx-sqlite-bench-")
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(temp_dir, "seed.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        seeded = dict(connection.settings_dict)
+        try:
+            self.stdout.write(f"生成 {options['rows']} 条实例...")
+            call_command("generate_vpcs", count=max(1, options["rows"] // 50), stdout=open(os.devnull, "w"))
+            call_command("generate_instances", count=options["rows"], stdout=open(os.devnull, "w"))
+            get_user_model().objects.create_superuser("bench", "bench@example.com", "bench")
+            connection.close()
+            results = []
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                for profile in profiles:
+                    # 每个配置使用种子数据库的一份副本（WAL 等设置会写进数据库文件）
+                    path = os.path.join(temp_dir, f"{profile}.sqlite3")
+                    shutil.copyfile(seeded["NAME"], path)
+                    self.configure(seeded, profile, path)
+                    result = self.run_profile(profile, options)
+                    results.append(result)
+                    self.print_result(result)
+        finally:
+            connection.close()
+            connection.settings_dict.clear()
+            connection.settings_dict.update(seeded)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        if len(results) > 1:
+            self.print_comparison(results)
+        self.write_report(results, options)
+
+    def configure(self, seeded, profile, path):
+        """让之后新建的连接（每个线程一个）使用 profile 的设置"""
+        connection.close()
+        tuning = settings.SQLITE_PROFILES[profile]
+        connection.settings_dict.clear()
+        connection.settings_dict.update({
+            **seeded,
+            "NAME": path,
+            "OPTIONS": dict(tuning.get("OPTIONS", {})),
+            "CONN_MAX_AGE": tuning.get("CONN_MAX_AGE", 0),
+            "CONN_HEALTH_CHECKS": tuning.get("CONN_HEALTH_CHECKS", False),
+        })
+
+    def run_profile(self, profile, options):
+        user = get_user_model().objects.get(username="bench")
+        pks = list(Instance.objects.values_list("pk", flat=True)[:5000])
+        connection.close()
+        kinds = ["read"] * options["readers"] + ["write"] * options["writers"]
+        # 失败的请求计入结果，不逐条打印堆栈
+        request_logger = logging.getLogger("django.request")
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        barrier = threading.Barrier(len(kinds) + 1)
+        deadline = [float("inf")]
+        workers = [Worker(kind, user, pks, barrier, deadline, seed) for seed, kind in enumerate(kinds)]
+        for worker in workers:
+            worker.start()
+        # 所有线程登录完成后同时开始
+        barrier.wait()
+        start = time.perf_counter()
+        deadline[0] = start + options["duration"]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        request_logger.setLevel(previous_level)
+
+        result = {"profile": profile, "seconds": round(elapsed, 2)}
+        errors = Counter()
+        for kind in ("read", "write"):
+            latencies = [ms for worker in workers if worker.kind == kind for ms in worker.latencies]
+            result[f"{kind}s"] = len(latencies)
+            result[f"{kind}s_per_second"] = round(len(latencies) / elapsed, 1)
+            result[f"{kind}_ms_median"] = round(statistics.median(latencies), 2) if latencies else None
+            result[f"{kind}_ms_p95"] = percentile(latencies, 0.95)
+            for worker in workers:
+                if worker.kind == kind:
+                    errors.update({f"{'读' if kind == 'read' else '写'}: {message}": count
+                                   for message, count in worker.errors.items()})
+        result["errors"] = dict(errors.most_common())
+        result["error_count"] = sum(errors.values())
+        result["lock_errors"] = sum(count for message, count in errors.items() if "database is locked" in message)
+        attempts = result["reads"] + result["writes"] + result["error_count"]
+        result["error_rate"] = round(result["error_count"] / attempts, 4) if attempts else 0
+        return result
+
+    def print_result(self, result):
+        self.stdout.write(
+            f"  {result['profile']:<10} 读 {result['reads_per_second']:8.1f}/秒 "
+            f"（中位 {result['read_ms_median']} ms，p95 {result['read_ms_p95']} ms）  "
+            f"写 {result['writes_per_second']:8.1f}/秒 "
+            f"（中位 {result['write_ms_median']} ms，p95 {result['write_ms_p95']} ms）  "
+            f"错误 {result['error_count']}（锁 {result['lock_errors']}，错误率 {result['error_rate']:.1%}）"
+        )
+        for message, count in result["errors"].items():
+            self.stdout.write(self.style.WARNING(f"    {count} × {message[:160]}"))
+
+    def print_comparison(self, results):
+        # 给出两边的绝对值：基线吞吐为 0（例如全部 database is locked）时倍数没有意义
+        baseline = results[0]
+        self.stdout.write(f"\n相对 {baseline['profile']}：")
+        for result in results[1:]:
+            parts = []
+            for kind in ("reads", "writes"):
+                before, after = baseline[f"{kind}_per_second"], result[f"{kind}_per_second"]
+                ratio = f"（{after / before:.2f}x）" if before else ""
+                parts.append(f"{'读' if kind == 'reads' else '写'} {before:.1f} → {after:.1f}/秒{ratio}")
+            parts.append(f"锁错误 {baseline['lock_errors']} → {result['lock_errors']}")
+            parts.append(f"错误率 {baseline['error_rate']:.1%} → {result['error_rate']:.1%}")
+            better = (
+                result["reads_per_second"] + result["writes_per_second"]
+                >= baseline["reads_per_second"] + baseline["writes_per_second"]
+                and result["error_count"] <= baseline["error_count"]
+            )
+            style = self.style.SUCCESS if better else self.style.WARNING
+            self.stdout.write(style(f"  {result['profile']}: {'，'.join(parts)}"))
+
+    def write_report(self, results, options):
+        commit = git_commit()
+        report = {
+            "meta": {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "commit": commit,
+                "database": f"sqlite {connection.Database.sqlite_version}",
+                "rows": options["rows"],
+                "readers": options["readers"],
+                "writers": options["writers"],
+                "duration": options["duration"],
+            },
+            "results": results,
+        }
+        output = options["output"] or os.path.join(
+            settings.BASE_DIR, "benchmarks",
+            f"sqlite-{datetime.now():%Y%m%d-%H%M%S}{'-' + commit if commit else ''}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"\n结果已写入 {output}"))
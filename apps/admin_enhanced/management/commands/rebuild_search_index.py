@@ -0,0 +1,39 @@
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.admin_enhanced.search import install_search_index, search_table, uninstall_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "重建 changelist 搜索索引（SQLite FTS5 影子表与触发器 / PostgreSQL pg_trgm 索引）。"
+        "SQLite 上重建表的迁移会删除触发器，之后需要运行本命令"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="app_label.ModelName（默认：所有配置了 search_index 的 ModelAdmin）",
+        )
+
+    def handle(self, *args, **options):
+        targets = []
+        for model, model_admin in admin.site._registry.items():
+            search_index = getattr(model_admin, "search_index", None)
+            if search_index is None:
+                continue
+            if options["models"] and model._meta.label not in options["models"]:
+                continue
+            targets.append((model, search_index.get_fields(model_admin)))
+        if not targets:
+            raise CommandError("没有找到配置了 search_index 的 ModelAdmin")
+
+        for model, fields in targets:
+            with connection.schema_editor() as schema_editor:
+                uninstall_search_index(schema_editor, model, fields)
+                install_search_index(schema_editor, model, fields)
+            self.stdout.write(self.style.SUCCESS(
+                f"{model._meta.label}: {search_table(model._meta.db_table)}（{', '.join(fields)}）"
+            ))
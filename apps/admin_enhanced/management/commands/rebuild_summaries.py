@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.admin_enhanced.summary import get_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "按源表全量重建汇总统计表（InstanceStat / VpcStat 等）。"
+        "原生 SQL、ignore_conflicts 的 bulk_create 等绕过信号的写入之后运行"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="源模型 app_label.ModelName（默认：所有已注册的汇总表）",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="数据库别名（默认：default）",
+        )
+
+    def handle(self, *args, **options):
+        summaries = [
+            summary for summary in get_summaries()
+            if not options["models"] or summary.source._meta.label in options["models"]
+        ]
+        if not summaries:
+            raise CommandError("没有找到已注册的汇总表")
+
+        for summary in summaries:
+            summary.rebuild(options["database"])
+            self.stdout.write(self.style.SUCCESS(
+                f"{summary.table._meta.label}: {summary.total(options['database'])} 条 "
+                f"{summary.source._meta.label}（按 {', '.join(summary.dimensions)}）"
+            ))
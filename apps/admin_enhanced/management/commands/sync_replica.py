@@ -0,0 +1,44 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.admin_enhanced.routers import get_replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        "把主库复制到本地的 SQLite 副本（DJANGO_SQLITE_REPLICA），用于在本机验证读副本路由；"
+        "--interval 大于 0 时按间隔持续复制，模拟复制延迟"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="持续复制的间隔秒数（默认：0，只复制一次）",
+        )
+
+    def handle(self, *args, **options):
+        replica = get_replica_alias()
+        if replica is None:
+            raise CommandError("没有配置读副本（设置 DJANGO_SQLITE_REPLICA）")
+        source, target = connections[DEFAULT_DB_ALIAS], connections[replica]
+        if source.vendor != "sqlite" or target.vendor != "sqlite":
+            raise CommandError("只支持 SQLite 主库与副本")
+        # 副本的其他连接不受影响：backup() 复制期间它们只是等待锁
+        target.close()
+        while True:
+            start = time.perf_counter()
+            source.ensure_connection()
+            with closing(sqlite3.connect(target.settings_dict["NAME"])) as destination:
+                source.connection.backup(destination)
+            self.stdout.write(
+                f"已复制到 {target.settings_dict['NAME']}（{(time.perf_counter() - start) * 1000:.0f} ms）"
+            )
+            if options["interval"] <= 0:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,251 @@
+"""
+Column metadata per ModelAdmin, resolved once instead of on every request.
+
+For each ModelAdmin, ModelAdminMetadata holds a Column per name used by
+list_display, fieldsets, readonly_fields and the model's own fields: its
+label, model field (or None), kind and how its value is read and
+formatted, both as an export cell and as modal text. The column selector,
+the exports and the object modal read from it, so they no longer call
+``_meta.get_field()`` in try/except blocks or compare fields by type per
+row and per request.
+
+The registry is built for every ModelAdmin of ``admin.site`` when the app
+is ready (see apps.py) and keyed by ModelAdmin instance: registering a
+model again creates a new ModelAdmin, whose metadata is built on first use,
+and the metadata of unregistered ModelAdmins goes away with them. Call
+build() to rebuild everything explicitly, e.g. after changing list_display
+at runtime.
+
+Labels stay lazy translation strings, so they follow the active language.
+"""
+import weakref
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils import timezone
+from django.utils.encoding import force_str
+from django.utils.translation import gettext
+
+# Column kinds
+ADMIN_METHOD = 'admin_method'
+ATTRIBUTE = 'attribute'
+MISSING = 'missing'
+MANY_TO_MANY = 'many_to_many'
+FOREIGN_KEY = 'foreign_key'
+CHOICES = 'choices'
+DATETIME = 'datetime'
+DATE = 'date'
+BOOLEAN = 'boolean'
+FIELD = 'field'
+
+EMPTY_DISPLAY = '-'
+
+_registry = weakref.WeakKeyDictionary()
+
+
+def _passthrough(value):
+    """Keep JSON-native values, stringify everything else."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return force_str(value)
+
+
+def _format_datetime(value):
+    # isoformat() is several times cheaper than strftime('%Y-%m-%d %H:%M:%S')
+    return None if value is None else value.isoformat(sep=' ', timespec='seconds')[:19]
+
+
+def _format_date(value):
+    return None if value is None else value.isoformat()
+
+
+def _format_related(value):
+    return None if value is None else force_str(value)
+
+
+def _format_many(manager):
+    return ', '.join([force_str(item) for item in manager.all()])
+
+
+def _choice_formatter(field):
+    display = {key: force_str(label) for key, label in field.flatchoices}
+
+    def format_choice(value):
+        if value is None:
+            return None
+        return display.get(value, value)
+    return format_choice
+
+
+def _display_text(value):
+    return EMPTY_DISPLAY if value is None else str(value)
+
+
+def _display_boolean(value):
+    return gettext('Yes') if value else gettext('No')
+
+
+def _display_datetime(value):
+    if not value:
+        return _display_text(value)
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _display_date(value):
+    return value.strftime('%Y-%m-%d') if value else _display_text(value)
+
+
+def _display_many(manager):
+    return ', '.join([str(item) for item in manager.all()]) if manager else ''
+
+
+def _missing(obj):
+    return ''
+
+
+class Column:
+    """
+    How one column of a ModelAdmin is labelled, read and formatted.
+
+    ``getter`` reads the raw value from a model instance; ``formatter``
+    turns it into a JSON-serializable export cell and ``display`` into the
+    text shown in the object modal. ``lookup`` is the values_list() path
+    when the column can be read without a model instance, otherwise None.
+    """
+
+    __slots__ = ('name', 'label', 'field', 'kind', 'getter', 'formatter', 'display',
+                 'lookup', 'related_field', 'fk_field')
+
+    def __init__(self, name, label, kind, getter, formatter, display, field=None, lookup=None,
+                 related_field=None, fk_field=None):
+        self.name = name
+        self.label = label
+        self.kind = kind
+        self.getter = getter
+        self.formatter = formatter
+        self.display = display
+        self.field = field
+        self.lookup = lookup
+        # FK field joined through select_related() when model instances are built
+        self.related_field = related_field
+        # FK field resolved through export.ForeignKeyLabels on the projected path
+        self.fk_field = fk_field
+
+    def display_value(self, obj):
+        """Text of this column for ``obj`` in the object modal."""
+        return self.display(self.getter(obj))
+
+
+def _title(name):
+    return name.replace('_', ' ').title()
+
+
+def build_column(model, model_admin, name):
+    """Decide once how ``name`` is labelled, read and formatted."""
+    if hasattr(model_admin, name):
+        # ModelAdmin method
+        method = getattr(model_admin, name)
+        label = getattr(method, 'short_description', None) or _title(name)
+        return Column(name, label, ADMIN_METHOD, method, _passthrough, _display_text)
+
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        field = None
+
+    if field is None or not getattr(field, 'concrete', False):
+        # Model property, method or reverse relation
+        if hasattr(model, name):
+            attribute = getattr(model, name)
+            label = getattr(attribute, 'short_description', None) or getattr(field, 'verbose_name', None)
+            return Column(name, label or _title(name), ATTRIBUTE, attrgetter(name), _passthrough, _display_text)
+        return Column(name, _title(name), MISSING, _missing, _passthrough, _display_text)
+
+    label = field.verbose_name or _title(name)
+    if field.many_to_many:
+        return Column(name, label, MANY_TO_MANY, attrgetter(name), _format_many, _display_many, field)
+    if isinstance(field, models.ForeignKey):
+        return Column(
+            name, label, FOREIGN_KEY, attrgetter(name), _format_related, _display_text, field,
+            lookup=field.attname, related_field=name, fk_field=field,
+        )
+    if field.flatchoices:
+        kind, formatter, display = CHOICES, _choice_formatter(field), _display_text
+    elif isinstance(field, models.DateTimeField):
+        kind, formatter, display = DATETIME, _format_datetime, _display_datetime
+    elif isinstance(field, models.DateField):
+        kind, formatter, display = DATE, _format_date, _display_date
+    elif isinstance(field, models.BooleanField):
+        kind, formatter, display = BOOLEAN, _passthrough, _display_boolean
+    else:
+        kind, formatter, display = FIELD, _passthrough, _display_text
+    return Column(name, label, kind, attrgetter(field.attname), formatter, display, field, lookup=field.attname)
+
+
+def _declared_names(model_admin):
+    """Column names a ModelAdmin declares, followed by every field of its model."""
+    names = list(model_admin.list_display or ())
+    for _name, options in model_admin.fieldsets or ():
+        for field in options.get('fields', ()):
+            names.extend(field if isinstance(field, (list, tuple)) else [field])
+    names.extend(model_admin.readonly_fields or ())
+    names.extend(
+        field.name for field in model_admin.model._meta.get_fields()
+        if field.concrete or field.many_to_many
+    )
+    return [name for name in dict.fromkeys(names) if isinstance(name, str)]
+
+
+class ModelAdminMetadata:
+    """The Columns of one ModelAdmin, by name."""
+
+    def __init__(self, model_admin):
+        self.model_admin = model_admin
+        self.model = model_admin.model
+        self.columns = {
+            name: build_column(self.model, model_admin, name) for name in _declared_names(model_admin)
+        }
+
+    def column(self, name):
+        """The Column for ``name``; names only known at request time are resolved and kept too."""
+        column = self.columns.get(name)
+        if column is None:
+            column = build_column(self.model, self.model_admin, name)
+            # Unknown names come from request parameters: do not let them grow the registry
+            if column.kind != MISSING:
+                self.columns[name] = column
+        return column
+
+    def label(self, name):
+        return self.column(name).label
+
+    def select_related(self, names):
+        """Forward foreign keys among ``names``, to join when listing objects."""
+        return [name for name in names if self.column(name).related_field]
+
+    def model_fields(self):
+        """Names of the editable-looking model fields, for admins without fieldsets."""
+        return [
+            field.name for field in self.model._meta.get_fields()
+            if isinstance(field, models.Field) and not isinstance(field, models.AutoField)
+        ]
+
+
+def get_metadata(model_admin):
+    """ModelAdminMetadata of ``model_admin``, built on first use."""
+    metadata = _registry.get(model_admin)
+    if metadata is None:
+        metadata = _registry[model_admin] = ModelAdminMetadata(model_admin)
+    return metadata
+
+
+def build(site=None):
+    """(Re)build the metadata of every ModelAdmin registered on ``site`` (admin.site by default)."""
+    if site is None:
+        from django.contrib import admin
+        site = admin.site
+    for model_admin in list(site._registry.values()):
+        _registry[model_admin] = ModelAdminMetadata(model_admin)
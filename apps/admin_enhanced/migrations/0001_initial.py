@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_label', models.CharField(max_length=100, verbose_name='App Label')),
+                ('model_name', models.CharField(max_length=100, verbose_name='Model Name')),
+                ('format_type', models.CharField(max_length=20, verbose_name='Format')),
+                ('params', models.JSONField(default=dict, help_text='提交时的筛选、搜索与列参数快照', verbose_name='Parameters')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('failure', 'Failure')], default='pending', max_length=20, verbose_name='Status')),
+                ('task_id', models.CharField(blank=True, max_length=255, verbose_name='Task ID')),
+                ('total_rows', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Total Rows')),
+                ('processed_rows', models.PositiveBigIntegerField(default=0, verbose_name='Processed Rows')),
+                ('file_name', models.CharField(blank=True, help_text='相对于 ADMIN_ENHANCED_EXPORT_ROOT 的文件名', max_length=255, verbose_name='File')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Export Job',
+                'verbose_name_plural': 'Export Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='admin_enhan_user_id_acc0de_idx'), models.Index(fields=['status'], name='admin_enhan_status_bd383a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_enhanced', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColumnPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_label', models.CharField(max_length=100, verbose_name='App Label')),
+                ('model_name', models.CharField(max_length=100, verbose_name='Model Name')),
+                ('columns', models.JSONField(default=list, help_text='按 list_display 顺序保存的可见列名', verbose_name='Columns')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='column_preferences', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Column Preference',
+                'verbose_name_plural': 'Column Preferences',
+                'constraints': [models.UniqueConstraint(fields=('user', 'app_label', 'model_name'), name='admin_enhanced_column_preference_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_enhanced', '0002_column_preference'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkEditJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_label', models.CharField(max_length=100, verbose_name='App Label')),
+                ('model_name', models.CharField(max_length=100, verbose_name='Model Name')),
+                ('values', models.JSONField(default=dict, help_text='要设置的字段与值，如 {"state": "stopped"}', verbose_name='Values')),
+                ('params', models.JSONField(default=dict, help_text='提交时的筛选、搜索与选中行参数快照', verbose_name='Parameters')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('failure', 'Failure')], default='pending', max_length=20, verbose_name='Status')),
+                ('task_id', models.CharField(blank=True, max_length=255, verbose_name='Task ID')),
+                ('total_rows', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Total Rows')),
+                ('updated_rows', models.PositiveBigIntegerField(default=0, verbose_name='Updated Rows')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bulk_edit_jobs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Bulk Edit Job',
+                'verbose_name_plural': 'Bulk Edit Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='admin_enhan_user_id_ec4b03_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,212 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class ExportJob(models.Model):
+    """后台导出任务（Celery 异步执行，结果写入本地文件）"""
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCESS = "success"
+    STATUS_FAILURE = "failure"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _("Pending")),
+        (STATUS_RUNNING, _("Running")),
+        (STATUS_SUCCESS, _("Success")),
+        (STATUS_FAILURE, _("Failure")),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="export_jobs",
+        verbose_name=_("User"),
+    )
+
+    app_label = models.CharField(_("App Label"), max_length=100)
+
+    model_name = models.CharField(_("Model Name"), max_length=100)
+
+    format_type = models.CharField(_("Format"), max_length=20)
+
+    params = models.JSONField(
+        _("Parameters"),
+        default=dict,
+        help_text=_("提交时的筛选、搜索与列参数快照"),
+    )
+
+    status = models.CharField(
+        _("Status"),
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+    )
+
+    task_id = models.CharField(_("Task ID"), max_length=255, blank=True)
+
+    total_rows = models.PositiveBigIntegerField(_("Total Rows"), null=True, blank=True)
+
+    processed_rows = models.PositiveBigIntegerField(_("Processed Rows"), default=0)
+
+    file_name = models.CharField(
+        _("File"),
+        max_length=255,
+        blank=True,
+        help_text=_("相对于 ADMIN_ENHANCED_EXPORT_ROOT 的文件名"),
+    )
+
+    error = models.TextField(_("Error"), blank=True)
+
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+
+    finished_at = models.DateTimeField(_("Finished At"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Export Job")
+        verbose_name_plural = _("Export Jobs")
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.app_label}.{self.model_name} {self.format_type} #{self.pk}"
+
+    @property
+    def progress(self):
+        """完成百分比（0-100），总行数未知时返回 None"""
+        if self.status == self.STATUS_SUCCESS:
+            return 100
+        if not self.total_rows:
+            return None
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCESS, self.STATUS_FAILURE)
+
+
+class ColumnPreference(models.Model):
+    """用户在 changelist 上选择显示的列（按用户、按模型保存）"""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="column_preferences",
+        verbose_name=_("User"),
+    )
+
+    app_label = models.CharField(_("App Label"), max_length=100)
+
+    model_name = models.CharField(_("Model Name"), max_length=100)
+
+    columns = models.JSONField(
+        _("Columns"),
+        default=list,
+        help_text=_("按 list_display 顺序保存的可见列名"),
+    )
+
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Column Preference")
+        verbose_name_plural = _("Column Preferences")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "app_label", "model_name"],
+                name="admin_enhanced_column_preference_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.app_label}.{self.model_name}"
+
+
+class BulkEditJob(models.Model):
+    """超过同步上限的批量修改（Celery 异步执行，按主键分块 UPDATE）"""
+
+    STATUS_PENDING = ExportJob.STATUS_PENDING
+    STATUS_RUNNING = ExportJob.STATUS_RUNNING
+    STATUS_SUCCESS = ExportJob.STATUS_SUCCESS
+    STATUS_FAILURE = ExportJob.STATUS_FAILURE
+
+    STATUS_CHOICES = ExportJob.STATUS_CHOICES
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="bulk_edit_jobs",
+        verbose_name=_("User"),
+    )
+
+    app_label = models.CharField(_("App Label"), max_length=100)
+
+    model_name = models.CharField(_("Model Name"), max_length=100)
+
+    values = models.JSONField(
+        _("Values"),
+        default=dict,
+        help_text=_("要设置的字段与值，如 {\"state\": \"stopped\"}"),
+    )
+
+    params = models.JSONField(
+        _("Parameters"),
+        default=dict,
+        help_text=_("提交时的筛选、搜索与选中行参数快照"),
+    )
+
+    status = models.CharField(
+        _("Status"),
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+    )
+
+    task_id = models.CharField(_("Task ID"), max_length=255, blank=True)
+
+    total_rows = models.PositiveBigIntegerField(_("Total Rows"), null=True, blank=True)
+
+    updated_rows = models.PositiveBigIntegerField(_("Updated Rows"), default=0)
+
+    error = models.TextField(_("Error"), blank=True)
+
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+
+    started_at = models.DateTimeField(_("Started At"), null=True, blank=True)
+
+    finished_at = models.DateTimeField(_("Finished At"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Bulk Edit Job")
+        verbose_name_plural = _("Bulk Edit Jobs")
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.app_label}.{self.model_name} {self.values} #{self.pk}"
+
+    @property
+    def progress(self):
+        """完成百分比（0-100），总行数未知时返回 None"""
+        if self.status == self.STATUS_SUCCESS:
+            return 100
+        if not self.total_rows:
+            return None
+        return min(100, int(self.updated_rows * 100 / self.total_rows))
+
+    @property
+    def elapsed(self):
+        """运行耗时（秒），尚未开始时返回 None"""
+        if self.started_at is None:
+            return None
+        return ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCESS, self.STATUS_FAILURE)
@@ -0,0 +1,124 @@
+"""
+Read replica routing for read-only admin traffic.
+
+ReplicaRouter sends reads to the alias named by the
+``ADMIN_ENHANCED_READ_REPLICA`` setting, but only inside replica_reads():
+changelist GETs (ReplicaReadsMixin), exports, export jobs and the object
+modal. Everything else, and every write, uses ``default``.
+
+Replicas lag behind. After a user sends a non-GET request (a save, a bulk
+action, ...) ReplicaStickinessMiddleware keeps that user's reads on
+``default`` for ``ADMIN_ENHANCED_REPLICA_STICKY_SECONDS`` so they see their
+own changes. The mark lives in the default cache: configure a shared cache
+(e.g. Redis) when web and Celery workers run in several processes.
+
+Locally, ``DJANGO_SQLITE_REPLICA=<path>`` adds an SQLite file standing in for
+the replica (see config/settings/database.py); ``manage.py sync_replica``
+copies the primary into it, once or every few seconds.
+"""
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULT_STICKY_SECONDS = 15
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Alias that reads are routed to while replica_reads() is active
+_read_alias = contextvars.ContextVar('admin_enhanced_read_alias', default=None)
+
+
+def get_replica_alias():
+    """The configured replica alias, or None when there is none."""
+    alias = getattr(settings, 'ADMIN_ENHANCED_READ_REPLICA', None)
+    return alias if alias and alias in connections.settings else None
+
+
+def get_sticky_seconds():
+    return getattr(settings, 'ADMIN_ENHANCED_REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+
+
+def _sticky_key(user):
+    return f'admin_enhanced:replica:sticky:{user.pk}'
+
+
+def mark_recent_write(user):
+    """Keep ``user``'s reads on the primary for the sticky window."""
+    seconds = get_sticky_seconds()
+    if seconds and user is not None and user.is_authenticated:
+        caches['default'].set(_sticky_key(user), True, seconds)
+
+
+def has_recent_write(user):
+    if user is None or not user.is_authenticated:
+        return False
+    return caches['default'].get(_sticky_key(user), False)
+
+
+def read_alias(user):
+    """Where read-only traffic of ``user`` goes: the replica unless they wrote recently."""
+    replica = get_replica_alias()
+    if replica is None or has_recent_write(user):
+        return DEFAULT_DB_ALIAS
+    return replica
+
+
+@contextmanager
+def replica_reads(user):
+    """Route the reads in this block to read_alias(user)."""
+    token = _read_alias.set(read_alias(user))
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def reads_from_replica(view):
+    """View decorator: GET and HEAD requests read through replica_reads()."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        with replica_reads(request.user):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Reads inside replica_reads() go to its alias; writes always go to ``default``."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Without this an object read from the replica would be saved back to it
+        return DEFAULT_DB_ALIAS if get_replica_alias() is not None else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        replica = get_replica_alias()
+        if replica is not None and {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, replica}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema and data from the primary
+        if db == get_replica_alias():
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """Mark users who sent a non-safe request as recent writers (see mark_recent_write())."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and get_replica_alias() is not None:
+            mark_recent_write(getattr(request, 'user', None))
+        return response
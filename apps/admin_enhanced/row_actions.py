@@ -0,0 +1,129 @@
+"""
+Per-request renderer for the changelist row action buttons (View / Edit / Delete).
+
+Permissions are checked once per page and URLs are reversed once with a
+placeholder pk, so each row only substitutes its pk into prebuilt HTML.
+Permissions are checked per object only when an object-level permission
+backend is installed (or the ModelAdmin asks for it).
+
+The request is kept in a context variable for the duration of
+changelist_view instead of on the shared ModelAdmin instance.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.contrib.admin.utils import quote
+from django.contrib.auth import get_backends
+from django.contrib.auth.backends import ModelBackend
+from django.urls import reverse
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext
+
+# Stands in for the pk while reversing; must satisfy the <int:object_id> converter
+PK_PLACEHOLDER = 987654321987654321
+
+_state = contextvars.ContextVar('admin_enhanced_row_actions', default=None)
+
+
+class _RequestState:
+    def __init__(self, model_admin, request):
+        self.model_admin = model_admin
+        self.request = request
+        self.renderer = None
+
+
+@contextmanager
+def activate(model_admin, request):
+    """Make ``request`` available to ``model_admin``'s row action column while rendering."""
+    token = _state.set(_RequestState(model_admin, request))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def get_renderer(model_admin):
+    """The RowActionRenderer for the current request, built on first use; None outside activate()."""
+    state = _state.get()
+    if state is None or state.model_admin is not model_admin:
+        return None
+    if state.renderer is None:
+        state.renderer = RowActionRenderer(model_admin, state.request)
+    return state.renderer
+
+
+def has_object_permission_backends():
+    """True when an auth backend other than ModelBackend (e.g. django-guardian) is installed."""
+    return any(not isinstance(backend, ModelBackend) for backend in get_backends())
+
+
+class RowActionRenderer:
+    """Render the action buttons of one changelist page for one request."""
+
+    def __init__(self, model_admin, request):
+        self.model_admin = model_admin
+        self.request = request
+        opts = model_admin.model._meta
+        app_label, model_name = opts.app_label, opts.model_name
+
+        object_permissions = getattr(model_admin, 'row_action_object_permissions', None)
+        if object_permissions is None:
+            object_permissions = has_object_permission_backends()
+        self.object_permissions = object_permissions
+        if not object_permissions:
+            self.permissions = self.get_permissions(None)
+
+        # URLs are reversed once with a placeholder pk, substituted per row in render()
+        placeholder = str(PK_PLACEHOLDER)
+        view_url = reverse('admin_enhanced:view_object_modal', args=[app_label, model_name, PK_PLACEHOLDER])
+        change_url = reverse(f'admin:{app_label}_{model_name}_change', args=[PK_PLACEHOLDER])
+        delete_url = reverse(f'admin:{app_label}_{model_name}_delete', args=[PK_PLACEHOLDER])
+        self.view_button = str(format_html(
+            '<a href="#" class="btn btn-sm btn-outline-info view-object-btn" '
+            'data-app-label="{}" data-model-name="{}" data-object-id="{}" '
+            'data-modal-url="{}">{}</a>',
+            app_label, model_name, placeholder, view_url, gettext('View'),
+        ))
+        self.change_button = str(format_html(
+            '<a href="{}" class="btn btn-sm btn-outline-primary">{}</a>',
+            change_url, gettext('Edit'),
+        ))
+        self.delete_button = str(format_html(
+            '<a href="{}" class="btn btn-sm btn-outline-danger" '
+            'onclick="return confirm(\'{}\');">{}</a>',
+            delete_url, gettext('Are you sure you want to delete this item?'), gettext('Delete'),
+        ))
+        self._templates = {}
+
+    def get_permissions(self, obj):
+        """(view, change, delete) permissions for ``obj`` (None: model-level)."""
+        model_admin, request = self.model_admin, self.request
+        return (
+            model_admin.has_view_permission(request, obj),
+            model_admin.has_change_permission(request, obj),
+            model_admin.has_delete_permission(request, obj),
+        )
+
+    def _template(self, permissions):
+        """Row HTML split at the placeholder pk, built once per permission combination."""
+        if permissions not in self._templates:
+            has_view, has_change, has_delete = permissions
+            buttons = []
+            if has_view or has_change:
+                buttons.append(self.view_button)
+            if has_change:
+                buttons.append(self.change_button)
+            if has_delete:
+                buttons.append(self.delete_button)
+            html = '<div class="action-buttons-group">{}</div>'.format(' '.join(buttons)) if buttons else None
+            self._templates[permissions] = html.split(str(PK_PLACEHOLDER)) if html else None
+        return self._templates[permissions]
+
+    def render(self, obj):
+        permissions = self.get_permissions(obj) if self.object_permissions else self.permissions
+        template = self._template(permissions)
+        if template is None:
+            return '-'
+        # The pk appears in URLs (quoted like the admin does) and a data attribute; both escaped
+        return mark_safe(escape(quote(obj.pk)).join(template))
@@ -0,0 +1,406 @@
+"""
+Indexed changelist search.
+
+A SearchIndex covers a ModelAdmin's search_fields (local fields and
+one-level foreign key paths such as ``vpc__vpc_id``):
+
+- SQLite: an FTS5 shadow table ``<db_table>_search`` with the trigram
+  tokenizer, kept in sync by triggers (so bulk_create and
+  QuerySet.update() are covered). Each search term of three or more
+  characters is a case-insensitive substring MATCH, i.e. the same result
+  as ``icontains``.
+- PostgreSQL: pg_trgm GIN indexes on ``UPPER(column)``, which is the
+  expression Django's ``icontains`` compiles to; related fields are
+  searched through an indexed subquery instead of a join.
+
+The shadow table and indexes are created by migrations, which freeze the
+SQL install_search_index() generated for the fields at the time (see
+instances/migrations/0009); rebuild_search_index uses install_search_index()
+with the current search_fields. Without them the stock admin search is used;
+each process re-checks for them every AVAILABILITY_SECONDS, so a
+migration or rebuild run elsewhere reaches running servers.
+On SQLite, a migration that rebuilds the table drops its triggers; run
+``manage.py rebuild_search_index`` afterwards. Rebuilding a related table
+(e.g. vpc_vpc for ``vpc__vpc_id``) fails while the triggers that read it
+exist: uninstall the index around it (see vpc/migrations/0005).
+
+IdentifierPattern adds an exact-match fast path in front of it: a search
+term shaped like an identifier (an instance id, an IP address) is answered
+by an equality or prefix lookup on an ordinary B-tree index.
+"""
+import re
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.text import smart_split, unescape_string_literal
+
+# The trigram tokenizer cannot match shorter terms; they fall back to icontains
+MIN_TERM_LENGTH = 3
+
+# Primary keys indexed per statement by deferred_search_index()
+BACKFILL_BATCH_SIZE = 20000
+
+# Seconds a process trusts its answer to "is the index installed?": migrate
+# and rebuild_search_index may run in another process
+AVAILABILITY_SECONDS = 10
+
+# (using, db_table) -> (available, monotonic time checked)
+_available = {}
+
+# A full IPv4 address, and the leading two or three octets of one
+IPV4_ADDRESS = r'\d{1,3}(?:\.\d{1,3}){3}'
+IPV4_PREFIX = r'\d{1,3}(?:\.\d{1,3}){1,2}\.?'
+
+
+def search_table(db_table):
+    return f'{db_table}_search'
+
+
+def _column(path):
+    return path.replace('__', '_')
+
+
+def _resolve(model, path):
+    """Return (local field, related field or None) for ``field`` or ``fk__field``."""
+    parts = path.split('__')
+    if len(parts) > 2:
+        raise ValueError(f'Search index paths can span at most one relation: {path!r}')
+    field = model._meta.get_field(parts[0])
+    if len(parts) == 1:
+        return field, None
+    if not field.many_to_one:
+        raise ValueError(f'Search index paths must follow a foreign key: {path!r}')
+    return field, field.related_model._meta.get_field(parts[1])
+
+
+def _value_sql(model, path, alias, qn):
+    """SQL for a path's value on the row ``alias`` (NEW/OLD in triggers, t in the backfill)."""
+    field, related = _resolve(model, path)
+    if related is None:
+        return f'{alias}.{qn(field.column)}'
+    related_opts = field.related_model._meta
+    return (
+        f'(SELECT r.{qn(related.column)} FROM {qn(related_opts.db_table)} r '
+        f'WHERE r.{qn(field.target_field.column)} = {alias}.{qn(field.column)})'
+    )
+
+
+def _sqlite_parts(model, fields, qn):
+    """(quoted shadow table, column list, values SQL for a row alias)."""
+    columns = ', '.join(qn(_column(path)) for path in fields)
+
+    def values(alias):
+        return ', '.join(_value_sql(model, path, alias, qn) for path in fields)
+
+    return qn(search_table(model._meta.db_table)), columns, values
+
+
+def _sqlite_backfill(model, fields, qn):
+    """INSERT ... SELECT copying the rows of ``model``'s table into the shadow table."""
+    opts = model._meta
+    qindex, columns, values = _sqlite_parts(model, fields, qn)
+    return (
+        f'INSERT INTO {qindex}(rowid, {columns}) SELECT t.{qn(opts.pk.column)}, {values("t")} '
+        f'FROM {qn(opts.db_table)} t'
+    )
+
+
+def _sqlite_insert_trigger(model, fields, qn):
+    opts = model._meta
+    qindex, columns, values = _sqlite_parts(model, fields, qn)
+    return (
+        f'CREATE TRIGGER {qn(search_table(opts.db_table) + "_ai")} AFTER INSERT ON {qn(opts.db_table)} BEGIN '
+        f'INSERT INTO {qindex}(rowid, {columns}) VALUES (NEW.{qn(opts.pk.column)}, {values("NEW")}); END'
+    )
+
+
+def _sqlite_statements(model, fields, qn):
+    opts = model._meta
+    table, pk = qn(opts.db_table), qn(opts.pk.column)
+    index = search_table(opts.db_table)
+    qindex, columns, values = _sqlite_parts(model, fields, qn)
+
+    statements = [
+        f"CREATE VIRTUAL TABLE {qindex} USING fts5({columns}, tokenize='trigram')",
+        _sqlite_backfill(model, fields, qn),
+        _sqlite_insert_trigger(model, fields, qn),
+        f'CREATE TRIGGER {qn(index + "_au")} AFTER UPDATE ON {table} BEGIN '
+        f'DELETE FROM {qindex} WHERE rowid = OLD.{pk}; '
+        f'INSERT INTO {qindex}(rowid, {columns}) VALUES (NEW.{pk}, {values("NEW")}); END',
+        f'CREATE TRIGGER {qn(index + "_ad")} AFTER DELETE ON {table} BEGIN '
+        f'DELETE FROM {qindex} WHERE rowid = OLD.{pk}; END',
+    ]
+    # Changes on the related side (e.g. a VPC renamed) update the copied values
+    for path in fields:
+        field, related = _resolve(model, path)
+        if related is None:
+            continue
+        related_table = qn(field.related_model._meta.db_table)
+        statements.append(
+            f'CREATE TRIGGER {qn(index + "_" + _column(path) + "_au")} '
+            f'AFTER UPDATE OF {qn(related.column)} ON {related_table} BEGIN '
+            f'UPDATE {qindex} SET {qn(_column(path))} = NEW.{qn(related.column)} '
+            f'WHERE rowid IN (SELECT {pk} FROM {table} '
+            f'WHERE {qn(field.column)} = NEW.{qn(field.target_field.column)}); END'
+        )
+    return statements
+
+
+def _postgres_indexes(schema_editor, model, fields):
+    """(index name, table, column) for every searched column."""
+    indexes = []
+    for path in fields:
+        field, related = _resolve(model, path)
+        if related is not None:
+            field = related
+        db_table = field.model._meta.db_table
+        name = schema_editor._create_index_name(db_table, [field.column], suffix='_trgm')
+        indexes.append((name, db_table, field.column))
+    return indexes
+
+
+def install_search_index(schema_editor, model, fields):
+    """Create the search index for ``model`` (use from a RunPython migration)."""
+    connection = schema_editor.connection
+    qn = schema_editor.quote_name
+    if connection.vendor == 'sqlite':
+        for statement in _sqlite_statements(model, fields, qn):
+            schema_editor.execute(statement, params=None)
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, db_table, column in _postgres_indexes(schema_editor, model, fields):
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {qn(name)} ON {qn(db_table)} '
+                f'USING gin ((UPPER({qn(column)}::text)) gin_trgm_ops)'
+            )
+    _available.clear()
+
+
+def uninstall_search_index(schema_editor, model, fields):
+    """Drop what install_search_index() created."""
+    connection = schema_editor.connection
+    qn = schema_editor.quote_name
+    if connection.vendor == 'sqlite':
+        index = search_table(model._meta.db_table)
+        for path in fields:
+            if _resolve(model, path)[1] is not None:
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {qn(index + "_" + _column(path) + "_au")}')
+        for suffix in ('_ai', '_au', '_ad'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {qn(index + suffix)}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {qn(index)}')
+    elif connection.vendor == 'postgresql':
+        for name, _db_table, _column_name in _postgres_indexes(schema_editor, model, fields):
+            schema_editor.execute(f'DROP INDEX IF EXISTS {qn(name)}')
+    _available.clear()
+
+
+@contextmanager
+def deferred_search_index(model, fields, using='default'):
+    """
+    Suspend indexing of inserts into ``model``'s SQLite search index for a
+    bulk load, then index the new rows in batches.
+
+    Filling the shadow table row by row from the insert trigger is several
+    times slower than a backfill with INSERT ... SELECT, which pays off once
+    the load adds a sizeable share of the table's rows (see bulkgen.py).
+    Only the insert trigger is dropped: the shadow table and the update and
+    delete triggers stay, so other processes keep searching (without the
+    rows being loaded) and their changes keep the index in sync. Afterwards
+    the trigger is recreated first, then every row above the primary key
+    seen at the start that is not indexed yet is copied in, in batches of
+    BACKFILL_BATCH_SIZE keys so concurrent writers are not locked out for
+    the whole backfill. Does nothing on other databases or when the index
+    is not installed.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or not SearchIndex(fields).is_available(model, using):
+        yield
+        return
+    qn = connection.ops.quote_name
+    opts = model._meta
+    table, pk = qn(opts.db_table), qn(opts.pk.column)
+    qindex = qn(search_table(opts.db_table))
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MAX({pk}) FROM {table}')
+        watermark = cursor.fetchone()[0] or 0
+        cursor.execute(f'DROP TRIGGER IF EXISTS {qn(search_table(opts.db_table) + "_ai")}')
+    try:
+        yield
+    finally:
+        backfill = (
+            f'{_sqlite_backfill(model, fields, qn)} WHERE t.{pk} > %s AND t.{pk} <= %s '
+            f'AND t.{pk} NOT IN (SELECT rowid FROM {qindex} WHERE rowid > %s AND rowid <= %s)'
+        )
+        with connection.cursor() as cursor:
+            # Rows inserted from here on are indexed by the trigger; earlier ones by the backfill
+            cursor.execute(_sqlite_insert_trigger(model, fields, qn))
+            cursor.execute(f'SELECT MAX({pk}) FROM {table}')
+            high = cursor.fetchone()[0] or 0
+            # One statement (one transaction in autocommit) per batch of keys
+            for start in range(watermark, high, BACKFILL_BATCH_SIZE):
+                end = start + BACKFILL_BATCH_SIZE
+                cursor.execute(backfill, [start, end, start, end])
+
+
+def search_terms(search_term):
+    """Split the search box input the same way the admin does (quoted phrases stay whole)."""
+    terms = []
+    for bit in smart_split(search_term):
+        if len(bit) > 1 and bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+            bit = unescape_string_literal(bit)
+        if bit:
+            terms.append(bit)
+    return terms
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+class SearchIndex:
+    """
+    Indexed search over ``fields`` (defaults to the ModelAdmin's search_fields).
+
+    Every term must match at least one field, like the stock admin search
+    with ``icontains`` lookups.
+    """
+
+    def __init__(self, fields=None, min_term_length=MIN_TERM_LENGTH):
+        self.fields = list(fields) if fields is not None else None
+        self.min_term_length = min_term_length
+
+    def get_fields(self, model_admin):
+        return self.fields if self.fields is not None else [
+            field.lstrip('^=@') for field in model_admin.search_fields
+        ]
+
+    def is_available(self, model, using):
+        """Whether the shadow table exists on the ``using`` database (re-checked every AVAILABILITY_SECONDS)."""
+        connection = connections[using]
+        key = (using, model._meta.db_table)
+        cached = _available.get(key)
+        if cached is not None and time.monotonic() - cached[1] < AVAILABILITY_SECONDS:
+            return cached[0]
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                    [search_table(model._meta.db_table)],
+                )
+                available = cursor.fetchone() is not None
+        else:
+            # Postgres indexes only speed up the lookups; the query is valid either way
+            available = connection.vendor == 'postgresql'
+        _available[key] = (available, time.monotonic())
+        return available
+
+    def _contains(self, model, fields, term, vendor):
+        q = Q()
+        for path in fields:
+            field, related = _resolve(model, path)
+            if related is not None and vendor == 'postgresql':
+                # Indexed subquery on the related table instead of an OR across a join
+                q |= Q(**{
+                    f'{field.name}__in': field.related_model._default_manager.filter(
+                        **{f'{related.name}__icontains': term}
+                    ).values(field.target_field.name)
+                })
+            else:
+                q |= Q(**{f'{path}__icontains': term})
+        return q
+
+    def filter(self, queryset, model_admin, search_term):
+        """Return ``queryset`` filtered by ``search_term``, or None when no index is available."""
+        model = queryset.model
+        if not self.is_available(model, queryset.db):
+            return None
+        fields = self.get_fields(model_admin)
+        terms = search_terms(search_term)
+        vendor = connections[queryset.db].vendor
+        if vendor == 'sqlite':
+            long_terms = [term for term in terms if len(term) >= self.min_term_length]
+            short_terms = [term for term in terms if len(term) < self.min_term_length]
+            if long_terms:
+                index = connections[queryset.db].ops.quote_name(search_table(model._meta.db_table))
+                match = ' AND '.join(_fts_phrase(term) for term in long_terms)
+                queryset = queryset.filter(
+                    pk__in=RawSQL(f'SELECT rowid FROM {index} WHERE {index} MATCH %s', [match])
+                )
+        else:
+            short_terms = terms
+        for term in short_terms:
+            queryset = queryset.filter(self._contains(model, fields, term, vendor))
+        return queryset
+
+
+def _prefix_upper_bound(prefix):
+    """The smallest string greater than every string starting with ``prefix``."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class IdentifierPattern:
+    """
+    Search terms matching ``regex`` (the whole term) are looked up in
+    ``fields`` with ``lookup``: 'exact' (equality) or 'prefix'.
+
+    Fields may follow one foreign key (``vpc__vpc_id``); the related table is
+    searched through a subquery so each side uses its own index. Prefix
+    lookups are a range on SQLite (LIKE cannot use an index there) and
+    ``startswith`` elsewhere. Lookups are case-sensitive, like the indexes;
+    terms that find nothing fall back to the general search.
+    """
+
+    def __init__(self, regex, fields, lookup='exact'):
+        if lookup not in ('exact', 'prefix'):
+            raise ValueError(f'Unknown identifier lookup: {lookup!r}')
+        self.regex = re.compile(regex)
+        self.fields = list(fields)
+        self.lookup = lookup
+
+    def matches(self, term):
+        return self.regex.fullmatch(term) is not None
+
+    def _lookups(self, name, term, vendor):
+        if self.lookup == 'exact':
+            return {name: term}
+        lookups = {f'{name}__startswith': term}
+        if vendor == 'sqlite':
+            lookups.update({f'{name}__gte': term, f'{name}__lt': _prefix_upper_bound(term)})
+        return lookups
+
+    def get_q(self, model, term, vendor):
+        q = Q()
+        for path in self.fields:
+            field, related = _resolve(model, path)
+            if related is None:
+                q |= Q(**self._lookups(field.name, term, vendor))
+            else:
+                q |= Q(**{
+                    f'{field.name}__in': field.related_model._default_manager.filter(
+                        **self._lookups(related.name, term, vendor)
+                    ).values(field.target_field.name)
+                })
+        return q
+
+
+def identifier_search(queryset, patterns, search_term):
+    """
+    ``queryset`` narrowed to the rows an identifier-shaped ``search_term``
+    names, or None when the term matches no pattern or finds nothing.
+    """
+    terms = search_terms(search_term)
+    if len(terms) != 1:
+        return None
+    term = terms[0]
+    vendor = connections[queryset.db].vendor
+    q = Q()
+    for pattern in patterns:
+        if pattern.matches(term):
+            q |= pattern.get_q(queryset.model, term, vendor)
+    if not q:
+        return None
+    queryset = queryset.filter(q)
+    return queryset if queryset.exists() else None
@@ -0,0 +1,227 @@
+"""
+Materialized row counts per combination of dimension values.
+
+A summary table (a SummaryCount subclass, e.g. InstanceStat) holds one row
+per (account, region, state) with the number of source rows. It is kept
+up to date incrementally:
+
+- save() and delete() through post_save / post_delete signals (an update
+  reads the row's previous dimension values in pre_save);
+- bulk_create(), update() and delete() on querysets through
+  SummaryQuerySet, which the source model's default manager must use
+  (``objects = SummaryManager()``); these apply one grouped change
+  instead of one per row.
+
+Anything that bypasses both (raw SQL, migrations, bulk_create with
+ignore_conflicts) is reconciled by ``manage.py rebuild_summaries``.
+
+Dashboards, facets and reports read grouped counts from the summary table,
+whose size depends on the number of distinct combinations, not on the
+number of source rows.
+"""
+import contextvars
+from collections import Counter
+
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import F, Sum
+from django.db.models.expressions import Combinable
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils.translation import gettext_lazy as _
+
+_registry = {}
+
+# Models whose per-row delete signals are ignored while a queryset delete() counts them in bulk
+_bulk_deleting = contextvars.ContextVar('admin_enhanced_summary_bulk_deleting', default=frozenset())
+
+
+class SummaryCount(models.Model):
+    """Base for summary tables: add the dimension fields and a unique constraint over them."""
+
+    count = models.PositiveBigIntegerField(_("Count"), default=0)
+
+    class Meta:
+        abstract = True
+
+
+def populate(source, table, dimensions, using='default'):
+    """Replace the contents of ``table`` with grouped counts of ``source`` (also usable from migrations)."""
+    rows = (
+        source._base_manager.using(using).order_by()
+        .values_list(*dimensions).annotate(summary_count=models.Count('pk'))
+    )
+    with transaction.atomic(using=using):
+        table._base_manager.using(using).all().delete()
+        table._base_manager.using(using).bulk_create(
+            [table(**dict(zip(dimensions, row[:-1])), count=row[-1]) for row in rows],
+            batch_size=500,
+        )
+
+
+class Summary:
+    """Maintains and reads ``table``, the counts of ``source`` per ``dimensions``."""
+
+    def __init__(self, source, table, dimensions):
+        self.source = source
+        self.table = table
+        self.dimensions = list(dimensions)
+
+    def key(self, obj):
+        return tuple(getattr(obj, name) for name in self.dimensions)
+
+    def apply(self, deltas, using=None):
+        """Add ``deltas`` ({dimension values: change in rows}) to the table."""
+        using = using or router.db_for_write(self.table)
+        manager = self.table._base_manager.using(using)
+        with transaction.atomic(using=using):
+            for key, delta in deltas.items():
+                if not delta:
+                    continue
+                lookup = dict(zip(self.dimensions, key))
+                if manager.filter(**lookup).update(count=F('count') + delta):
+                    continue
+                try:
+                    with transaction.atomic(using=using):
+                        manager.create(**lookup, count=max(delta, 0))
+                except IntegrityError:
+                    # Created concurrently: apply the delta to that row
+                    manager.filter(**lookup).update(count=F('count') + delta)
+
+    def rebuild(self, using=None):
+        populate(self.source, self.table, self.dimensions, using or router.db_for_write(self.table))
+
+    def rows(self, fields=None, using=None, **filters):
+        """[(value of each of ``fields``, ..., count)], summed over the other dimensions."""
+        fields = list(fields or self.dimensions)
+        return [
+            tuple(row) for row in
+            self.table._base_manager.using(using or router.db_for_read(self.table))
+            .filter(**filters, count__gt=0).order_by(*fields)
+            .values_list(*fields).annotate(summary_count=Sum('count'))
+        ]
+
+    def counts(self, by, using=None, **filters):
+        """{value of ``by``: count}, e.g. counts('account', state='running')."""
+        return {row[0]: row[1] for row in self.rows([by], using, **filters)}
+
+    def total(self, using=None, **filters):
+        manager = self.table._base_manager.using(using or router.db_for_read(self.table))
+        return manager.filter(**filters).aggregate(total=Sum('count'))['total'] or 0
+
+    def covers(self, queryset, fields):
+        """Whether counts of ``queryset`` grouped by ``fields`` can be read from the table."""
+        return (
+            queryset.model is self.source
+            and set(fields) <= set(self.dimensions)
+            and not queryset.query.has_filters()
+        )
+
+
+def register(source, table, dimensions):
+    """Maintain ``table`` for ``source`` (call from AppConfig.ready())."""
+    summary = _registry[source] = Summary(source, table, dimensions)
+    uid = f'admin_enhanced.summary:{source._meta.label_lower}'
+    pre_save.connect(_remember_previous_key, sender=source, dispatch_uid=uid)
+    post_save.connect(_count_saved, sender=source, dispatch_uid=uid)
+    post_delete.connect(_count_deleted, sender=source, dispatch_uid=uid)
+    return summary
+
+
+def get_summary(model):
+    return _registry.get(model)
+
+
+def get_summaries():
+    return list(_registry.values())
+
+
+def _remember_previous_key(sender, instance, raw, using, update_fields, **kwargs):
+    summary = _registry[sender]
+    instance._summary_previous_key = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(summary.dimensions):
+        instance._summary_previous_key = summary.key(instance)
+        return
+    instance._summary_previous_key = (
+        sender._base_manager.using(using).filter(pk=instance.pk).values_list(*summary.dimensions).first()
+    )
+
+
+def _count_saved(sender, instance, created, raw, using, **kwargs):
+    summary = _registry[sender]
+    key = summary.key(instance)
+    previous = getattr(instance, '_summary_previous_key', None)
+    if created or previous is None:
+        summary.apply({key: 1}, using)
+    elif previous != key:
+        summary.apply({previous: -1, key: 1}, using)
+
+
+def _count_deleted(sender, instance, using, **kwargs):
+    if sender in _bulk_deleting.get():
+        return
+    summary = _registry[sender]
+    summary.apply({summary.key(instance): -1}, using)
+
+
+class SummaryQuerySet(models.QuerySet):
+    """QuerySet whose bulk_create(), update() and delete() keep the model's summary table in step."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        summary = get_summary(self.model)
+        objs = list(objs)
+        if summary is None:
+            return super().bulk_create(objs, *args, **kwargs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+                # Which rows were inserted is unknown
+                summary.rebuild(self.db)
+            else:
+                summary.apply(Counter(summary.key(obj) for obj in objs), self.db)
+        return created
+
+    def update(self, **kwargs):
+        summary = get_summary(self.model)
+        changed = [name for name in kwargs if summary is not None and name in summary.dimensions]
+        if not changed:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            if any(isinstance(kwargs[name], Combinable) for name in changed):
+                rows = super().update(**kwargs)
+                summary.rebuild(self.db)
+                return rows
+            # New values are constants: each group moves to its key with those values replaced
+            deltas = Counter()
+            for key, count in self._summary_groups(summary):
+                new_key = tuple(kwargs.get(name, value) for name, value in zip(summary.dimensions, key))
+                deltas[key] -= count
+                deltas[new_key] += count
+            rows = super().update(**kwargs)
+            summary.apply(deltas, self.db)
+        return rows
+
+    def delete(self):
+        summary = get_summary(self.model)
+        if summary is None:
+            return super().delete()
+        with transaction.atomic(using=self.db):
+            deltas = Counter({key: -count for key, count in self._summary_groups(summary)})
+            token = _bulk_deleting.set(_bulk_deleting.get() | {self.model})
+            try:
+                result = super().delete()
+            finally:
+                _bulk_deleting.reset(token)
+            summary.apply(deltas, self.db)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def _summary_groups(self, summary):
+        """[(dimension values, rows)] of this queryset."""
+        rows = self.order_by().values_list(*summary.dimensions).annotate(summary_count=models.Count('pk'))
+        return [(tuple(row[:-1]), row[-1]) for row in rows]
+
+
+SummaryManager = models.Manager.from_queryset(SummaryQuerySet)
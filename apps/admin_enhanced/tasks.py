@@ -0,0 +1,120 @@
+"""
+Celery tasks for admin_enhanced: background export and bulk-edit jobs.
+"""
+import os
+import traceback
+
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin
+from django.utils import timezone
+from django.utils.encoding import force_str
+
+from . import bulk_edit, export, routers
+from .models import BulkEditJob, ExportJob
+
+
+def get_export_root():
+    """Directory for export job files (created on demand)."""
+    root = settings.ADMIN_ENHANCED_EXPORT_ROOT
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+@shared_task(bind=True)
+def run_export_job(self, job_id):
+    """
+    Run an ExportJob: rebuild the changelist queryset from the parameter
+    snapshot and write the file in chunks, reporting progress as it goes.
+    """
+    job = ExportJob.objects.select_related('user').get(pk=job_id)
+    ExportJob.objects.filter(pk=job_id).update(status=ExportJob.STATUS_RUNNING, task_id=self.request.id or '')
+    report_state = not (self.request.called_directly or self.request.is_eager)
+
+    try:
+        model = apps.get_model(job.app_label, job.model_name)
+        model_admin = admin.site._registry[model]
+        request = export.rebuild_request(job.params, job.user)
+        # Read from the replica unless the user saved something moments ago (see routers.py)
+        with routers.replica_reads(job.user):
+            queryset = export.build_export_queryset(request, model, model_admin)
+            queryset = queryset.using(queryset.db)
+        plan = export.ExportPlan(model, model_admin, export.get_export_columns(request, model_admin))
+
+        total = queryset.count()
+        ExportJob.objects.filter(pk=job_id).update(total_rows=total)
+
+        def progress(processed):
+            ExportJob.objects.filter(pk=job_id).update(processed_rows=processed)
+            if report_state:
+                self.update_state(state='PROGRESS', meta={'job_id': job_id, 'processed': processed, 'total': total})
+
+        rows = export.iter_counted(plan.iter_rows(queryset), progress)
+        extension = export.STREAM_FORMATS[job.format_type][2]
+        file_name = f'{job.app_label}_{job.model_name}_{job.pk}.{extension}'
+        export.write_export_file(
+            os.path.join(get_export_root(), file_name),
+            rows,
+            plan.labels,
+            job.format_type,
+            title=force_str(model._meta.verbose_name_plural),
+        )
+
+        ExportJob.objects.filter(pk=job_id).update(
+            status=ExportJob.STATUS_SUCCESS,
+            file_name=file_name,
+            finished_at=timezone.now(),
+        )
+        return {'job_id': job_id, 'file_name': file_name, 'total': total}
+    except Exception:
+        ExportJob.objects.filter(pk=job_id).update(
+            status=ExportJob.STATUS_FAILURE,
+            error=traceback.format_exc(),
+            finished_at=timezone.now(),
+        )
+        raise
+
+
+@shared_task(bind=True)
+def run_bulk_edit_job(self, job_id):
+    """
+    Run a BulkEditJob: rebuild the selection from the parameter snapshot
+    and update it chunk by chunk (see bulk_edit.run_update()), reporting
+    progress as it goes.
+    """
+    job = BulkEditJob.objects.select_related('user').get(pk=job_id)
+    BulkEditJob.objects.filter(pk=job_id).update(
+        status=BulkEditJob.STATUS_RUNNING, task_id=self.request.id or '', started_at=timezone.now(),
+    )
+    report_state = not (self.request.called_directly or self.request.is_eager)
+
+    try:
+        model = apps.get_model(job.app_label, job.model_name)
+        model_admin = admin.site._registry[model]
+        request = export.rebuild_request(job.params, job.user)
+        queryset = export.build_export_queryset(request, model, model_admin)
+
+        total = queryset.count()
+        BulkEditJob.objects.filter(pk=job_id).update(total_rows=total)
+
+        def progress(updated):
+            BulkEditJob.objects.filter(pk=job_id).update(updated_rows=updated)
+            if report_state:
+                self.update_state(state='PROGRESS', meta={'job_id': job_id, 'updated': updated, 'total': total})
+
+        updated = bulk_edit.run_update(queryset, job.values, progress=progress)
+
+        BulkEditJob.objects.filter(pk=job_id).update(
+            status=BulkEditJob.STATUS_SUCCESS,
+            updated_rows=updated,
+            finished_at=timezone.now(),
+        )
+        return {'job_id': job_id, 'updated': updated, 'total': total}
+    except Exception:
+        BulkEditJob.objects.filter(pk=job_id).update(
+            status=BulkEditJob.STATUS_FAILURE,
+            error=traceback.format_exc(),
+            finished_at=timezone.now(),
+        )
+        raise
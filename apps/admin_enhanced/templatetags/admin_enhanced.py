@@ -1,5 +1,11 @@
 from django import template
+from django.contrib import admin
 from django.contrib.admin.helpers import AdminForm
+from django.urls import NoReverseMatch, reverse
+
+from ..columns import FIXED_COLUMNS
+from ..metadata import get_metadata
+from ..summary import get_summaries
 
 register = template.Library()
 
@@ -51,49 +57,39 @@ def get_admin_version():
     return django.get_version()
 
 
-@register.inclusion_tag('admin/column_selector.html', takes_context=False)
-def column_selector(cl):
+@register.inclusion_tag('admin/column_selector.html', takes_context=True)
+def column_selector(context, cl):
     """
     Inclusion tag for column selector dropdown.
     Prepares context for column_selector.html template.
+    
+    Offers every column of the ModelAdmin; cl.list_display only holds the
+    columns the user selected (see ColumnSelectionMixin).
     """
     if not cl.list_display:
         return {'cl': cl}
     
-    # Filter out action_checkbox and action_buttons from list_display
-    list_display_filtered = [field for field in cl.list_display if field not in ['action_checkbox', 'action_buttons']]
+    request = context.get('request')
+    get_available = getattr(cl.model_admin, 'get_available_list_display', None)
+    all_columns = list(get_available(request)) if get_available and request is not None else list(cl.list_display)
     
-    # Build header map for column headers
-    header_map = {}
-    field_to_original_index = {}
+    # Filter out action_checkbox and action_buttons from list_display
+    list_display_filtered = [field for field in all_columns if field not in FIXED_COLUMNS]
+    selected_columns = [field for field in cl.list_display if field not in FIXED_COLUMNS]
     
-    for idx, field_name in enumerate(cl.list_display):
-        if field_name not in ['action_checkbox', 'action_buttons']:
-            # Get the display text for this field
-            try:
-                if hasattr(cl.model_admin, field_name):
-                    method = getattr(cl.model_admin, field_name)
-                    display_text = getattr(method, 'short_description', None) or field_name.replace('_', ' ').title()
-                elif hasattr(cl.model, field_name):
-                    field = cl.model._meta.get_field(field_name)
-                    display_text = field.verbose_name or field_name.replace('_', ' ').title()
-                else:
-                    display_text = field_name.replace('_', ' ').title()
-            except Exception:
-                display_text = field_name.replace('_', ' ').title()
-            
-            filtered_idx = list_display_filtered.index(field_name)
-            header_map[filtered_idx] = {
-                'display_text': display_text,
-                'field_name': field_name
-            }
-            field_to_original_index[field_name] = idx
+    # Header labels were resolved when the app loaded (see metadata.py)
+    metadata = get_metadata(cl.model_admin)
+    header_map = {
+        index: {'display_text': metadata.label(field_name), 'field_name': field_name}
+        for index, field_name in enumerate(list_display_filtered)
+    }
     
     return {
         'cl': cl,
         'list_display_filtered': list_display_filtered,
         'header_map': header_map,
-        'field_to_original_index': field_to_original_index,
+        'selected_columns': selected_columns,
+        'has_saved_columns': get_available is not None and selected_columns != list_display_filtered,
     }
 
 
@@ -105,3 +101,47 @@ def export_selector(cl):
     return {
         'cl': cl,
     }
+
+
+@register.simple_tag(takes_context=True)
+def dashboard_summaries(context):
+    """
+    Dashboard cards from the summary tables (see summary.py), one query each.
+
+    Each entry has the model's total and a table of counts with the first
+    dimension as rows (account) and the last one as columns (state/region).
+    Models the user cannot view are skipped.
+    """
+    request = context.get('request')
+    cards = []
+    for summary in get_summaries():
+        model = summary.source
+        opts = model._meta
+        model_admin = admin.site._registry.get(model)
+        if model_admin is None or request is None or not model_admin.has_view_or_change_permission(request):
+            continue
+        row_field, column_field = summary.dimensions[0], summary.dimensions[-1]
+        counts = {(row, column): count for row, column, count in summary.rows([row_field, column_field])}
+        field = opts.get_field(column_field)
+        labels = dict(field.flatchoices)
+        if field.flatchoices:
+            column_values = [value for value, _label in field.flatchoices]
+        else:
+            column_values = sorted({column for _row, column in counts})
+        rows = []
+        for row in sorted({row for row, _column in counts}):
+            values = [counts.get((row, column), 0) for column in column_values]
+            rows.append({'label': row, 'counts': values, 'total': sum(values)})
+        try:
+            url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        except NoReverseMatch:
+            url = None
+        cards.append({
+            'title': opts.verbose_name_plural,
+            'total': sum(counts.values()),
+            'url': url,
+            'row_title': opts.get_field(row_field).verbose_name,
+            'columns': [labels.get(value, value) for value in column_values],
+            'rows': rows,
+        })
+    return cards
@@ -7,6 +7,28 @@ from . import views
 app_name = 'admin_enhanced'
 
 urlpatterns = [
+    # Job URLs come first: jobs/<id>/download/ would otherwise match the export pattern
+    path(
+        'jobs/<int:job_id>/',
+        views.export_job_status,
+        name='export_job_status'
+    ),
+    path(
+        'jobs/<int:job_id>/download/',
+        views.export_job_download,
+        name='export_job_download'
+    ),
+    path(
+        'jobs/bulk-edit/<int:job_id>/',
+        views.bulk_edit_job_status,
+        name='bulk_edit_job_status'
+    ),
+    # Also ahead of the export pattern, which would match columns/<app>/<model>/
+    path(
+        'columns/<str:app_label>/<str:model_name>/',
+        views.save_column_selection,
+        name='save_column_selection'
+    ),
     path(
         '<str:app_label>/<str:model_name>/<str:format_type>/',
         views.export_changelist,
@@ -17,4 +39,9 @@ urlpatterns = [
         views.view_object_modal,
         name='view_object_modal'
     ),
+    path(
+        '<str:app_label>/<str:model_name>/<int:object_id>/related/<str:relation>/',
+        views.view_object_related,
+        name='view_object_related'
+    ),
 ]
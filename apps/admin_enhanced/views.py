@@ -1,25 +1,43 @@
 """
 Export views for admin changelist.
 """
-import json
-from django.http import HttpResponse, JsonResponse
+import os
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.views.decorators.http import require_POST
 from django.contrib import admin
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.translation import gettext_lazy as _, gettext
-from django.db import models
 from django.template.loader import render_to_string
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.encoding import force_str
+
+from . import export, modal
+from .columns import FIXED_COLUMNS, save_column_preference
+from .metadata import get_metadata
+from .models import BulkEditJob, ExportJob
+from .routers import reads_from_replica
+from .row_actions import has_object_permission_backends
 
 
 @staff_member_required
+@reads_from_replica
 def export_changelist(request, app_label, model_name, format_type):
     """
-    Export changelist data to Excel or JSON.
+    Export changelist data to Excel, JSON, NDJSON or CSV.
+    
+    Every format is streamed chunk by chunk (see export.py and xlsx.py),
+    so memory use does not grow with the number of rows.
     
     Args:
         app_label: The app label of the model
         model_name: The model name
-        format_type: 'excel' or 'json'
+        format_type: 'excel', 'json', 'ndjson' or 'csv'
     """
     try:
         # Get the model from Django's app registry
@@ -35,243 +53,156 @@ def export_changelist(request, app_label, model_name, format_type):
         
         model_admin = admin.site._registry[model]
         
-        # Get the queryset using ModelAdmin's get_queryset method
-        # This respects the ModelAdmin's custom queryset filtering
-        queryset = model_admin.get_queryset(request)
-        
-        # Apply search filter if present
-        search_term = request.GET.get('q', '').strip()
-        if search_term and model_admin.search_fields:
-            from django.db.models import Q
-            search_q = Q()
-            for field_name in model_admin.search_fields:
-                if '__' in field_name:
-                    # Related field search
-                    search_q |= Q(**{f"{field_name}__icontains": search_term})
-                else:
-                    # Direct field search
-                    search_q |= Q(**{f"{field_name}__icontains": search_term})
-            queryset = queryset.filter(search_q)
-        
-        # Apply list filters from request parameters
-        # Django admin filters are passed as query parameters
-        for key, value in request.GET.items():
-            if key in ['q', 'page', 'o', '_changelist_filters', 'columns[]', 'selected_ids[]']:
-                continue
-            if value:
-                try:
-                    # Try to apply the filter
-                    if '__' in key:
-                        queryset = queryset.filter(**{key: value})
-                    elif hasattr(model, key):
-                        queryset = queryset.filter(**{key: value})
-                except Exception:
-                    # Skip invalid filters
-                    pass
-        
-        # Get selected rows (if any)
-        selected_ids = request.GET.getlist('selected_ids[]')
-        if selected_ids:
-            queryset = queryset.filter(pk__in=selected_ids)
-        
-        # Get selected columns
-        selected_columns = request.GET.getlist('columns[]')
-        if not selected_columns:
-            # Use list_display if no columns specified
-            selected_columns = list(model_admin.list_display) if model_admin.list_display else []
+        if format_type not in export.STREAM_FORMATS:
+            return JsonResponse({'error': str(_('Invalid format type'))}, status=400)
         
-        # Remove action_checkbox and action_buttons if present
-        selected_columns = [col for col in selected_columns if col not in ['action_checkbox', 'action_buttons']]
+        # Job mode: snapshot the parameters and let a Celery worker write the file
+        if request.GET.get('mode') == 'job':
+            return enqueue_export_job(request, app_label, model_name, format_type)
         
-        # Get field labels (ensure all are strings, not translation proxies)
-        from django.utils.encoding import force_str
-        field_labels = {}
-        for field_name in selected_columns:
-            if hasattr(model_admin, field_name):
-                # Custom method
-                method = getattr(model_admin, field_name)
-                label = getattr(method, 'short_description', None)
-                if label:
-                    field_labels[field_name] = force_str(label)
-                else:
-                    field_labels[field_name] = field_name.replace('_', ' ').title()
-            elif hasattr(model, field_name):
-                # Model field
-                try:
-                    field = model._meta.get_field(field_name)
-                    if field.verbose_name:
-                        field_labels[field_name] = force_str(field.verbose_name)
-                    else:
-                        field_labels[field_name] = field_name.replace('_', ' ').title()
-                except Exception:
-                    field_labels[field_name] = field_name.replace('_', ' ').title()
-            else:
-                field_labels[field_name] = field_name.replace('_', ' ').title()
+        # Queryset respects ModelAdmin.get_queryset, search, list filters and selected rows
+        queryset = export.build_export_queryset(request, model, model_admin)
+        # Rows stream after the view returns: pin the database routed to now (the replica, see routers.py)
+        queryset = queryset.using(queryset.db)
+        # Column plan: labels and formatters come from the ModelAdmin's metadata (see metadata.py)
+        plan = export.ExportPlan(model, model_admin, export.get_export_columns(request, model_admin))
+        rows = plan.iter_rows(queryset)
         
-        # Prepare data
-        from django.utils.encoding import force_str
-        data_rows = []
-        for obj in queryset:
-            row = {}
-            for field_name in selected_columns:
-                try:
-                    if hasattr(model_admin, field_name):
-                        # Custom method
-                        value = getattr(model_admin, field_name)(obj)
-                        # Convert to JSON-serializable type
-                        if value is None:
-                            row[field_name] = None
-                        elif isinstance(value, (str, int, float, bool)):
-                            row[field_name] = value
-                        elif isinstance(value, models.Model):
-                            row[field_name] = force_str(value)
-                        else:
-                            # Convert any other type to string
-                            row[field_name] = force_str(value)
-                    elif hasattr(obj, field_name):
-                        # Model field
-                        try:
-                            field = model._meta.get_field(field_name)
-                        except Exception:
-                            field = None
-                        
-                        value = getattr(obj, field_name)
-                        if value is None:
-                            row[field_name] = None
-                        elif field and isinstance(field, models.ForeignKey):
-                            row[field_name] = force_str(value)
-                        elif field and isinstance(field, models.ManyToManyField):
-                            row[field_name] = ', '.join([force_str(item) for item in value.all()])
-                        elif field and isinstance(field, models.DateTimeField):
-                            row[field_name] = value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
-                        elif field and isinstance(field, models.DateField):
-                            row[field_name] = value.strftime('%Y-%m-%d') if value else ''
-                        elif isinstance(value, (str, int, float, bool)):
-                            row[field_name] = value
-                        else:
-                            row[field_name] = force_str(value)
-                    else:
-                        row[field_name] = ''
-                except Exception as e:
-                    row[field_name] = f'Error: {str(e)}'
-            data_rows.append(row)
-        
-        # Export based on format
         # Ensure model_name is a string, not a translation proxy
         model_name_str = force_str(model._meta.verbose_name_plural)
-        if format_type == 'json':
-            return export_json(data_rows, field_labels, model_name_str)
-        elif format_type == 'excel':
-            return export_excel(data_rows, field_labels, model_name_str)
-        else:
-            return JsonResponse({'error': str(_('Invalid format type'))}, status=400)
+        return export.streaming_export_response(rows, plan.labels, model_name_str, format_type)
             
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def export_json(data_rows, field_labels, model_name):
-    """Export data to JSON format."""
-    from django.utils.encoding import force_str
-    # Use field labels as keys
-    result = []
-    for row in data_rows:
-        labeled_row = {}
-        for field_name, value in row.items():
-            label = field_labels.get(field_name, field_name)
-            # Ensure label is a string
-            label_str = force_str(label) if label else str(field_name)
-            # Ensure value is JSON-serializable
-            if value is None:
-                labeled_row[label_str] = None
-            elif isinstance(value, (str, int, float, bool)):
-                labeled_row[label_str] = value
-            else:
-                # Convert to string for any other type
-                labeled_row[label_str] = force_str(value)
-        result.append(labeled_row)
+def enqueue_export_job(request, app_label, model_name, format_type):
+    """Create an ExportJob from the current request and queue it on Celery."""
+    from .tasks import run_export_job
     
-    response = HttpResponse(
-        json.dumps(result, ensure_ascii=False, indent=2),
-        content_type='application/json; charset=utf-8'
+    job = ExportJob.objects.create(
+        user=request.user,
+        app_label=app_label,
+        model_name=model_name,
+        format_type=format_type,
+        params=export.snapshot_params(request),
     )
-    model_name_str = force_str(model_name) if model_name else 'export'
-    response['Content-Disposition'] = f'attachment; filename="{model_name_str}_export.json"'
-    return response
+    transaction.on_commit(lambda: run_export_job.delay(job.pk))
+    job.refresh_from_db()
+    return JsonResponse(export_job_payload(job), status=202)
 
 
-def export_excel(data_rows, field_labels, model_name):
-    """Export data to Excel format."""
-    try:
-        import openpyxl
-        from openpyxl.styles import Font, Alignment
-        from openpyxl.utils import get_column_letter
-    except ImportError:
-        # Fallback to CSV if openpyxl not available
-        # Note: Install openpyxl for Excel export: pip install openpyxl
-        return export_csv(data_rows, field_labels, model_name)
-    
-    # Create workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = str(model_name)[:31]  # Excel sheet name limit
-    
-    # Write headers
-    headers = [field_labels.get(field_name, field_name) for field_name in data_rows[0].keys()] if data_rows else []
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-    
-    # Write data
-    for row_idx, row in enumerate(data_rows, start=2):
-        for col_idx, field_name in enumerate(row.keys(), start=1):
-            ws.cell(row=row_idx, column=col_idx, value=row[field_name])
-    
-    # Auto-adjust column widths
-    for col_idx, header in enumerate(headers, start=1):
-        max_length = len(str(header))
-        for row_idx in range(2, len(data_rows) + 2):
-            cell_value = str(ws.cell(row=row_idx, column=col_idx).value or '')
-            if len(cell_value) > max_length:
-                max_length = len(cell_value)
-        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 2, 50)
+def export_job_payload(job):
+    """JSON representation of an ExportJob for the status endpoint."""
+    return {
+        'job_id': job.pk,
+        'status': job.status,
+        'processed_rows': job.processed_rows,
+        'total_rows': job.total_rows,
+        'progress': job.progress,
+        'error': job.error.strip().splitlines()[-1] if job.error else '',
+        'status_url': reverse('admin_enhanced:export_job_status', args=[job.pk]),
+        'download_url': (
+            reverse('admin_enhanced:export_job_download', args=[job.pk])
+            if job.status == ExportJob.STATUS_SUCCESS else None
+        ),
+    }
+
+
+def get_export_job(request, job_id):
+    """Return the job if the user owns it (superusers see all jobs), else 404."""
+    jobs = ExportJob.objects.all()
+    if not request.user.is_superuser:
+        jobs = jobs.filter(user=request.user)
+    return get_object_or_404(jobs, pk=job_id)
+
+
+@staff_member_required
+def export_job_status(request, job_id):
+    """Return progress of a background export job as JSON."""
+    return JsonResponse(export_job_payload(get_export_job(request, job_id)))
+
+
+@staff_member_required
+def export_job_download(request, job_id):
+    """Download the file written by a finished export job."""
+    from .tasks import get_export_root
     
-    # Save to response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="{model_name}_export.xlsx"'
-    wb.save(response)
-    return response
+    job = get_export_job(request, job_id)
+    if job.status != ExportJob.STATUS_SUCCESS or not job.file_name:
+        raise Http404(_('Export file is not ready'))
+    path = os.path.join(get_export_root(), os.path.basename(job.file_name))
+    if not os.path.exists(path):
+        raise Http404(_('Export file not found'))
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=job.file_name)
+
+
+def bulk_edit_job_payload(job):
+    """JSON representation of a BulkEditJob for the status endpoint."""
+    return {
+        'job_id': job.pk,
+        'status': job.status,
+        'updated_rows': job.updated_rows,
+        'total_rows': job.total_rows,
+        'progress': job.progress,
+        'elapsed': job.elapsed,
+        'error': job.error.strip().splitlines()[-1] if job.error else '',
+        'status_url': reverse('admin_enhanced:bulk_edit_job_status', args=[job.pk]),
+    }
+
+
+@staff_member_required
+def bulk_edit_job_status(request, job_id):
+    """Return progress of a background bulk edit as JSON (owners and superusers only)."""
+    jobs = BulkEditJob.objects.all()
+    if not request.user.is_superuser:
+        jobs = jobs.filter(user=request.user)
+    return JsonResponse(bulk_edit_job_payload(get_object_or_404(jobs, pk=job_id)))
 
 
-def export_csv(data_rows, field_labels, model_name):
-    """Fallback CSV export if openpyxl not available."""
-    import csv
-    import io
+@staff_member_required
+@require_POST
+def save_column_selection(request, app_label, model_name):
+    """
+    Save the columns chosen in the column selector for the current user.
     
-    output = io.StringIO()
-    writer = csv.writer(output)
+    POST columns[]: visible column names in any order; an empty list resets
+    the changelist to the ModelAdmin's list_display.
+    """
+    from django.apps import apps
+    try:
+        model = apps.get_model(app_label, model_name)
+    except LookupError:
+        return JsonResponse({'error': str(_('Model not found'))}, status=404)
+    if model not in admin.site._registry:
+        return JsonResponse({'error': str(_('ModelAdmin not found'))}, status=404)
     
-    # Write headers
-    if data_rows:
-        headers = [field_labels.get(field_name, field_name) for field_name in data_rows[0].keys()]
-        writer.writerow(headers)
-        
-        # Write data
-        for row in data_rows:
-            writer.writerow([row.get(field_name, '') for field_name in data_rows[0].keys()])
+    model_admin = admin.site._registry[model]
+    if not model_admin.has_view_or_change_permission(request):
+        return JsonResponse({'error': str(_('Permission denied'))}, status=403)
     
-    response = HttpResponse(output.getvalue(), content_type='text/csv; charset=utf-8')
-    response['Content-Disposition'] = f'attachment; filename="{model_name}_export.csv"'
-    return response
+    get_available = getattr(model_admin, 'get_available_list_display', model_admin.get_list_display)
+    available = [name for name in get_available(request) if name not in FIXED_COLUMNS]
+    requested = set(request.POST.getlist('columns[]'))
+    unknown = requested.difference(available)
+    if unknown:
+        return JsonResponse({'error': gettext('Unknown columns: %s') % ', '.join(sorted(unknown))}, status=400)
+    
+    # Store in list_display order so the saved preference is stable
+    columns = [name for name in available if name in requested]
+    save_column_preference(request, model._meta, columns)
+    return JsonResponse({'columns': columns})
 
 
 @staff_member_required
+@reads_from_replica
 def view_object_modal(request, app_label, model_name, object_id):
     """
     Return readonly HTML content for modal view.
+    
+    The object is loaded with its foreign keys in one query and the
+    fragment is cached per object version and permission set (see
+    modal.py); related lists are loaded page by page by the modal.
     """
     from django.utils.translation import gettext as _
     
@@ -298,82 +229,66 @@ def view_object_modal(request, app_label, model_name, object_id):
         return return_error_html(_('ModelAdmin not found'), 404)
     
     model_admin = admin.site._registry[model]
+    queryset = model_admin.get_queryset(request)
+    
+    # Without object-level permissions the model-level check decides, so a
+    # cached fragment can be served before the object is loaded
+    object_permissions = has_object_permission_backends()
+    if not object_permissions and not model_admin.has_view_or_change_permission(request):
+        return return_error_html(_('Permission denied'), 403)
+    
+    cache = caches['default']
+    cache_timeout = modal.get_cache_timeout()
+    key = None
+    if cache_timeout and not object_permissions and modal.has_version_field(model):
+        lookups = modal.version_fields(model, model_admin.get_fieldsets(request))
+        versions = queryset.filter(pk=object_id).values_list(*lookups).first()
+        if versions is None:
+            return return_error_html(_('Object not found'), 404)
+        key = modal.cache_key(model, object_id, versions, request.user)
+        if request.headers.get('If-None-Match') == modal.etag(key):
+            return HttpResponseNotModified()
+        html = cache.get(key)
+        if html is not None:
+            return _modal_response(html, key)
     
     try:
-        # Get the object
-        obj = get_object_or_404(model, pk=object_id)
+        # Get the object, joining the foreign keys shown in the modal
+        select_related = modal.select_related_fields(model, model_admin.get_fieldsets(request))
+        obj = queryset.select_related(*select_related).filter(pk=object_id).first()
     except Exception as e:
         return return_error_html(f'Error loading object: {str(e)}', 500)
+    if obj is None:
+        return return_error_html(_('Object not found'), 404)
     
     # Check permissions
     try:
-        has_view_permission = getattr(model_admin, 'has_view_permission', None)
-        if has_view_permission:
-            has_perm = has_view_permission(request, obj)
-        else:
-            has_perm = model_admin.has_change_permission(request, obj)
-        
-        if not has_perm:
+        if not model_admin.has_view_or_change_permission(request, obj):
             return return_error_html(_('Permission denied'), 403)
     except Exception as e:
         return return_error_html(f'Permission check error: {str(e)}', 500)
     
     try:
-        # Use a simpler approach: directly use Django admin's changeform_view with readonly mode
-        # Create a temporary request with readonly=1 parameter
-        from django.test import RequestFactory
-        from copy import copy
-        
         # Get fieldsets from ModelAdmin
         fieldsets = model_admin.get_fieldsets(request, obj)
+        metadata = get_metadata(model_admin)
         if not fieldsets:
             # If no fieldsets defined, get all fields
-            from django.db import models as db_models
-            model_fields = []
-            for field in model._meta.get_fields():
-                if isinstance(field, db_models.Field) and not isinstance(field, db_models.ManyToManyRel):
-                    if not isinstance(field, db_models.AutoField):
-                        model_fields.append(field.name)
-            fieldsets = [(None, {'fields': model_fields})]
+            fieldsets = [(None, {'fields': metadata.model_fields()})]
         
-        # Prepare field values and labels
+        # Prepare field values and labels; labels and formatters come from the metadata
         field_values = {}
         field_labels = {}
         
         for fieldset_name, fieldset_options in fieldsets:
             for field_name in fieldset_options.get('fields', []):
                 if isinstance(field_name, str):
+                    column = metadata.column(field_name)
+                    field_labels[field_name] = column.label
                     try:
-                        # Get field value
-                        field = model._meta.get_field(field_name)
-                        value = getattr(obj, field_name, None)
-                        
-                        # Format value based on field type
-                        from django.db import models as db_models
-                        if isinstance(field, db_models.BooleanField):
-                            field_values[field_name] = gettext('Yes') if value else gettext('No')
-                        elif isinstance(field, db_models.DateTimeField) and value:
-                            from django.utils import timezone
-                            if timezone.is_aware(value):
-                                field_values[field_name] = timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
-                            else:
-                                field_values[field_name] = value.strftime('%Y-%m-%d %H:%M:%S')
-                        elif isinstance(field, db_models.DateField) and value:
-                            field_values[field_name] = value.strftime('%Y-%m-%d')
-                        elif isinstance(field, db_models.ForeignKey) and value:
-                            field_values[field_name] = str(value)
-                        elif isinstance(field, db_models.ManyToManyField):
-                            field_values[field_name] = ', '.join([str(item) for item in value.all()]) if value else ''
-                        elif value is None:
-                            field_values[field_name] = '-'
-                        else:
-                            field_values[field_name] = str(value)
-                        
-                        # Get field label
-                        field_labels[field_name] = field.verbose_name or field_name.replace('_', ' ').title()
+                        field_values[field_name] = column.display_value(obj)
                     except Exception as e:
                         field_values[field_name] = f'Error: {str(e)}'
-                        field_labels[field_name] = field_name.replace('_', ' ').title()
         
         # Create simplified fieldsets structure for template
         simplified_fieldsets = []
@@ -397,27 +312,14 @@ def view_object_modal(request, app_label, model_name, object_id):
             'field_labels_list': field_labels_list,
             'original': obj,
             'opts': model._meta,
+            'related_lists': _related_lists(request, model_admin, obj),
         }
         
-        # For Vpc: add related instances (instances in this VPC)
-        if app_label == 'vpc' and model_name == 'vpc':
-            try:
-                Instance = apps.get_model('instances', 'Instance')
-                related_instances = list(
-                    Instance.objects.filter(vpc=obj).values('id', 'instance_id', 'instance_name', 'ip')
-                )
-                context['related_instances'] = related_instances
-                context['related_instances_label'] = _('Instances in this VPC')
-                context['show_vpc_instances'] = True
-            except Exception:
-                context['related_instances'] = []
-                context['show_vpc_instances'] = True
-        else:
-            context['show_vpc_instances'] = False
-        
         try:
             html = render_to_string('admin/includes/view_modal_simple.html', context, request=request)
-            return HttpResponse(html)
+            if key:
+                cache.set(key, html, cache_timeout)
+            return _modal_response(html, key)
         except Exception as template_error:
             # Fallback: try using AdminForm approach
             try:
@@ -476,3 +378,103 @@ def view_object_modal(request, app_label, model_name, object_id):
         </div>
         '''
         return HttpResponse(error_html, status=500)
+
+
+def _modal_response(html, key):
+    response = HttpResponse(html)
+    if key:
+        # Revalidated on every open; unchanged objects answer 304 without rendering
+        response['ETag'] = modal.etag(key)
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _related_lists(request, model_admin, obj):
+    """Placeholders for the related lists of ``obj``; rows are fetched by view_object_related."""
+    opts = obj._meta
+    related_lists = []
+    for name, columns in modal.get_related_lists(model_admin).items():
+        relation = modal.get_reverse_relation(obj.__class__, name)
+        related_admin = admin.site._registry.get(relation.related_model) if relation else None
+        if related_admin is None or not related_admin.has_view_or_change_permission(request):
+            continue
+        related_opts = relation.related_model._meta
+        related_lists.append({
+            'name': name,
+            'title': related_opts.verbose_name_plural,
+            'columns': [related_opts.get_field(column).verbose_name for column in columns],
+            'url': reverse(
+                'admin_enhanced:view_object_related',
+                args=[opts.app_label, opts.model_name, obj.pk, name],
+            ),
+        })
+    return related_lists
+
+
+@staff_member_required
+@reads_from_replica
+def view_object_related(request, app_label, model_name, object_id, relation):
+    """
+    One page of a related list in the object modal, as JSON:
+    ``{"html": <table rows>, "next": <url of the next page or null>,
+    "changelist_url": <url, set once the list is capped>}``.
+    
+    Pages seek on the related primary key (``?after=<pk>``) instead of
+    OFFSET; after ``view_modal_related_max`` rows the modal links to the
+    related changelist filtered to this object.
+    """
+    from django.apps import apps
+    try:
+        model = apps.get_model(app_label, model_name)
+    except LookupError:
+        raise Http404('Model not found')
+    model_admin = admin.site._registry.get(model)
+    columns = modal.get_related_lists(model_admin).get(relation) if model_admin else None
+    reverse_relation = modal.get_reverse_relation(model, relation) if columns else None
+    related_admin = admin.site._registry.get(reverse_relation.related_model) if reverse_relation else None
+    if related_admin is None:
+        raise Http404('Related list not found')
+    if not (model_admin.has_view_or_change_permission(request)
+            and related_admin.has_view_or_change_permission(request)):
+        return JsonResponse({'error': str(_('Permission denied'))}, status=403)
+    
+    per_page = getattr(model_admin, 'view_modal_related_per_page', modal.DEFAULT_RELATED_PER_PAGE)
+    max_rows = getattr(model_admin, 'view_modal_related_max', modal.DEFAULT_RELATED_MAX)
+    try:
+        after = int(request.GET.get('after', 0))
+        loaded = max(int(request.GET.get('loaded', 0)), 0)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid page'}, status=400)
+    
+    related_model = reverse_relation.related_model
+    related_opts = related_model._meta
+    fk_name = reverse_relation.field.name
+    queryset = related_admin.get_queryset(request).filter(**{fk_name: object_id}).order_by('pk')
+    if after:
+        queryset = queryset.filter(pk__gt=after)
+    # One extra row tells whether there is more
+    limit = max(min(per_page, max_rows - loaded), 0)
+    rows = list(queryset.values('pk', *columns)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    change_url = f'admin:{related_opts.app_label}_{related_opts.model_name}_change'
+    html = render_to_string('admin/includes/view_modal_related_rows.html', {
+        'rows': [
+            {
+                'values': [row[column] for column in columns],
+                'url': reverse(change_url, args=[row['pk']]),
+            }
+            for row in rows
+        ],
+    }, request=request)
+    
+    next_url = changelist_url = None
+    if has_more and loaded + len(rows) < max_rows:
+        next_url = '{}?{}'.format(request.path, urlencode({'after': rows[-1]['pk'], 'loaded': loaded + len(rows)}))
+    elif has_more:
+        changelist_url = '{}?{}'.format(
+            reverse(f'admin:{related_opts.app_label}_{related_opts.model_name}_changelist'),
+            urlencode({f'{fk_name}__{reverse_relation.field.target_field.name}__exact': object_id}),
+        )
+    return JsonResponse({'html': html, 'next': next_url, 'changelist_url': changelist_url})
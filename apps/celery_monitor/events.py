@@ -0,0 +1,376 @@
+"""
+Celery task monitor fed by worker events.
+
+Asking the workers (``inspect().active()``) broadcasts to every worker and
+waits for the reply timeout, and scanning the result backend costs one
+read per key, so neither can back a page view. Instead ``manage.py
+celery_events`` runs one event receiver for the cluster. EventMonitor
+applies every task event (``task-sent``, ``-received``, ``-started``,
+``-succeeded``, ``-failed``, ``-retried``, ``-revoked``, ``-rejected``) to
+a TaskStore: the newest ``CELERY_MONITOR_MAX_TASKS`` tasks in memory,
+indexed by state, name and worker and ordered by their last event, the
+least recently updated evicted first. Every
+``CELERY_MONITOR_PERSIST_INTERVAL`` seconds the tasks that changed are
+upserted into TaskRecord and the evicted ones deleted, so the table
+stays as small as the store. The list and detail views are paginated
+queries on its indexes and never talk to Celery.
+
+Workers only send task events with ``worker_send_task_events`` (and
+clients ``task-sent`` with ``task_send_sent_event``); both are on in
+config/settings/celery.py. FakeEventSource produces the same events
+without a broker, for tests and ``manage.py benchmark_celery_monitor``.
+"""
+import collections
+import itertools
+import logging
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+
+from celery import states
+from django.conf import settings
+from django.db import transaction
+
+from .models import TaskRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TASKS = 10000
+DEFAULT_PERSIST_INTERVAL = 2.0
+
+# Longest args/kwargs/result/traceback kept per task
+MAX_FIELD_LENGTH = 10000
+
+# Rows per INSERT ... ON CONFLICT / DELETE when persisting
+PERSIST_BATCH_SIZE = 500
+
+# Seconds between reconnection attempts while the broker is unreachable
+RETRY_INTERVAL = 2.0
+
+# Event type -> task state
+EVENT_STATES = {
+    'task-sent': states.PENDING,
+    'task-received': states.RECEIVED,
+    'task-started': states.STARTED,
+    'task-succeeded': states.SUCCESS,
+    'task-failed': states.FAILURE,
+    'task-retried': states.RETRY,
+    'task-revoked': states.REVOKED,
+    'task-rejected': states.REJECTED,
+}
+
+TEXT_FIELDS = ('name', 'args', 'kwargs', 'result', 'exception', 'traceback')
+
+RECORD_FIELDS = (
+    'name', 'state', 'worker', 'args', 'kwargs', 'result', 'exception', 'traceback', 'retries', 'runtime',
+    'sent_at', 'received_at', 'started_at', 'finished_at', 'updated_at',
+)
+
+
+def get_max_tasks():
+    return getattr(settings, 'CELERY_MONITOR_MAX_TASKS', DEFAULT_MAX_TASKS)
+
+
+def get_persist_interval():
+    return getattr(settings, 'CELERY_MONITOR_PERSIST_INTERVAL', DEFAULT_PERSIST_INTERVAL)
+
+
+def _event_time(event):
+    timestamp = event.get('timestamp')
+    return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else datetime.now(timezone.utc)
+
+
+class TaskSnapshot:
+    """What the events so far say about one task; the fields of a TaskRecord."""
+
+    __slots__ = ('task_id',) + RECORD_FIELDS
+
+    def __init__(self, task_id, **fields):
+        self.task_id = task_id
+        for name in TEXT_FIELDS:
+            setattr(self, name, '')
+        self.state = states.PENDING
+        self.worker = ''
+        self.retries = 0
+        self.runtime = None
+        self.sent_at = self.received_at = self.started_at = self.finished_at = self.updated_at = None
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record.task_id, **{name: getattr(record, name) for name in RECORD_FIELDS})
+
+    def record(self):
+        return TaskRecord(task_id=self.task_id, **{name: getattr(self, name) for name in RECORD_FIELDS})
+
+    def update(self, event, state):
+        kind = event['type']
+        at = _event_time(event)
+        if kind == 'task-sent':
+            self.sent_at = at
+        elif kind == 'task-received':
+            self.received_at = at
+        elif kind == 'task-started':
+            self.started_at = at
+        elif state in states.READY_STATES:
+            self.finished_at = at
+        # Events can arrive out of order: a late "started" fills in its fields but does not reopen a finished task
+        if state in states.READY_STATES or self.state not in states.READY_STATES:
+            self.state = state
+        for name in TEXT_FIELDS:
+            value = event.get(name)
+            if value is not None:
+                setattr(self, name, str(value)[:MAX_FIELD_LENGTH])
+        if event.get('retries') is not None:
+            self.retries = int(event['retries'])
+        if event.get('runtime') is not None:
+            self.runtime = float(event['runtime'])
+        # task-sent comes from the client that queued the task, not from a worker
+        if kind != 'task-sent' and event.get('hostname'):
+            self.worker = event['hostname']
+        if self.updated_at is None or at > self.updated_at:
+            self.updated_at = at
+
+
+class TaskStore:
+    """
+    The newest ``max_tasks`` tasks, least recently updated first, with
+    indexes by state, name and worker; records which tasks changed or
+    were evicted since take_changes() was last called.
+    """
+
+    def __init__(self, max_tasks=None):
+        self.max_tasks = max_tasks or get_max_tasks()
+        self.tasks = collections.OrderedDict()
+        self.by_state = collections.defaultdict(set)
+        self.by_name = collections.defaultdict(set)
+        self.by_worker = collections.defaultdict(set)
+        self.dirty = set()
+        self.evicted = set()
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def _index(self, task):
+        self.by_state[task.state].add(task.task_id)
+        self.by_name[task.name].add(task.task_id)
+        self.by_worker[task.worker].add(task.task_id)
+
+    def _unindex(self, task):
+        for index, value in ((self.by_state, task.state), (self.by_name, task.name), (self.by_worker, task.worker)):
+            ids = index[value]
+            ids.discard(task.task_id)
+            if not ids:
+                del index[value]
+
+    def apply(self, event):
+        """Apply one Celery event; returns the task it updated, or None for other events."""
+        state = EVENT_STATES.get(event.get('type'))
+        task_id = event.get('uuid')
+        if state is None or not task_id:
+            return None
+        task = self.tasks.get(task_id)
+        if task is None:
+            task = self.tasks[task_id] = TaskSnapshot(task_id)
+        else:
+            self.tasks.move_to_end(task_id)
+            self._unindex(task)
+        task.update(event, state)
+        self._index(task)
+        self.dirty.add(task_id)
+        self.evicted.discard(task_id)
+        while len(self.tasks) > self.max_tasks:
+            old_id, old = self.tasks.popitem(last=False)
+            self._unindex(old)
+            self.dirty.discard(old_id)
+            self.evicted.add(old_id)
+        return task
+
+    def load(self, records):
+        """Fill the store from TaskRecords (newest first), e.g. the table at start-up."""
+        for record in reversed(list(itertools.islice(records, self.max_tasks))):
+            task = self.tasks[record.task_id] = TaskSnapshot.from_record(record)
+            self._index(task)
+
+    def query(self, state=None, name=None, worker=None, offset=0, limit=50):
+        """Tasks matching every given criterion, most recently updated first."""
+        criteria = [
+            index.get(value, set())
+            for index, value in ((self.by_state, state), (self.by_name, name), (self.by_worker, worker))
+            if value is not None
+        ]
+        if not criteria:
+            ids = itertools.islice(reversed(self.tasks), offset, offset + limit)
+            return [self.tasks[task_id] for task_id in ids]
+        ids = set.intersection(*sorted(criteria, key=len))
+        tasks = sorted((self.tasks[task_id] for task_id in ids), key=lambda task: task.updated_at, reverse=True)
+        return tasks[offset:offset + limit]
+
+    def counts(self):
+        """Tasks per state."""
+        return {state: len(ids) for state, ids in self.by_state.items()}
+
+    def take_changes(self):
+        """``(tasks changed, IDs evicted)`` since the last call."""
+        tasks = [self.tasks[task_id] for task_id in self.dirty]
+        evicted = list(self.evicted)
+        self.dirty = set()
+        self.evicted = set()
+        return tasks, evicted
+
+
+def persist(store):
+    """Upsert the changed tasks of ``store`` into TaskRecord and delete the evicted ones; returns both counts."""
+    tasks, evicted = store.take_changes()
+    with transaction.atomic():
+        for start in range(0, len(tasks), PERSIST_BATCH_SIZE):
+            TaskRecord.objects.bulk_create(
+                [task.record() for task in tasks[start:start + PERSIST_BATCH_SIZE]],
+                update_conflicts=True,
+                unique_fields=['task_id'],
+                update_fields=list(RECORD_FIELDS),
+            )
+        for start in range(0, len(evicted), PERSIST_BATCH_SIZE):
+            TaskRecord.objects.filter(task_id__in=evicted[start:start + PERSIST_BATCH_SIZE]).delete()
+    return len(tasks), len(evicted)
+
+
+class EventMonitor:
+    """Applies Celery events to a TaskStore and persists it every ``persist_interval`` seconds."""
+
+    def __init__(self, store=None, persist_interval=None):
+        self.store = store if store is not None else TaskStore()
+        self.persist_interval = persist_interval or get_persist_interval()
+        self.events = 0
+        self.persisted = 0
+        self.next_persist = time.monotonic() + self.persist_interval
+
+    def load(self):
+        """Continue from the persisted snapshot; rows beyond the store's size are deleted."""
+        self.store.load(TaskRecord.objects.order_by('-updated_at').iterator())
+        keep = set(self.store.tasks)
+        stale = [task_id for task_id in TaskRecord.objects.values_list('task_id', flat=True) if task_id not in keep]
+        self.store.evicted.update(stale)
+
+    def handle(self, event):
+        self.store.apply(event)
+        self.events += 1
+        if time.monotonic() >= self.next_persist:
+            self.persist()
+
+    def persist(self):
+        changed, _evicted = persist(self.store)
+        self.persisted += changed
+        self.next_persist = time.monotonic() + self.persist_interval
+
+    def replay(self, events):
+        """Apply ``events`` (e.g. a FakeEventSource), then persist."""
+        for event in events:
+            self.handle(event)
+        self.persist()
+
+    def run(self, app):
+        """Receive the cluster's events until interrupted; reconnects when the broker goes away."""
+        while True:
+            try:
+                with app.connection_for_read() as connection:
+                    receiver = app.events.Receiver(connection, handlers={'*': self.handle})
+                    while True:
+                        try:
+                            receiver.capture(limit=None, timeout=self.persist_interval, wakeup=True)
+                        except socket.timeout:
+                            # No events for a while: save what the last ones changed
+                            self.persist()
+            except (KeyboardInterrupt, SystemExit):
+                self.persist()
+                raise
+            except Exception:
+                logger.warning('Receiving Celery events failed, reconnecting', exc_info=True)
+                self.persist()
+                time.sleep(RETRY_INTERVAL)
+
+
+class FakeEventSource:
+    """
+    Celery task events without a broker: ``tasks`` tasks of ``names`` run on
+    ``workers`` workers, at most ``concurrency`` at a time, each sent,
+    received, started and then succeeded, failed or retried, interleaved
+    as a cluster would send them. The same seed gives the same events.
+    """
+
+    NAMES = (
+        'apps.admin_enhanced.tasks.run_export_job',
+        'apps.admin_enhanced.tasks.run_bulk_edit_job',
+        'apps.instances.tasks.sync_instances',
+        'apps.vpc.tasks.sync_vpcs',
+    )
+
+    def __init__(self, tasks=1000, workers=4, names=None, concurrency=None, failure_rate=0.05,
+                 retry_rate=0.02, start=None, seed=0):
+        self.tasks = tasks
+        self.workers = [f'celery@worker{index}' for index in range(workers)]
+        self.names = names or self.NAMES
+        self.concurrency = concurrency or workers * 4
+        self.failure_rate = failure_rate
+        self.retry_rate = retry_rate
+        self.start = start if start is not None else time.time()
+        self.seed = seed
+
+    def __iter__(self):
+        rng = random.Random(self.seed)
+        now = self.start
+        in_flight = []
+        sent = 0
+        while sent < self.tasks or in_flight:
+            now += rng.expovariate(1000)
+            if sent < self.tasks and (not in_flight or len(in_flight) < self.concurrency and rng.random() < 0.5):
+                sent += 1
+                task = {
+                    'uuid': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                    'name': rng.choice(self.names),
+                    'args': repr((rng.randrange(10000),)),
+                    'kwargs': '{}',
+                    'retries': 0,
+                    'next': 'task-received',
+                }
+                in_flight.append(task)
+                yield self._event(task, 'task-sent', now, 'web@app', name=task['name'], args=task['args'],
+                                  kwargs=task['kwargs'], retries=0)
+                continue
+            index = rng.randrange(len(in_flight))
+            task = in_flight[index]
+            kind = task['next']
+            if kind == 'task-received':
+                task['worker'] = rng.choice(self.workers)
+                task['next'] = 'task-started'
+                yield self._event(task, kind, now, task['worker'], name=task['name'], args=task['args'],
+                                  kwargs=task['kwargs'], retries=task['retries'])
+            elif kind == 'task-started':
+                task['started'] = now
+                task['next'] = 'finish'
+                yield self._event(task, kind, now, task['worker'], pid=rng.randrange(1000, 60000))
+            else:
+                in_flight[index] = in_flight[-1]
+                in_flight.pop()
+                outcome = rng.random()
+                if outcome < self.retry_rate and task['retries'] < 3:
+                    task['retries'] += 1
+                    task['next'] = 'task-received'
+                    in_flight.append(task)
+                    yield self._event(task, 'task-retried', now, task['worker'],
+                                      exception="ConnectionError('timed out')",
+                                      traceback='Traceback (most recent call last):\n  ...\nConnectionError: timed out')
+                elif outcome < self.retry_rate + self.failure_rate:
+                    yield self._event(task, 'task-failed', now, task['worker'],
+                                      exception="ValueError('bad input')",
+                                      traceback='Traceback (most recent call last):\n  ...\nValueError: bad input')
+                else:
+                    yield self._event(task, 'task-succeeded', now, task['worker'],
+                                      result=repr(rng.randrange(1000)), runtime=round(now - task['started'], 4))
+
+    @staticmethod
+    def _event(task, kind, timestamp, hostname, **fields):
+        return {'type': kind, 'uuid': task['uuid'], 'timestamp': timestamp, 'hostname': hostname, **fields}
@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from apps.admin_enhanced.management.commands.benchmark_admin import git_commit, measure
+from apps.admin_enhanced.management.commands.benchmark_sqlite import percentile
+from apps.celery_monitor.events import EventMonitor, FakeEventSource, TaskStore
+from apps.celery_monitor.models import TaskRecord
+
+
+class Command(BaseCommand):
+    help = (
+        "Celery 任务监控基准：在独立的 SQLite 数据库中回放 FakeEventSource 的模拟事件，"
+        "测量事件处理速度、每次写入快照的耗时，以及任务列表、筛选、深分页和详情页的耗时"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=100000, help="模拟的任务数（默认：100000）")
+        parser.add_argument("--workers", type=int, default=16, help="模拟的 worker 数（默认：16）")
+        parser.add_argument("--max-tasks", type=int, default=10000, help="快照保留的任务数（默认：10000）")
+        parser.add_argument(
+            "--persist-every",
+            type=int,
+            default=5000,
+            help="每处理多少个事件写入一次快照，代替按时间间隔写入（默认：5000）",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="每个页面的请求次数（默认：5）")
+        parser.add_argument("--output", help="JSON 结果路径（默认：benchmarks/celery-monitor-<时间>-<提交>.json）")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("基准测试只支持 SQLite（默认配置）")
+        # 独立的测试数据库，与 benchmark_admin 相同，不触碰项目数据
+        temp_dir = tempfile.mkdtemp(prefix="armoryx-bench-")
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(temp_dir, "bench.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+        try:
+            replay = self.replay(options)
+            pages = self.measure_pages(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=False)
+            for name in os.listdir(temp_dir):
+                os.remove(os.path.join(temp_dir, name))
+            os.rmdir(temp_dir)
+
+        commit = git_commit()
+        report = {
+            "meta": {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "commit": commit,
+                "tasks": options["tasks"],
+                "workers": options["workers"],
+                "max_tasks": options["max_tasks"],
+                "persist_every": options["persist_every"],
+                "repeat": options["repeat"],
+            },
+            "replay": replay,
+            "results": pages,
+        }
+        output = options["output"] or os.path.join(
+            settings.BASE_DIR, "benchmarks",
+            f"celery-monitor-{datetime.now():%Y%m%d-%H%M%S}{'-' + commit if commit else ''}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"\n结果已写入 {output}"))
+
+    def replay(self, options):
+        self.stdout.write(f"回放 {options['tasks']:,} 个任务的事件（保留 {options['max_tasks']:,} 个）...")
+        # 间隔设得足够大，由下面按事件数显式写入，结果与机器速度无关
+        monitor = EventMonitor(TaskStore(options["max_tasks"]), persist_interval=1e9)
+        source = FakeEventSource(tasks=options["tasks"], workers=options["workers"], seed=42)
+        apply_seconds = 0.0
+        persist_ms = []
+        started = time.perf_counter()
+        for event in source:
+            apply_started = time.perf_counter()
+            monitor.handle(event)
+            apply_seconds += time.perf_counter() - apply_started
+            if monitor.events % options["persist_every"] == 0:
+                persist_started = time.perf_counter()
+                monitor.persist()
+                persist_ms.append((time.perf_counter() - persist_started) * 1000)
+        persist_started = time.perf_counter()
+        monitor.persist()
+        persist_ms.append((time.perf_counter() - persist_started) * 1000)
+        elapsed = time.perf_counter() - started
+
+        rows = TaskRecord.objects.count()
+        if rows != len(monitor.store):
+            raise CommandError(f"快照表有 {rows} 行，内存中有 {len(monitor.store)} 个任务")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        result = {
+            "events": monitor.events,
+            "seconds": round(elapsed, 2),
+            "events_per_second": round(monitor.events / apply_seconds) if apply_seconds else None,
+            "persists": len(persist_ms),
+            "persist_ms_median": percentile(persist_ms, 0.5),
+            "persist_ms_p99": percentile(persist_ms, 0.99),
+            "rows": rows,
+        }
+        self.stdout.write(
+            f"  {result['events']:,} 个事件，{result['seconds']} 秒；处理 {result['events_per_second']:,} 事件/秒，"
+            f"写入 {result['persists']} 次，中位数 {result['persist_ms_median']} ms，"
+            f"p99 {result['persist_ms_p99']} ms；表中 {rows:,} 行"
+        )
+        return result
+
+    def measure_pages(self, options):
+        user = get_user_model().objects.create_superuser("bench", "bench@example.com", "bench")
+        client = Client()
+        client.force_login(user)
+        task_list = reverse("celery_monitor:tasks")
+        task = TaskRecord.objects.filter(state="FAILURE").first() or TaskRecord.objects.first()
+        last_page = (TaskRecord.objects.count() + 49) // 50
+        scenarios = [
+            ("task_list", task_list, {}),
+            ("task_list_last_page", task_list, {"page": str(last_page)}),
+            ("task_filter_state", task_list, {"state": "FAILURE"}),
+            ("task_filter_name_worker", task_list, {"name": task.name, "worker": task.worker}),
+            ("task_detail", reverse("celery_monitor:task_detail", args=[task.task_id]), {}),
+        ]
+        results = []
+        self.stdout.write("\n页面：")
+        # 测试客户端使用 testserver 作为 Host
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name, url, params in scenarios:
+                # 预热一次：URL 解析、模板加载不计入结果
+                measure(client, url, params, 1)
+                result = measure(client, url, params, options["repeat"])
+                results.append({"scenario": name, "url": url, "params": params, **result})
+                self.stdout.write(
+                    f"  {name:<28} {result['ms_median']:9.1f} ms  {result['queries']:4d} 查询 "
+                    f"{result['query_ms']:8.1f} ms  HTTP {result['status']}"
+                )
+        return results
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from apps.celery_monitor.events import EventMonitor, FakeEventSource, TaskStore, get_max_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "接收 Celery 任务事件，在内存中维护最近 CELERY_MONITOR_MAX_TASKS 个任务的快照（按状态、任务名、"
+        "worker 索引），每 CELERY_MONITOR_PERSIST_INTERVAL 秒把变化写入 TaskRecord，供任务列表页查询；"
+        "--fake 回放模拟事件后退出，不需要 broker"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fake", action="store_true", help="回放 FakeEventSource 生成的模拟事件后退出")
+        parser.add_argument("--tasks", type=int, default=1000, help="--fake 时的任务数（默认：1000）")
+        parser.add_argument("--workers", type=int, default=4, help="--fake 时的 worker 数（默认：4）")
+        parser.add_argument("--seed", type=int, default=0, help="--fake 时的随机种子，相同的种子生成相同的任务（默认：0）")
+        parser.add_argument("--max-tasks", type=int, help="保留的任务数（默认：CELERY_MONITOR_MAX_TASKS）")
+        parser.add_argument(
+            "--persist-interval",
+            type=float,
+            help="写入数据库的间隔秒数（默认：CELERY_MONITOR_PERSIST_INTERVAL）",
+        )
+
+    def handle(self, *args, **options):
+        monitor = EventMonitor(TaskStore(options["max_tasks"] or get_max_tasks()), options["persist_interval"])
+        # 从上次保存的快照继续：重启后列表页不会变空
+        monitor.load()
+        self.stdout.write(f"已载入 {len(monitor.store)} 个任务（最多保留 {monitor.store.max_tasks} 个）")
+
+        if options["fake"]:
+            monitor.replay(FakeEventSource(
+                tasks=options["tasks"], workers=options["workers"], seed=options["seed"],
+            ))
+            self.stdout.write(self.style.SUCCESS(
+                f"回放 {monitor.events} 个事件，写入 {monitor.persisted} 次任务变化；当前 {len(monitor.store)} 个任务"
+            ))
+            return
+
+        from config.celery import app
+
+        self.stdout.write(f"接收 Celery 事件（{app.conf.broker_url}），Ctrl+C 停止...")
+        try:
+            monitor.run(app)
+        except KeyboardInterrupt:
+            self.stdout.write(f"\n已停止：共处理 {monitor.events} 个事件")
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(max_length=255, unique=True, verbose_name='Task ID')),
+                ('name', models.CharField(blank=True, max_length=255, verbose_name='Name')),
+                ('state', models.CharField(max_length=20, verbose_name='State')),
+                ('worker', models.CharField(blank=True, max_length=255, verbose_name='Worker')),
+                ('args', models.TextField(blank=True, verbose_name='Args')),
+                ('kwargs', models.TextField(blank=True, verbose_name='Kwargs')),
+                ('result', models.TextField(blank=True, verbose_name='Result')),
+                ('exception', models.TextField(blank=True, verbose_name='Exception')),
+                ('traceback', models.TextField(blank=True, verbose_name='Traceback')),
+                ('retries', models.PositiveIntegerField(default=0, verbose_name='Retries')),
+                ('runtime', models.FloatField(blank=True, help_text='执行耗时（秒）', null=True, verbose_name='Runtime')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent At')),
+                ('received_at', models.DateTimeField(blank=True, null=True, verbose_name='Received At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('updated_at', models.DateTimeField(help_text='最后一个事件的时间', verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Task',
+                'verbose_name_plural': 'Tasks',
+                'ordering': ['-updated_at'],
+                'indexes': [models.Index(fields=['updated_at'], name='celery_moni_updated_f9dd3a_idx'), models.Index(fields=['state', 'updated_at'], name='celery_moni_state_5f7860_idx'), models.Index(fields=['name', 'updated_at'], name='celery_moni_name_034400_idx'), models.Index(fields=['worker', 'updated_at'], name='celery_moni_worker_00daf4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class TaskRecord(models.Model):
+    """Celery 任务快照：由事件接收进程（manage.py celery_events）定期写入，见 events.py"""
+
+    task_id = models.CharField(_("Task ID"), max_length=255, unique=True)
+
+    name = models.CharField(_("Name"), max_length=255, blank=True)
+
+    state = models.CharField(_("State"), max_length=20)
+
+    worker = models.CharField(_("Worker"), max_length=255, blank=True)
+
+    args = models.TextField(_("Args"), blank=True)
+
+    kwargs = models.TextField(_("Kwargs"), blank=True)
+
+    result = models.TextField(_("Result"), blank=True)
+
+    exception = models.TextField(_("Exception"), blank=True)
+
+    traceback = models.TextField(_("Traceback"), blank=True)
+
+    retries = models.PositiveIntegerField(_("Retries"), default=0)
+
+    runtime = models.FloatField(_("Runtime"), null=True, blank=True, help_text=_("执行耗时（秒）"))
+
+    sent_at = models.DateTimeField(_("Sent At"), null=True, blank=True)
+
+    received_at = models.DateTimeField(_("Received At"), null=True, blank=True)
+
+    started_at = models.DateTimeField(_("Started At"), null=True, blank=True)
+
+    finished_at = models.DateTimeField(_("Finished At"), null=True, blank=True)
+
+    updated_at = models.DateTimeField(_("Updated At"), help_text=_("最后一个事件的时间"))
+
+    class Meta:
+        verbose_name = _("Task")
+        verbose_name_plural = _("Tasks")
+        ordering = ["-updated_at"]
+        indexes = [
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["state", "updated_at"]),
+            models.Index(fields=["name", "updated_at"]),
+            models.Index(fields=["worker", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name or '?'} {self.task_id}"
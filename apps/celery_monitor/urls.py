@@ -1,3 +1,11 @@
 from django.urls import path
 
-urlpatterns = []
+from . import views
+
+app_name = 'celery_monitor'
+
+urlpatterns = [
+    path('exports/', views.export_job_list, name='export_jobs'),
+    path('tasks/', views.task_list, name='tasks'),
+    path('tasks/<str:task_id>/', views.task_detail, name='task_detail'),
+]
@@ -1 +1,81 @@
 # Celery task list and trigger views (stage 5)
+from celery import states
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.paginator import Paginator
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.utils.translation import gettext_lazy as _
+
+from apps.admin_enhanced.models import ExportJob
+
+from .models import TaskRecord
+
+TASK_STATES = [
+    states.PENDING, states.RECEIVED, states.STARTED, states.RETRY,
+    states.SUCCESS, states.FAILURE, states.REVOKED, states.REJECTED,
+]
+
+
+@staff_member_required
+def export_job_list(request):
+    """后台导出任务列表（staff 仅见自己的任务，superuser 可见全部）"""
+    jobs = ExportJob.objects.select_related('user')
+    if not request.user.is_superuser:
+        jobs = jobs.filter(user=request.user)
+    status = request.GET.get('status', '')
+    if status:
+        jobs = jobs.filter(status=status)
+
+    page_obj = Paginator(jobs, 50).get_page(request.GET.get('page'))
+    context = {
+        **admin.site.each_context(request),
+        'title': _('Export Jobs'),
+        'page_obj': page_obj,
+        'status': status,
+        'status_choices': ExportJob.STATUS_CHOICES,
+    }
+    return TemplateResponse(request, 'celery_monitor/export_jobs.html', context)
+
+
+@staff_member_required
+def task_list(request):
+    """Celery 任务列表：查询 celery_events 进程保存的任务快照，不访问 worker 或结果后端"""
+    task_id = request.GET.get('task_id', '').strip()
+    if task_id:
+        return redirect('celery_monitor:task_detail', task_id=task_id)
+    filters = {name: request.GET.get(name, '') for name in ('state', 'name', 'worker')}
+    tasks = TaskRecord.objects.defer('args', 'kwargs', 'result', 'traceback')
+    for name, value in filters.items():
+        if value:
+            tasks = tasks.filter(**{name: value})
+
+    page_obj = Paginator(tasks, 50).get_page(request.GET.get('page'))
+    query = request.GET.copy()
+    query.pop('page', None)
+    context = {
+        **admin.site.each_context(request),
+        'title': _('Celery Tasks'),
+        'page_obj': page_obj,
+        'filters': filters,
+        'query': query.urlencode(),
+        'state_choices': TASK_STATES,
+        'state_counts': dict(TaskRecord.objects.values_list('state').annotate(count=Count('pk')).order_by()),
+        'names': TaskRecord.objects.order_by('name').values_list('name', flat=True).distinct(),
+        'workers': TaskRecord.objects.exclude(worker='').order_by('worker').values_list('worker', flat=True).distinct(),
+        'last_event': TaskRecord.objects.aggregate(last=Max('updated_at'))['last'],
+    }
+    return TemplateResponse(request, 'celery_monitor/task_list.html', context)
+
+
+@staff_member_required
+def task_detail(request, task_id):
+    """Celery 任务详情（任务快照）"""
+    task = get_object_or_404(TaskRecord, task_id=task_id)
+    context = {
+        **admin.site.each_context(request),
+        'title': task.name or task.task_id,
+        'task': task,
+    }
+    return TemplateResponse(request, 'celery_monitor/task_detail.html', context)
@@ -5,3 +5,9 @@ class InstancesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.instances"
     verbose_name = "Instances"
+
+    def ready(self):
+        from apps.admin_enhanced import summary
+        from .models import Instance, InstanceStat
+
+        summary.register(Instance, InstanceStat, ["account", "region", "state"])
@@ -0,0 +1,69 @@
+"""
+实例的随机数据工厂（generate_instances 使用）
+
+只依赖标准库与 bulkgen，不导入模型，可以在 bulkgen 的工作进程中运行。
+"""
+from bisect import bisect
+from datetime import timedelta
+
+from apps.admin_enhanced.bulkgen import skewed_weights
+
+ACCOUNTS = ["aliyun", "tencent", "aws", "azure", "huawei"]
+REGIONS = ["cn-beijing", "cn-shanghai", "cn-guangzhou", "cn-shenzhen", "us-east-1", "us-west-1"]
+STATES = ["running", "stopped", "pending", "terminated"]
+# 各状态的大致占比（累计值，总和 100）
+STATE_CUM_WEIGHTS = [70, 90, 95, 100]
+
+INSTANCE_ID_PREFIXES = ["i-", "ins-", "ecs-"]
+NAME_PREFIXES = ["web", "db", "app", "cache", "api", "worker", "proxy"]
+NAME_SUFFIXES = ["server", "node", "instance", "host", "vm"]
+
+FIELDS = ["account", "region", "instance_id", "instance_name", "ip", "security_groupid", "state", "vpc_id"]
+
+
+class InstanceRows:
+    """
+    按批生成实例行（元组，字段顺序见 fields）
+
+    - vpcs: 已有 VPC 的 [(pk, account, region)]，按热度从高到低排列；第 n 个
+      VPC 被选中的概率正比于 n ** -vpc_skew（Zipf 分布，0 为均匀），实例沿用
+      所选 VPC 的账户与区域
+    - unlinked: 不挂 VPC 的实例比例（没有 VPC 时全部不挂）
+    - backdate_days: 大于 0 时把 create_time 分散到 now 之前的这段时间内；
+      为 0 时不生成 create_time，由 auto_now_add 取写入时间
+    """
+
+    def __init__(self, vpcs=(), vpc_skew=1.1, unlinked=0.1, now=None, backdate_days=0):
+        self.vpcs = list(vpcs)
+        self.vpc_weights = skewed_weights(len(self.vpcs), vpc_skew)
+        self.unlinked = unlinked if self.vpcs else 1.0
+        self.now = now
+        self.backdate_seconds = int(backdate_days * 86400)
+        self.fields = FIELDS + (["create_time"] if self.backdate_seconds else [])
+
+    def rows(self, rng, count):
+        rows = []
+        random = rng.random
+        choice = rng.choice
+        getrandbits = rng.getrandbits
+        for _ in range(count):
+            if random() < self.unlinked:
+                vpc_id, account, region = None, choice(ACCOUNTS), choice(REGIONS)
+            else:
+                vpc_id, account, region = self.vpcs[bisect(self.vpc_weights, random() * self.vpc_weights[-1])]
+            ip_bits = getrandbits(32)
+            row = (
+                account,
+                region,
+                f"{choice(INSTANCE_ID_PREFIXES)}{getrandbits(64):016x}",
+                f"{choice(NAME_PREFIXES)}-{choice(NAME_SUFFIXES)}-{rng.randint(1, 999)}",
+                f"{10 + (ip_bits >> 24) % 246}.{1 + (ip_bits >> 16 & 255) % 255}."
+                f"{1 + (ip_bits >> 8 & 255) % 255}.{1 + (ip_bits & 255) % 255}",
+                f"sg-{getrandbits(48):012x}",
+                STATES[bisect(STATE_CUM_WEIGHTS, random() * STATE_CUM_WEIGHTS[-1])],
+                vpc_id,
+            )
+            if self.backdate_seconds:
+                row += (self.now - timedelta(seconds=rng.randrange(self.backdate_seconds)),)
+            rows.append(row)
+        return rows
@@ -1,12 +1,17 @@
 import random
-from datetime import datetime, timedelta
-from django.core.management.base import BaseCommand
+
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
+
+from apps.admin_enhanced import bulkgen
+from apps.admin_enhanced.summary import get_summary
+from apps.instances.generators import ACCOUNTS, STATES, InstanceRows
 from apps.instances.models import Instance
+from apps.vpc.models import Vpc
 
 
 class Command(BaseCommand):
-    help = "生成200条随机的实例记录"
+    help = "生成随机的实例记录（分批流式写入，内存占用与总数无关，可生成千万级压测数据）"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -15,79 +20,94 @@ class Command(BaseCommand):
             default=200,
             help="要生成的记录数量（默认：200）",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=bulkgen.DEFAULT_BATCH_SIZE,
+            help=f"每批生成并写入的记录数（默认：{bulkgen.DEFAULT_BATCH_SIZE}）",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="生成数据的工作进程数，写入始终在主进程（默认：1）",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="随机种子；相同种子生成相同数据，与工作进程数无关，因此不要在同一数据库上重复使用（默认随机，运行时会打印）",
+        )
+        parser.add_argument(
+            "--vpc-skew",
+            type=float,
+            default=1.1,
+            help="实例挂到已有 VPC 的 Zipf 偏斜度，0 为均匀分布（默认：1.1）",
+        )
+        parser.add_argument(
+            "--unlinked",
+            type=float,
+            default=0.1,
+            help="不挂 VPC 的实例比例（默认：0.1）",
+        )
+        parser.add_argument(
+            "--backdate-days",
+            type=float,
+            default=0,
+            help=(
+                "每条实例的创建时间取命令开始时刻之前 0 到 N 天内均匀随机的一个时刻（精确到秒，与写入顺序无关；"
+                "updated_at 仍为写入时间）；默认 0 不生成创建时间，由 auto_now_add 取写入时间"
+            ),
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="写入的数据库别名（默认：default）",
+        )
 
     def handle(self, *args, **options):
         count = options["count"]
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        database = options["database"]
+        if count < 0 or batch_size < 1 or workers < 1:
+            raise CommandError("--count 不能为负，--batch-size 与 --workers 至少为 1")
+        if not 0 <= options["unlinked"] <= 1:
+            raise CommandError("--unlinked 必须在 0 到 1 之间")
+        seed = options["seed"] if options["seed"] is not None else bulkgen.new_seed()
         
-        # 预设的随机数据
-        accounts = ["aliyun", "tencent", "aws", "azure", "huawei"]
-        regions = ["cn-beijing", "cn-shanghai", "cn-guangzhou", "cn-shenzhen", "us-east-1", "us-west-1"]
-        states = ["running", "stopped", "pending", "terminated"]
-        
-        # 生成随机IP地址
-        def generate_ip():
-            return f"{random.randint(10, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}"
-        
-        # 生成随机实例ID
-        def generate_instance_id():
-            prefix = random.choice(["i-", "ins-", "ecs-"])
-            return f"{prefix}{''.join(random.choices('0123456789abcdef', k=16))}"
-        
-        # 生成随机实例名称
-        def generate_instance_name():
-            prefixes = ["web", "db", "app", "cache", "api", "worker", "proxy"]
-            suffixes = ["server", "node", "instance", "host", "vm"]
-            num = random.randint(1, 999)
-            return f"{random.choice(prefixes)}-{random.choice(suffixes)}-{num}"
-        
-        # 生成随机安全组ID
-        def generate_security_group_id():
-            return f"sg-{''.join(random.choices('0123456789abcdef', k=12))}"
-        
-        # 生成随机创建时间（过去30天内）
-        def generate_create_time():
-            days_ago = random.randint(0, 30)
-            hours_ago = random.randint(0, 23)
-            minutes_ago = random.randint(0, 59)
-            return timezone.now() - timedelta(days=days_ago, hours=hours_ago, minutes=minutes_ago)
-        
-        self.stdout.write(f"开始生成 {count} 条实例记录...")
-        
-        instances = []
-        instance_ids = set()
-        
-        for i in range(count):
-            # 确保实例ID唯一
-            instance_id = generate_instance_id()
-            while instance_id in instance_ids:
-                instance_id = generate_instance_id()
-            instance_ids.add(instance_id)
-            
-            instance = Instance(
-                account=random.choice(accounts),
-                region=random.choice(regions),
-                instance_id=instance_id,
-                instance_name=generate_instance_name(),
-                ip=generate_ip(),
-                security_groupid=generate_security_group_id(),
-                state=random.choice(states),
-                create_time=generate_create_time(),
-            )
-            instances.append(instance)
+        # 已有 VPC 按种子打乱后作为热度排名，实例沿用所挂 VPC 的账户与区域
+        vpcs = list(Vpc.objects.using(database).order_by("pk").values_list("pk", "account", "region"))
+        random.Random(seed).shuffle(vpcs)
+        factory = InstanceRows(
+            vpcs,
+            vpc_skew=options["vpc_skew"],
+            unlinked=options["unlinked"],
+            now=timezone.now(),
+            backdate_days=options["backdate_days"],
+        )
         
-        # 批量创建
-        Instance.objects.bulk_create(instances, batch_size=100)
+        self.stdout.write(
+            f"开始生成 {count} 条实例记录（种子 {seed}，每批 {batch_size} 条，"
+            f"{workers} 个工作进程，{len(vpcs)} 个 VPC）..."
+        )
+        progress = bulkgen.generate(
+            Instance, factory, count, batch_size, seed, workers, database, self.stdout.write,
+        )
         
         self.stdout.write(
-            self.style.SUCCESS(f"成功生成 {count} 条实例记录！")
+            self.style.SUCCESS(
+                f"成功生成 {count} 条实例记录！耗时 {progress.elapsed:.1f} 秒，{progress.rate:,.0f} 行/秒"
+            )
         )
         
-        # 显示统计信息
+        # 显示统计信息（读取 InstanceStat 汇总表，不逐项 count）
+        stats = get_summary(Instance)
+        by_account = stats.counts("account", database)
+        by_state = stats.counts("state", database)
         self.stdout.write("\n统计信息：")
-        for account in accounts:
-            count_by_account = Instance.objects.filter(account=account).count()
-            self.stdout.write(f"  {account}: {count_by_account} 条")
+        for account in ACCOUNTS:
+            self.stdout.write(f"  {account}: {by_account.get(account, 0)} 条")
         
-        for state in states:
-            count_by_state = Instance.objects.filter(state=state).count()
-            self.stdout.write(f"  {state}: {count_by_state} 条")
+        for state in STATES:
+            self.stdout.write(f"  {state}: {by_state.get(state, 0)} 条")
@@ -0,0 +1,44 @@
+# Align migration state with the model: the vpc FK column is vpc_id.
+# 0004 added it as vpc_fk_id; 0007 renamed it to vpc_id on SQLite only and
+# left the migration state (db_column='vpc_fk_id') behind.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def rename_vpc_fk_column(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        columns = [col.name for col in connection.introspection.get_table_description(cursor, 'instances_instance')]
+    if 'vpc_fk_id' in columns and 'vpc_id' not in columns:
+        qn = schema_editor.quote_name
+        schema_editor.execute(
+            f'ALTER TABLE {qn("instances_instance")} RENAME COLUMN {qn("vpc_fk_id")} TO {qn("vpc_id")}'
+        )
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instances', '0007_fix_vpc_id_column'),
+        ('vpc', '0002_rename_vpc_vpc_account_region_idx_vpc_vpc_account_6d0542_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(rename_vpc_fk_column, noop),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='instance',
+                    name='vpc',
+                    field=models.ForeignKey(blank=True, help_text='所属 VPC', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='instances', to='vpc.vpc', verbose_name='VPC'),
+                ),
+            ],
+        ),
+    ]
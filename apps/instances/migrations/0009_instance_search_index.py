@@ -0,0 +1,86 @@
+# Indexed changelist search (see apps/admin_enhanced/search.py):
+# FTS5 trigram shadow table + triggers on SQLite, pg_trgm GIN indexes on PostgreSQL.
+#
+# The SQL is what install_search_index() generated for InstanceAdmin's
+# search_fields at the time of this migration:
+#   ['instance_id', 'instance_name', 'account', 'ip', 'vpc__vpc_id', 'security_groupid']
+# It is frozen here so later changes to search.py do not change this
+# migration; later migrations that rebuild the table (0012, vpc 0005) call
+# install() / uninstall() from this module.
+
+from django.db import migrations
+
+INSTANCE_COLUMNS = '"instance_id", "instance_name", "account", "ip", "vpc_vpc_id", "security_groupid"'
+
+
+def _values(alias):
+    return (
+        f'{alias}."instance_id", {alias}."instance_name", {alias}."account", {alias}."ip", '
+        f'(SELECT r."vpc_id" FROM "vpc_vpc" r WHERE r."id" = {alias}."vpc_id"), {alias}."security_groupid"'
+    )
+
+
+SQLITE_INSTALL = [
+    f'CREATE VIRTUAL TABLE "instances_instance_search" USING fts5({INSTANCE_COLUMNS}, tokenize=\'trigram\')',
+    f'INSERT INTO "instances_instance_search"(rowid, {INSTANCE_COLUMNS}) '
+    f'SELECT t."id", {_values("t")} FROM "instances_instance" t',
+    f'CREATE TRIGGER "instances_instance_search_ai" AFTER INSERT ON "instances_instance" BEGIN '
+    f'INSERT INTO "instances_instance_search"(rowid, {INSTANCE_COLUMNS}) VALUES (NEW."id", {_values("NEW")}); END',
+    f'CREATE TRIGGER "instances_instance_search_au" AFTER UPDATE ON "instances_instance" BEGIN '
+    f'DELETE FROM "instances_instance_search" WHERE rowid = OLD."id"; '
+    f'INSERT INTO "instances_instance_search"(rowid, {INSTANCE_COLUMNS}) VALUES (NEW."id", {_values("NEW")}); END',
+    'CREATE TRIGGER "instances_instance_search_ad" AFTER DELETE ON "instances_instance" BEGIN '
+    'DELETE FROM "instances_instance_search" WHERE rowid = OLD."id"; END',
+    'CREATE TRIGGER "instances_instance_search_vpc_vpc_id_au" AFTER UPDATE OF "vpc_id" ON "vpc_vpc" BEGIN '
+    'UPDATE "instances_instance_search" SET "vpc_vpc_id" = NEW."vpc_id" '
+    'WHERE rowid IN (SELECT "id" FROM "instances_instance" WHERE "vpc_id" = NEW."id"); END',
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS "instances_instance_search_vpc_vpc_id_au"',
+    'DROP TRIGGER IF EXISTS "instances_instance_search_ai"',
+    'DROP TRIGGER IF EXISTS "instances_instance_search_au"',
+    'DROP TRIGGER IF EXISTS "instances_instance_search_ad"',
+    'DROP TABLE IF EXISTS "instances_instance_search"',
+]
+
+# (index, table, column)
+POSTGRES_INDEXES = [
+    ('instances_instance_instance_id_d14e9e21_trgm', 'instances_instance', 'instance_id'),
+    ('instances_instance_instance_name_56cb8cd2_trgm', 'instances_instance', 'instance_name'),
+    ('instances_instance_account_f84328e6_trgm', 'instances_instance', 'account'),
+    ('instances_instance_ip_9c369424_trgm', 'instances_instance', 'ip'),
+    ('vpc_vpc_vpc_id_03eaa746_trgm', 'vpc_vpc', 'vpc_id'),
+    ('instances_instance_security_groupid_931e6ee8_trgm', 'instances_instance', 'security_groupid'),
+]
+
+POSTGRES_INSTALL = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+    f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+    for name, table, column in POSTGRES_INDEXES
+]
+
+POSTGRES_UNINSTALL = [f'DROP INDEX IF EXISTS "{name}"' for name, _table, _column in POSTGRES_INDEXES]
+
+
+def _execute(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement, params=None)
+
+
+def install(apps, schema_editor):
+    _execute(schema_editor, {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL})
+
+
+def uninstall(apps, schema_editor):
+    _execute(schema_editor, {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instances', '0008_alter_instance_vpc'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
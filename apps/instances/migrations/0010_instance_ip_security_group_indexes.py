@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:02
+# Indexes for the identifier fast path of the changelist search: ip and
+# security_groupid, plus the vpc foreign key index that 0007 lost on SQLite
+# databases whose vpc_id column it rebuilt by hand.
+
+from django.db import migrations, models
+
+
+def create_vpc_fk_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, 'instances_instance')
+    if any(info['index'] and info['columns'] == ['vpc_id'] for info in constraints.values()):
+        return
+    qn = schema_editor.quote_name
+    name = schema_editor._create_index_name('instances_instance', ['vpc_id'])
+    schema_editor.execute(f'CREATE INDEX {qn(name)} ON {qn("instances_instance")} ({qn("vpc_id")})')
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instances', '0009_instance_search_index'),
+        ('vpc', '0003_vpc_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='instance',
+            index=models.Index(fields=['ip'], name='instances_i_ip_9ed98a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='instance',
+            index=models.Index(fields=['security_groupid'], name='instances_i_securit_ed2c67_idx'),
+        ),
+        migrations.RunPython(create_vpc_fk_index, noop),
+    ]
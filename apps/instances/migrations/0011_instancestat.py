@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:06
+# Summary table of Instance counts, filled from the existing rows (see apps/admin_enhanced/summary.py).
+
+from django.db import migrations, models
+
+from apps.admin_enhanced.summary import populate
+
+
+def fill_instancestat(apps, schema_editor):
+    populate(
+        apps.get_model('instances', 'Instance'), apps.get_model('instances', 'InstanceStat'),
+        ['account', 'region', 'state'], schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instances', '0010_instance_ip_security_group_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstanceStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveBigIntegerField(default=0, verbose_name='Count')),
+                ('account', models.CharField(max_length=100, verbose_name='Account')),
+                ('region', models.CharField(max_length=50, verbose_name='Region')),
+                ('state', models.CharField(choices=[('running', 'Running'), ('stopped', 'Stopped'), ('pending', 'Pending'), ('terminated', 'Terminated')], max_length=20, verbose_name='State')),
+            ],
+            options={
+                'verbose_name': 'Instance Statistic',
+                'verbose_name_plural': 'Instance Statistics',
+                'constraints': [models.UniqueConstraint(fields=('account', 'region', 'state'), name='instances_instancestat_unique')],
+            },
+        ),
+        migrations.RunPython(fill_instancestat, migrations.RunPython.noop),
+    ]
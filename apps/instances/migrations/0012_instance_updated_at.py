@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:09
+# Adds Instance.updated_at (version of the cached object modal).
+#
+# On SQLite the column is added by rebuilding instances_instance, which
+# fails while the search index trigger on vpc_vpc (it reads the instance
+# table) exists, so the instance search index is dropped around the
+# rebuild and installed again.
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# The instance search index as 0009 installed it (frozen SQL)
+search_index = import_module('apps.instances.migrations.0009_instance_search_index')
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search_index.install(apps, schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search_index.uninstall(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instances', '0011_instancestat'),
+        ('vpc', '0005_vpc_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(uninstall, install),
+        migrations.AddField(
+            model_name='instance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='最后修改时间（详情弹窗缓存的版本号）', verbose_name='Update Time'),
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from apps.admin_enhanced.summary import SummaryCount, SummaryManager
+
 
 class Instance(models.Model):
     """云实例模型"""
@@ -72,6 +74,15 @@ class Instance(models.Model):
         help_text=_("创建时间")
     )
     
+    updated_at = models.DateTimeField(
+        _("Update Time"),
+        auto_now=True,
+        help_text=_("最后修改时间（详情弹窗缓存的版本号）")
+    )
+    
+    # bulk_create / update / delete 同步维护 InstanceStat
+    objects = SummaryManager()
+    
     class Meta:
         verbose_name = _("Instance")
         verbose_name_plural = _("Instances")
@@ -80,7 +91,32 @@ class Instance(models.Model):
             models.Index(fields=["account", "region"]),
             models.Index(fields=["state"]),
             models.Index(fields=["create_time"]),
+            models.Index(fields=["ip"]),
+            models.Index(fields=["security_groupid"]),
         ]
     
     def __str__(self):
         return f"{self.instance_name} ({self.instance_id})"
+
+
+class InstanceStat(SummaryCount):
+    """按 (账户, 区域, 状态) 汇总的实例数，由信号与批量操作增量维护"""
+    
+    account = models.CharField(_("Account"), max_length=100)
+    
+    region = models.CharField(_("Region"), max_length=50)
+    
+    state = models.CharField(_("State"), max_length=20, choices=Instance.STATE_CHOICES)
+    
+    class Meta:
+        verbose_name = _("Instance Statistic")
+        verbose_name_plural = _("Instance Statistics")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "region", "state"],
+                name="instances_instancestat_unique",
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.account} / {self.region} / {self.state}: {self.count}"
@@ -0,0 +1,342 @@
+"""
+On-disk archive of the log stream, searchable from the admin.
+
+The Redis stream only keeps the newest entries. ``manage.py archive_logs``
+drains it into segment files under ``LOGVIEWER_ARCHIVE_ROOT``: gzip
+compressed JSON Lines, one encode_entry() line per entry, oldest first.
+Segments are partitioned by time: every ``LOGVIEWER_ARCHIVE_SEGMENT_SECONDS``
+window of entry IDs (UTC) gets its own files, of at most
+``LOGVIEWER_ARCHIVE_SEGMENT_LINES`` lines each, at
+``<stream>/<YYYY>/<MM>/<DD>/<HHMMSS>-<first ID>.jsonl.gz``.
+
+Each segment's index is a LogSegment row: its time range, its lines per
+level (and the highest level), and a Bloom filter of the words of its
+messages and the dotted prefixes of its loggers. ArchiveSearch asks the
+database for the segments that overlap the time range and hold a line at
+or above the level, skips those whose Bloom filter lacks one of the words
+or the logger, and decompresses only the rest, newest first, until a page
+is full. The next page starts before the last line shown (a stream ID),
+so later pages cost no more than the first.
+
+Words are runs of letters, digits and underscores, compared without
+case; a search matches the lines whose message has all of its words.
+"""
+import collections
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import LogSegment
+from .stream import LogFilter, encode_entry, get_stream_name, level_number, stream_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_SECONDS = 600
+DEFAULT_SEGMENT_LINES = 100000
+DEFAULT_KEEP_DAYS = 30
+
+# Entries fetched per XRANGE while draining
+READ_COUNT = 1000
+
+COMPRESS_LEVEL = 6
+
+# False positive rate the Bloom filters are sized for, and their largest size (bits)
+BLOOM_ERROR_RATE = 0.01
+MAX_BLOOM_BITS = 1 << 20
+
+PAGE_SIZE = 100
+
+_WORD = re.compile(r'\w+')
+_UNSAFE_PATH = re.compile(r'[^\w.-]')
+
+
+def get_archive_root():
+    return Path(getattr(settings, 'LOGVIEWER_ARCHIVE_ROOT', Path(settings.BASE_DIR) / 'log_archive'))
+
+
+def get_segment_seconds():
+    return getattr(settings, 'LOGVIEWER_ARCHIVE_SEGMENT_SECONDS', DEFAULT_SEGMENT_SECONDS)
+
+
+def get_segment_lines():
+    return getattr(settings, 'LOGVIEWER_ARCHIVE_SEGMENT_LINES', DEFAULT_SEGMENT_LINES)
+
+
+def get_keep_days():
+    return getattr(settings, 'LOGVIEWER_ARCHIVE_KEEP_DAYS', DEFAULT_KEEP_DAYS)
+
+
+def tokenize(text):
+    return _WORD.findall(text.casefold())
+
+
+def logger_tokens(name):
+    """Index tokens of a logger name: ``@`` and each dotted prefix, so a prefix search can use the Bloom filter."""
+    parts = name.split('.')
+    return ['@' + '.'.join(parts[:index]) for index in range(1, len(parts) + 1)]
+
+
+def id_datetime(entry_id):
+    """When a stream entry was added, from its ID."""
+    return datetime.fromtimestamp(stream_key(entry_id)[0] / 1000, timezone.utc)
+
+
+class BloomFilter:
+    """Bit array with ``hashes`` positions per item (double hashing of one BLAKE2b digest)."""
+
+    def __init__(self, data, hashes):
+        self.data = data
+        self.hashes = hashes
+        self.size = len(data) * 8
+
+    @classmethod
+    def for_items(cls, count, error_rate=BLOOM_ERROR_RATE):
+        count = max(count, 1)
+        bits = -count * math.log(error_rate) / math.log(2) ** 2
+        bits = min(max(int(bits), 64), MAX_BLOOM_BITS)
+        hashes = min(max(round(bits / count * math.log(2)), 1), 16)
+        return cls(bytearray((bits + 7) // 8), hashes)
+
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * step) % self.size for index in range(self.hashes)]
+
+    def add(self, item):
+        for position in self.positions(item):
+            self.data[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        data = self.data
+        return all(data[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+
+def write_segment(stream, entries, root=None):
+    """Write ``entries`` (``[(id, fields)]``, oldest first) as one segment; returns its LogSegment."""
+    root = Path(root or get_archive_root())
+    first_id, last_id = entries[0][0], entries[-1][0]
+    start = id_datetime(first_id)
+    path = f'{_UNSAFE_PATH.sub("_", stream)}/{start:%Y/%m/%d}/{start:%H%M%S}-{first_id}.jsonl.gz'
+    levels = collections.Counter()
+    loggers = set()
+    tokens = set()
+    lines = []
+    for entry_id, fields in entries:
+        lines.append(encode_entry(entry_id, fields))
+        levels[fields.get('level', '')] += 1
+        loggers.add(fields.get('logger', ''))
+        tokens.update(tokenize(fields.get('message', '')))
+    for name in loggers:
+        tokens.update(logger_tokens(name))
+    bloom = BloomFilter.for_items(len(tokens))
+    for token in tokens:
+        bloom.add(token)
+
+    target = root / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temporary = target.with_name(target.name + '.tmp')
+    data = gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'), COMPRESS_LEVEL)
+    temporary.write_bytes(data)
+    os.replace(temporary, target)
+    return LogSegment.objects.create(
+        stream=stream,
+        path=path,
+        first_id=first_id,
+        last_id=last_id,
+        start=start,
+        end=id_datetime(last_id),
+        lines=len(entries),
+        size=len(data),
+        level_counts=dict(levels),
+        max_level=max(level_number(name) for name in levels),
+        bloom=bytes(bloom.data),
+        bloom_hashes=bloom.hashes,
+    )
+
+
+def prune(keep_days, root=None):
+    """Delete the segments that ended more than ``keep_days`` days ago; returns how many."""
+    root = Path(root or get_archive_root())
+    old = LogSegment.objects.filter(end__lt=datetime.now(timezone.utc) - timedelta(days=keep_days))
+    for path in old.values_list('path', flat=True).iterator():
+        (root / path).unlink(missing_ok=True)
+    deleted, _by_model = old.delete()
+    return deleted
+
+
+class _MemoryClient:
+    """Synchronous stand-in for redis.Redis reading memory.py's streams."""
+
+    def xrange(self, name, min='-', max='+', count=None):
+        from . import memory
+        return memory.xrange(name, min, max, count)
+
+
+def connect():
+    url = getattr(settings, 'LOGVIEWER_REDIS_URL', None) or settings.REDIS_URL
+    if url.startswith('memory://'):
+        return _MemoryClient()
+    import redis
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+class Archiver:
+    """
+    Drains the log stream into segments. drain() reads every entry after
+    the last one archived and writes the windows that are complete;
+    close() writes what is still buffered.
+    """
+
+    def __init__(self, client=None, stream=None, root=None, segment_seconds=None, segment_lines=None):
+        self.client = client
+        self.stream = stream or get_stream_name()
+        self.root = Path(root or get_archive_root())
+        self.segment_seconds = segment_seconds or get_segment_seconds()
+        self.segment_lines = segment_lines or get_segment_lines()
+        self.buffer = []
+        self.last_id = None
+        self.segments_written = 0
+
+    def window(self, entry_id):
+        return stream_key(entry_id)[0] // (self.segment_seconds * 1000)
+
+    def drain(self):
+        """Read the new entries of the stream; returns how many."""
+        if self.client is None:
+            self.client = connect()
+        if self.last_id is None:
+            # Entries read but not written before a restart are read again
+            self.last_id = LogSegment.objects.filter(stream=self.stream).order_by('-pk').values_list(
+                'last_id', flat=True).first() or ''
+        read = 0
+        while True:
+            lower = '(' + self.last_id if self.last_id else '-'
+            entries = self.client.xrange(self.stream, min=lower, count=READ_COUNT)
+            if not entries:
+                break
+            for entry_id, fields in entries:
+                if self.buffer and (len(self.buffer) >= self.segment_lines
+                                    or self.window(entry_id) != self.window(self.buffer[0][0])):
+                    self.write()
+                self.buffer.append((entry_id, fields))
+            self.last_id = entries[-1][0]
+            read += len(entries)
+        if self.buffer and self.window(self.buffer[0][0]) < int(time.time()) // self.segment_seconds:
+            self.write()
+        return read
+
+    def write(self):
+        entries, self.buffer = self.buffer, []
+        write_segment(self.stream, entries, self.root)
+        self.segments_written += 1
+
+    def close(self):
+        if self.buffer:
+            self.write()
+
+
+class ArchivePage:
+    """One page of search results, newest first, and what it cost."""
+
+    def __init__(self, lines, next_before, segments, skipped, read, elapsed):
+        self.lines = lines
+        # Stream ID to pass as ``before`` for the next page; None on the last page
+        self.next_before = next_before
+        # Segments in the time range and level, those the Bloom filters ruled out, those decompressed
+        self.segments = segments
+        self.skipped = skipped
+        self.read = read
+        self.elapsed = elapsed
+
+
+class ArchiveSearch:
+    """A search of the archive by words, level, logger prefix and time range."""
+
+    def __init__(self, text='', level=None, logger=None, since=None, until=None, stream=None, root=None):
+        self.words = sorted(set(tokenize(text or '')))
+        self.filter = LogFilter(level=level, logger=logger)
+        self.tokens = self.words + (['@' + logger] if logger else [])
+        self.since = since
+        self.until = until
+        self.stream = stream or get_stream_name()
+        self.root = Path(root or get_archive_root())
+
+    def segments(self, before=None):
+        """The segments that may hold a match, by time range and level, newest first."""
+        segments = LogSegment.objects.filter(stream=self.stream)
+        if self.since:
+            segments = segments.filter(end__gte=self.since)
+        if self.until:
+            segments = segments.filter(start__lte=self.until)
+        if before:
+            segments = segments.filter(start__lte=id_datetime(before))
+        if self.filter.level:
+            segments = segments.filter(max_level__gte=self.filter.level)
+        if not self.tokens:
+            segments = segments.defer('bloom')
+        return segments.order_by('-start', '-pk')
+
+    def may_match(self, segment):
+        bloom = BloomFilter(bytes(segment.bloom), segment.bloom_hashes)
+        return all(token in bloom for token in self.tokens)
+
+    def run(self, before=None, limit=PAGE_SIZE):
+        started = time.perf_counter()
+        lines = []
+        skipped = read = 0
+        segments = self.segments(before)
+        for segment in segments.iterator(chunk_size=100):
+            if self.tokens and not self.may_match(segment):
+                skipped += 1
+                continue
+            read += 1
+            self.read_segment(segment, before, limit, lines)
+            if len(lines) >= limit:
+                break
+        next_before = lines[-1]['id'] if len(lines) >= limit else None
+        return ArchivePage(lines, next_before, segments.count(), skipped, read, time.perf_counter() - started)
+
+    def read_segment(self, segment, before, limit, lines):
+        """Append the matching lines of ``segment``, newest first, to ``lines`` until it has ``limit``."""
+        try:
+            data = gzip.decompress((self.root / segment.path).read_bytes()).decode('utf-8')
+        except FileNotFoundError:
+            logger.warning('Log archive segment %s is missing', segment.path)
+            return
+        before_key = stream_key(before) if before else None
+        since_ms = self.since.timestamp() * 1000 if self.since else None
+        until_ms = self.until.timestamp() * 1000 if self.until else None
+        words = set(self.words)
+        for raw in reversed(data.splitlines()):
+            # Lines start with {"id":"<ID>", see encode_entry()
+            entry_id = raw[7:raw.index('"', 7)]
+            key = stream_key(entry_id)
+            if before_key is not None and key >= before_key:
+                continue
+            if until_ms is not None and key[0] > until_ms:
+                continue
+            if since_ms is not None and key[0] < since_ms:
+                return
+            if words:
+                lowered = raw.casefold()
+                if not all(word in lowered for word in words):
+                    continue
+            fields = json.loads(raw)
+            if not self.filter.matches(fields):
+                continue
+            if words and not words.issubset(tokenize(fields.get('message', ''))):
+                continue
+            fields['time'] = id_datetime(entry_id)
+            lines.append(fields)
+            if len(lines) >= limit:
+                return
@@ -1,17 +1,126 @@
 """
-WebSocket consumer for real-time log viewer (placeholder for stage 3).
+WebSocket consumer for the real-time log viewer.
+
+Staff users only. After a welcome message the socket receives frames of
+log lines from the process's LogHub (see stream.py)::
+
+    {"type": "logs", "dropped": <lines missed since the last frame>, "lines": [...]}
+
+Every line has its stream entry ID (``"id"``). The client narrows what it
+receives, and catches up after a reconnect, with a subscribe message; a
+new one replaces the previous subscription::
+
+    {"type": "subscribe", "level": "WARNING", "logger": "apps.instances",
+     "keyword": "timeout", "regex": "vpc-[0-9a-f]+",
+     "replay": 200, "resume": "<ID of the last line received>"}
+
+All fields but ``type`` are optional. The filters are applied on the
+server, so only matching lines are sent. ``replay`` sends the last N
+matching lines first, ``resume`` the matching lines after the given ID
+(the newest ``replay`` of them, or LOGVIEWER_CLIENT_BACKLOG); both read
+the Redis stream and arrive as history frames before any live frame::
+
+    {"type": "history", "dropped": <older matching lines not sent>, "lines": [...]}
+
+followed by ``{"type": "subscribed", "filter": {...}, "history": <lines>,
+"complete": <false if the stream no longer holds every line asked for>}``,
+then live frames. Bad messages get ``{"type": "error", "message": "..."}``
+and leave the subscription as it was.
 """
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from .stream import LogFilter, get_hub, is_stream_id
+
+# Lines per history frame
+HISTORY_FRAME_LINES = 500
+
 
 class LogViewerConsumer(AsyncWebsocketConsumer):
+    # Frames come from the shared LogHub: no channel layer, so no Redis connection per socket
+    channel_layer_alias = None
+    subscription = None
+    history_task = None
+
     async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_active or not user.is_staff:
+            await self.close()
+            return
         await self.accept()
         await self.send(text_data=json.dumps({"type": "welcome", "message": "Log viewer connected."}))
+        self.hub = get_hub()
+        self.subscription = self.hub.subscribe(self.send_frame)
 
     async def disconnect(self, close_code):
-        pass
+        if self.history_task is not None:
+            self.history_task.cancel()
+            self.history_task = None
+        if self.subscription is not None:
+            self.hub.unsubscribe(self.subscription)
+            self.subscription = None
 
     async def receive(self, text_data=None, bytes_data=None):
-        pass
+        if self.subscription is None:
+            return
+        try:
+            message = json.loads(text_data or "")
+        except ValueError:
+            message = None
+        if not isinstance(message, dict) or message.get("type") != "subscribe":
+            await self.send_error("Unknown message.")
+            return
+        replay = message.get("replay") or 0
+        resume = message.get("resume") or None
+        try:
+            if not isinstance(replay, int) or isinstance(replay, bool) or replay < 0:
+                raise ValueError('"replay" must be a positive number of lines.')
+            if resume is not None and not is_stream_id(resume):
+                raise ValueError('"resume" must be a stream entry ID.')
+            log_filter = LogFilter.from_message(message)
+        except ValueError as exc:
+            await self.send_error(str(exc))
+            return
+        self.subscribe(log_filter, replay, resume)
+
+    def subscribe(self, log_filter, replay=0, resume=None):
+        if self.history_task is not None:
+            self.history_task.cancel()
+        # Subscribe before unsubscribing, so the hub keeps reading; live frames wait for the history
+        previous = self.subscription
+        self.subscription = self.hub.subscribe(self.send_frame, log_filter, live=False)
+        self.hub.unsubscribe(previous)
+        # Not awaited here: reading history must not hold up this socket's other messages
+        self.history_task = asyncio.create_task(self.send_history(self.subscription, replay, resume))
+
+    async def send_history(self, subscription, replay, resume):
+        hub = self.hub
+        lines, dropped, complete = [], 0, True
+        if replay or resume:
+            await hub.started.wait()
+            end = hub.mark(subscription)
+            limit = min(replay or hub.backlog, hub.backlog)
+            try:
+                lines, dropped, complete = await hub.history(subscription.filter, end, limit, after=resume)
+            except Exception:
+                await self.send_error("Reading the log history failed.")
+                complete = False
+        else:
+            hub.mark(subscription)
+        for start in range(0, len(lines), HISTORY_FRAME_LINES):
+            await self.send(text_data='{"type":"history","dropped":%d,"lines":[%s]}' % (
+                dropped if start == 0 else 0, ",".join(lines[start:start + HISTORY_FRAME_LINES])))
+        await self.send(text_data=json.dumps({
+            "type": "subscribed",
+            "filter": subscription.filter.as_dict(),
+            "history": len(lines),
+            "complete": complete,
+        }))
+        subscription.live = True
+
+    async def send_error(self, message):
+        await self.send(text_data=json.dumps({"type": "error", "message": message}))
+
+    async def send_frame(self, frame):
+        await self.send(text_data=frame)
@@ -0,0 +1,49 @@
+from django import forms
+from django.utils.translation import gettext_lazy as _
+
+from .stream import is_stream_id
+
+LEVEL_CHOICES = [
+    ("", _("All levels")),
+    ("DEBUG", "DEBUG"),
+    ("INFO", "INFO"),
+    ("WARNING", "WARNING"),
+    ("ERROR", "ERROR"),
+    ("CRITICAL", "CRITICAL"),
+]
+
+DATETIME_FORMATS = ["%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"]
+
+
+class ArchiveSearchForm(forms.Form):
+    """日志归档搜索条件（GET 参数）"""
+
+    q = forms.CharField(label=_("Words"), required=False, max_length=200)
+    level = forms.ChoiceField(label=_("Level"), choices=LEVEL_CHOICES, required=False)
+    logger = forms.CharField(label=_("Logger"), required=False, max_length=200)
+    since = forms.DateTimeField(
+        label=_("Since"),
+        required=False,
+        input_formats=DATETIME_FORMATS,
+        widget=forms.DateTimeInput(attrs={"type": "datetime-local"}, format="%Y-%m-%dT%H:%M"),
+    )
+    until = forms.DateTimeField(
+        label=_("Until"),
+        required=False,
+        input_formats=DATETIME_FORMATS,
+        widget=forms.DateTimeInput(attrs={"type": "datetime-local"}, format="%Y-%m-%dT%H:%M"),
+    )
+    # Cursor of the next page: the stream ID of the last line shown
+    before = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            if name != "before":
+                field.widget.attrs.setdefault("class", "form-control form-control-sm")
+
+    def clean_before(self):
+        before = self.cleaned_data["before"]
+        if before and not is_stream_id(before):
+            raise forms.ValidationError(_("Invalid page cursor."))
+        return before
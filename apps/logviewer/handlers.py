@@ -0,0 +1,253 @@
+"""
+Logging handler that ships records to the log viewer's Redis stream.
+
+RedisStreamHandler never waits for Redis. emit() formats the record and
+appends it to an in-memory ring buffer (a bounded deque), which costs a
+few microseconds; a background thread drains the buffer every
+``flush_interval`` seconds, or as soon as ``batch_size`` records are
+waiting, and sends each batch as one pipeline of ``XADD ... MAXLEN ~``
+commands, so the stream stays capped at about ``maxlen`` entries.
+
+When Redis is slow or down the buffer fills up and the oldest records
+are overwritten; a batch that fails to send is dropped and the thread
+retries after ``retry_interval`` seconds. Both are counted (see stats()),
+nothing is raised and the caller never blocks. The thread writes one line
+to stderr when sending starts failing and one when it recovers (at most
+one outage report every REPORT_INTERVAL seconds), so an outage is visible
+outside stats(). Records logged by the
+background thread itself (e.g. by the Redis client) are ignored, so a
+failing Redis cannot feed the buffer.
+
+Configured in LOGGING (config/settings/channels.py)::
+
+    "logviewer": {"class": "apps.logviewer.handlers.RedisStreamHandler"}
+
+The URL and stream default to LOGVIEWER_REDIS_URL and LOGVIEWER_STREAM;
+``memory://`` writes to the in-process stand-in (memory.py).
+"""
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+
+DEFAULT_CAPACITY = 10000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.2
+DEFAULT_MAXLEN = 100000
+DEFAULT_RETRY_INTERVAL = 2.0
+
+# Seconds close() waits for the last batch at shutdown
+SHUTDOWN_TIMEOUT = 1.0
+
+# Minimum seconds between two "sending failed" lines on stderr
+REPORT_INTERVAL = 60.0
+
+# Redis socket timeouts (seconds): a stalled Redis delays the background thread, never the caller
+SOCKET_TIMEOUT = 2.0
+
+_handlers = weakref.WeakSet()
+
+
+class _MemoryClient:
+    """Synchronous stand-in for redis.Redis writing to memory.py's streams."""
+
+    def pipeline(self, transaction=True):
+        return _MemoryPipeline()
+
+
+class _MemoryPipeline:
+    def __init__(self):
+        self.commands = []
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.commands.append((name, fields, maxlen))
+
+    def execute(self):
+        from . import memory
+        commands, self.commands = self.commands, []
+        return [memory.xadd(name, fields, maxlen) for name, fields, maxlen in commands]
+
+
+def _settings_value(name, default):
+    from django.conf import settings
+    return getattr(settings, name, None) or default
+
+
+class RedisStreamHandler(logging.Handler):
+    """Buffers records in memory and XADDs them to a capped Redis stream from a background thread."""
+
+    def __init__(self, url=None, stream=None, capacity=DEFAULT_CAPACITY, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, maxlen=DEFAULT_MAXLEN,
+                 retry_interval=DEFAULT_RETRY_INTERVAL, level=logging.NOTSET):
+        super().__init__(level)
+        self.url = url
+        self.stream = stream
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maxlen = maxlen
+        self.retry_interval = retry_interval
+        self.buffer = collections.deque(maxlen=capacity)
+        self.emitted = 0
+        self.dropped = 0
+        self.failed = 0
+        self.sent = 0
+        # Set while an outage reported on stderr lasts: failed count when it started
+        self._outage_failed = None
+        self._reported_at = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_id = None
+        _handlers.add(self)
+
+    def emit(self, record):
+        # Called with the handler lock held, so the counters need no lock of their own
+        try:
+            if self._thread_id is not None and record.thread == self._thread_id:
+                return
+            if self._thread is None:
+                self._start()
+            buffer = self.buffer
+            if len(buffer) == self.capacity:
+                # The deque overwrites its oldest record
+                self.dropped += 1
+            buffer.append((record.created, record.levelname, record.name, self.format(record)))
+            self.emitted += 1
+            if len(buffer) >= self.batch_size and not self._wake.is_set():
+                self._wake.set()
+        except Exception:
+            self.handleError(record)
+
+    def stats(self):
+        """Counters since the handler was created: records emitted, sent, overwritten and lost in failed sends."""
+        return {
+            'emitted': self.emitted,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'buffered': len(self.buffer),
+        }
+
+    def _start(self):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='logviewer-stream-handler', daemon=True)
+        self._thread.start()
+        self._thread_id = self._thread.ident
+
+    def _connect(self):
+        url = self.url or _settings_value('LOGVIEWER_REDIS_URL', None) or _settings_value('REDIS_URL', '')
+        if self.stream is None:
+            self.stream = _settings_value('LOGVIEWER_STREAM', 'site_logs')
+        if url.startswith('memory://'):
+            return _MemoryClient()
+        import redis
+        return redis.Redis.from_url(url, socket_timeout=SOCKET_TIMEOUT, socket_connect_timeout=SOCKET_TIMEOUT)
+
+    def _take_batch(self):
+        buffer = self.buffer
+        batch = []
+        try:
+            for _index in range(self.batch_size):
+                batch.append(buffer.popleft())
+        except IndexError:
+            pass
+        return batch
+
+    def _send(self, client, batch):
+        pipeline = client.pipeline(transaction=False)
+        for created, level, name, message in batch:
+            pipeline.xadd(self.stream, {
+                'level': level,
+                'logger': name,
+                'message': message,
+                'timestamp': datetime.fromtimestamp(created, timezone.utc).isoformat(timespec='milliseconds'),
+            }, maxlen=self.maxlen, approximate=True)
+        pipeline.execute()
+
+    def _run(self):
+        client = None
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stop.is_set()
+            while self.buffer:
+                batch = self._take_batch()
+                try:
+                    if client is None:
+                        client = self._connect()
+                    self._send(client, batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    client = None
+                    self._report_failure(e, len(batch))
+                    # New records must not cut the back-off short
+                    if stopping or self._stop.wait(self.retry_interval):
+                        return
+                    break
+                self.sent += len(batch)
+                self._report_recovery()
+            if stopping:
+                return
+
+    def _report_failure(self, error, count):
+        if self._outage_failed is not None:
+            return
+        now = time.monotonic()
+        if self._reported_at is not None and now - self._reported_at < REPORT_INTERVAL:
+            return
+        self._outage_failed = self.failed - count
+        self._reported_at = now
+        self._write_stderr(
+            f'logviewer: sending log records to stream {self.stream!r} failed ({type(error).__name__}: {error}); '
+            f'records are dropped until it recovers'
+        )
+
+    def _report_recovery(self):
+        if self._outage_failed is None:
+            return
+        lost = self.failed - self._outage_failed
+        self._outage_failed = None
+        self._write_stderr(f'logviewer: sending log records to stream {self.stream!r} recovered; {lost} records lost')
+
+    @staticmethod
+    def _write_stderr(line):
+        try:
+            sys.stderr.write(line + '\n')
+            sys.stderr.flush()
+        except Exception:
+            pass
+
+    def flush(self):
+        """Ask the background thread to send what is buffered; does not wait."""
+        self._wake.set()
+
+    def close(self):
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join(SHUTDOWN_TIMEOUT)
+            self._thread = self._thread_id = None
+        super().close()
+
+    def _after_fork(self):
+        # The child has the buffer but not the thread: start a new one on the next record
+        self._thread = self._thread_id = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._outage_failed = self._reported_at = None
+        self.buffer.clear()
+
+
+def _reset_after_fork():
+    for handler in list(_handlers):
+        handler._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
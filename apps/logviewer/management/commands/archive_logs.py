@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.logviewer.archive import Archiver, get_keep_days, prune
+
+# 持续运行时，清理过期分段的间隔秒数
+PRUNE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = (
+        "把日志流（LOGVIEWER_STREAM）归档为按时间分段的压缩文件（LOGVIEWER_ARCHIVE_ROOT），"
+        "并为每个分段建立索引（时间范围、级别计数、词 Bloom 过滤器）；"
+        "--interval 大于 0 时持续运行，只写入已结束的时间窗口"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="持续归档的间隔秒数（默认：0，归档一次并写入未结束的窗口后退出）",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=None,
+            help="删除多少天前结束的分段（默认：LOGVIEWER_ARCHIVE_KEEP_DAYS，0 为不删除）",
+        )
+
+    def handle(self, *args, **options):
+        keep_days = get_keep_days() if options["keep_days"] is None else options["keep_days"]
+        archiver = Archiver()
+        pruned_at = None
+        try:
+            while True:
+                written = archiver.segments_written
+                read = archiver.drain()
+                if options["interval"] <= 0:
+                    archiver.close()
+                if read or archiver.segments_written > written:
+                    self.stdout.write(
+                        f"读取 {read} 行，写入 {archiver.segments_written - written} 个分段，"
+                        f"缓冲 {len(archiver.buffer)} 行"
+                    )
+                if keep_days and (pruned_at is None or time.monotonic() - pruned_at >= PRUNE_INTERVAL):
+                    pruned = prune(keep_days)
+                    pruned_at = time.monotonic()
+                    if pruned:
+                        self.stdout.write(f"删除 {pruned} 个 {keep_days} 天前的分段")
+                if options["interval"] <= 0:
+                    return
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            # 停止前写入缓冲中的行，下次启动从最后一个分段之后继续
+            archiver.close()
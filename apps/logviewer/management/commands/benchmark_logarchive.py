@@ -0,0 +1,163 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.admin_enhanced.management.commands.benchmark_admin import git_commit
+from apps.logviewer.archive import ArchiveSearch, write_segment
+from apps.logviewer.models import LogSegment
+
+STREAM = "benchmark_logs"
+
+LEVELS = ["DEBUG"] * 20 + ["INFO"] * 70 + ["WARNING"] * 9 + ["ERROR"]
+
+LOGGERS = [
+    "apps.instances.sync",
+    "apps.vpc.sync",
+    "apps.celery_monitor",
+    "celery.worker",
+    "django.request",
+    "django.db.backends",
+]
+
+MESSAGES = [
+    "request {n} GET /export/instances/{m} 200 in {ms} ms",
+    "synced {m} instances of account acct{a} in region r{a} in {ms} ms",
+    "task export_job[{n}] succeeded in {ms} ms",
+    "retry {m} of task bulk_edit_job[{n}] after timeout",
+    "query took {ms} ms rows={m}",
+]
+
+# 只在一个时间窗口里出现一次的罕见词，用于测量“整个范围只命中一个分段”的查询
+RARE_WORD = "deadlock"
+
+
+class Command(BaseCommand):
+    help = (
+        "日志归档基准：在临时目录生成若干天的合成日志分段（流 benchmark_logs），"
+        "测量按词、级别、logger 与时间范围搜索第一页和翻页的耗时，以及被索引跳过的分段数"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="生成的天数（默认：7）")
+        parser.add_argument("--lines-per-minute", type=int, default=200, help="每分钟的日志行数（默认：200）")
+        parser.add_argument("--segment-seconds", type=int, default=600, help="分段的时间窗口秒数（默认：600）")
+        parser.add_argument("--seed", type=int, default=42, help="随机种子（默认：42）")
+        parser.add_argument("--output", help="JSON 结果路径（默认：benchmarks/logarchive-<时间>-<提交>.json）")
+
+    def handle(self, *args, **options):
+        root = tempfile.mkdtemp(prefix="logarchive-")
+        LogSegment.objects.filter(stream=STREAM).delete()
+        try:
+            generated = self.generate(root, options)
+            results = self.run_queries(root, generated["end"], options["days"])
+        finally:
+            LogSegment.objects.filter(stream=STREAM).delete()
+            shutil.rmtree(root, ignore_errors=True)
+        generated["end"] = generated["end"].isoformat()
+        self.write_report(generated, results, options)
+
+    def generate(self, root, options):
+        rng = random.Random(options["seed"])
+        window_ms = options["segment_seconds"] * 1000
+        per_window = options["lines_per_minute"] * options["segment_seconds"] // 60
+        end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        start_ms = int((end - timedelta(days=options["days"])).timestamp() * 1000)
+        windows = options["days"] * 86400 * 1000 // window_ms
+        # 罕见词只出现在第二天中午附近的一个窗口
+        rare_window = min(windows - 1, (86400 * 1000 + 12 * 3600 * 1000) // window_ms)
+
+        self.stdout.write(f"生成 {options['days']} 天、每个窗口 {per_window} 行、共 {windows} 个分段...")
+        started = time.perf_counter()
+        lines = 0
+        for window in range(windows):
+            base = start_ms + window * window_ms
+            entries = []
+            for index in range(per_window):
+                n = window * per_window + index
+                message = rng.choice(MESSAGES).format(
+                    n=n, m=rng.randrange(5000), a=rng.randrange(20), ms=rng.randrange(1000),
+                )
+                if window == rare_window and index == per_window // 2:
+                    message += f" ({RARE_WORD} detected)"
+                ms = base + index * window_ms // per_window
+                entries.append((f"{ms}-0", {
+                    "level": rng.choice(LEVELS),
+                    "logger": rng.choice(LOGGERS),
+                    "message": message,
+                    "timestamp": datetime.fromtimestamp(ms / 1000, timezone.utc).isoformat(timespec="milliseconds"),
+                }))
+            write_segment(STREAM, entries, root)
+            lines += len(entries)
+        elapsed = time.perf_counter() - started
+        size = sum(LogSegment.objects.filter(stream=STREAM).values_list("size", flat=True))
+        self.stdout.write(
+            f"  {lines:,} 行，{windows} 个分段，压缩后 {size / 1024 / 1024:.1f} MB，"
+            f"{elapsed:.1f} 秒（{lines / elapsed:,.0f} 行/秒）"
+        )
+        return {"lines": lines, "segments": windows, "bytes": size, "seconds": round(elapsed, 2), "end": end}
+
+    def run_queries(self, root, end, days):
+        week = {"since": end - timedelta(days=days), "until": end}
+        last_day = {"since": end - timedelta(days=1), "until": end}
+        queries = [
+            ("罕见词（整个范围）", {"text": RARE_WORD, **week}, 1),
+            ("不存在的词（整个范围）", {"text": "nosuchword", **week}, 1),
+            ("ERROR（最近一天）", {"level": "ERROR", **last_day}, 1),
+            ("ERROR（最近一天，第 5 页）", {"level": "ERROR", **last_day}, 5),
+            ("logger 前缀 + 词（整个范围）", {"logger": "apps.celery_monitor", "text": "retry timeout", **week}, 1),
+            ("常见词（整个范围）", {"text": "request", **week}, 1),
+            ("常见词（整个范围，第 20 页）", {"text": "request", **week}, 20),
+        ]
+        results = []
+        for name, criteria, pages in queries:
+            search = ArchiveSearch(stream=STREAM, root=root, **criteria)
+            before = None
+            for _page in range(pages):
+                page = search.run(before=before)
+                before = page.next_before
+                if before is None:
+                    break
+            result = {
+                "query": name,
+                "page": pages,
+                "ms": round(page.elapsed * 1000, 1),
+                "lines": len(page.lines),
+                "segments_in_range": page.segments,
+                "segments_skipped": page.skipped,
+                "segments_read": page.read,
+            }
+            results.append(result)
+            self.stdout.write(
+                f"  {name}: {result['ms']} ms，{result['lines']} 行；范围内 {page.segments} 个分段，"
+                f"索引跳过 {page.skipped} 个，读取 {page.read} 个"
+            )
+        return results
+
+    def write_report(self, generated, results, options):
+        commit = git_commit()
+        report = {
+            "meta": {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "commit": commit,
+                "days": options["days"],
+                "lines_per_minute": options["lines_per_minute"],
+                "segment_seconds": options["segment_seconds"],
+                "generated": generated,
+            },
+            "results": results,
+        }
+        output = options["output"] or os.path.join(
+            settings.BASE_DIR, "benchmarks",
+            f"logarchive-{datetime.now():%Y%m%d-%H%M%S}{'-' + commit if commit else ''}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"\n结果已写入 {output}"))
@@ -0,0 +1,90 @@
+import logging
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.admin_enhanced.management.commands.benchmark_sqlite import percentile
+from apps.logviewer import memory
+from apps.logviewer.handlers import RedisStreamHandler, _MemoryClient
+
+STREAM = "benchmark_handler_logs"
+
+# 无人监听的端口：Redis 不可用时的表现
+DOWN_URL = "redis://127.0.0.1:1/0"
+
+
+class NaiveStreamHandler(logging.Handler):
+    """对照组：在调用方线程里每条记录同步 XADD 一次"""
+
+    def __init__(self, client, stream):
+        super().__init__()
+        self.client = client
+        self.stream = stream
+
+    def emit(self, record):
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            pipeline.xadd(self.stream, {"level": record.levelname, "logger": record.name,
+                                        "message": self.format(record)}, maxlen=100000, approximate=True)
+            pipeline.execute()
+        except Exception:
+            pass
+
+
+class Command(BaseCommand):
+    help = (
+        "日志 handler 微基准：测量每次 logger.info() 的耗时（纳秒），对比无 handler、"
+        "RedisStreamHandler（进程内替身 / Redis 不可用 / --redis-url）与每条记录同步 XADD 的写法"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=100000, help="每种情况的调用次数（默认：100000）")
+        parser.add_argument("--redis-url", help="另外测量连接这个 Redis 时的情况（如 redis://127.0.0.1:6379/0）")
+
+    def handle(self, *args, **options):
+        cases = [
+            ("无 handler（NullHandler）", logging.NullHandler(), None),
+            ("RedisStreamHandler（memory://）", RedisStreamHandler(url="memory://", stream=STREAM), None),
+            (f"RedisStreamHandler（Redis 不可用 {DOWN_URL}）", RedisStreamHandler(url=DOWN_URL, stream=STREAM), None),
+            ("每条同步 XADD（memory://，无网络往返）", NaiveStreamHandler(_MemoryClient(), STREAM), None),
+        ]
+        if options["redis_url"]:
+            import redis
+            cases.append((f"RedisStreamHandler（{options['redis_url']}）",
+                          RedisStreamHandler(url=options["redis_url"], stream=STREAM), None))
+            cases.append((f"每条同步 XADD（{options['redis_url']}）",
+                          NaiveStreamHandler(redis.Redis.from_url(options["redis_url"]), STREAM), None))
+
+        self.stdout.write(f"每种情况调用 logger.info() {options['calls']:,} 次（纳秒/次）：")
+        for label, handler, _unused in cases:
+            memory.reset()
+            timings, elapsed = self.measure(handler, options["calls"])
+            line = (
+                f"  {label:<48} 平均 {elapsed / options['calls'] * 1e9:8.0f}  "
+                f"中位 {statistics.median(timings):8.0f}  p99 {percentile(timings, 0.99):10.0f}  "
+                f"最大 {max(timings):12,.0f}"
+            )
+            if isinstance(handler, RedisStreamHandler):
+                handler.close()
+                stats = handler.stats()
+                line += f"  已发送 {stats['sent']:,}，覆盖丢弃 {stats['dropped']:,}，发送失败 {stats['failed']:,}"
+            self.stdout.write(line)
+
+    def measure(self, handler, calls):
+        logger = logging.getLogger("apps.logviewer.benchmark")
+        logger.propagate = False
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        timings = []
+        clock = time.perf_counter_ns
+        start = time.perf_counter()
+        try:
+            for number in range(calls):
+                before = clock()
+                logger.info("request %s handled in %d ms", "/instances/instance/", number % 500)
+                timings.append(clock() - before)
+            elapsed = time.perf_counter() - start
+        finally:
+            logger.handlers = []
+        return timings, elapsed
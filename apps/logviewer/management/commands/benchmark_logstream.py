@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import resource
+import time
+from datetime import datetime, timezone
+
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.admin_enhanced.management.commands.benchmark_admin import git_commit
+from apps.admin_enhanced.management.commands.benchmark_sqlite import percentile
+from apps.logviewer import memory, stream
+from apps.logviewer.consumers import LogViewerConsumer
+
+STREAM = "benchmark_logs"
+
+# 生产者每秒写入的批次数
+PRODUCER_TICKS = 100
+
+LEVELS = ["DEBUG", "INFO", "INFO", "INFO", "WARNING", "ERROR"]
+
+
+class StaffUser:
+    """WebSocket scope 中的 staff 用户（不查数据库）"""
+
+    is_active = True
+    is_staff = True
+
+
+class Command(BaseCommand):
+    help = (
+        "日志流基准：使用进程内的 Redis 替身（memory://），让若干 WebSocket 连接同时订阅日志流，"
+        "按给定速率写入日志，统计送达行数、丢弃行数、帧数、延迟与事件循环延迟；"
+        "可让所有连接按级别、关键字过滤"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sockets", type=int, default=1000, help="并发连接数（默认：1000）")
+        parser.add_argument("--lines-per-second", type=int, default=10000, help="每秒写入的日志行数（默认：10000）")
+        parser.add_argument("--duration", type=float, default=10, help="运行秒数（默认：10）")
+        parser.add_argument("--rate", type=int, default=None, help="每个连接每秒最多接收的行数（默认：LOGVIEWER_CLIENT_RATE）")
+        parser.add_argument("--overflow", choices=stream.OVERFLOW_POLICIES, default=None, help="队列满时的处理方式")
+        parser.add_argument("--level", help="各连接订阅的最低级别，如 ERROR（默认：不过滤）")
+        parser.add_argument("--keyword", help="各连接订阅的消息关键字（默认：不过滤）")
+        parser.add_argument("--output", help="JSON 结果路径（默认：benchmarks/logstream-<时间>-<提交>.json）")
+
+    def handle(self, *args, **options):
+        result = asyncio.run(self.run(options))
+        self.print_result(result)
+        self.write_report(result, options)
+
+    async def run(self, options):
+        memory.reset()
+        hub = stream.LogHub(client=memory.MemoryRedis(), stream=STREAM, rate=options["rate"],
+                            overflow=options["overflow"])
+        stream._hubs[asyncio.get_running_loop()] = hub
+
+        log_filter = None
+        if options["level"] or options["keyword"]:
+            log_filter = stream.LogFilter(level=options["level"], keyword=options["keyword"])
+
+        self.stdout.write(f"建立 {options['sockets']} 个连接...")
+        communicators = []
+        for _index in range(options["sockets"]):
+            communicator = WebsocketCommunicator(LogViewerConsumer.as_asgi(), "/ws/logs/")
+            communicator.scope["user"] = StaffUser()
+            communicators.append(communicator)
+        for communicator in communicators:
+            connected, _code = await communicator.connect()
+            assert connected
+            await communicator.receive_from()
+            if log_filter is not None:
+                await communicator.send_to(text_data=json.dumps({
+                    "type": "subscribe", "level": options["level"], "keyword": options["keyword"],
+                }))
+                await communicator.receive_from()
+
+        latencies = []
+        lags = []
+        stop = asyncio.Event()
+
+        async def produce():
+            written = matching = 0
+            start = time.monotonic()
+            while not stop.is_set():
+                due = int((time.monotonic() - start) * options["lines_per_second"])
+                for number in range(written, due):
+                    fields = {
+                        "level": LEVELS[number % len(LEVELS)],
+                        "logger": f"apps.bench.worker{number % 8}",
+                        "message": f"request {number} handled in {number % 500} ms",
+                        "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                    }
+                    memory.xadd(STREAM, fields, maxlen=100000)
+                    if log_filter is None or log_filter.matches(fields):
+                        matching += 1
+                written = max(written, due)
+                await asyncio.sleep(1 / PRODUCER_TICKS)
+            return written, matching
+
+        async def drain():
+            # 取走各连接收到的帧，避免内存增长；前 20 个连接按流 ID（毫秒时间戳）计算延迟
+            while not stop.is_set():
+                await asyncio.sleep(0.2)
+                for index, communicator in enumerate(communicators):
+                    queue = communicator.output_queue
+                    while not queue.empty():
+                        message = queue.get_nowait()
+                        if index < 20 and message.get("text"):
+                            lines = json.loads(message["text"]).get("lines")
+                            if lines:
+                                sent_ms = int(lines[-1]["id"].split("-")[0])
+                                latencies.append(time.time() * 1000 - sent_ms)
+
+        async def monitor():
+            # 事件循环延迟：定时器实际醒来的时间比预定晚多少
+            while not stop.is_set():
+                expected = time.monotonic() + 0.05
+                await asyncio.sleep(0.05)
+                lags.append((time.monotonic() - expected) * 1000)
+
+        self.stdout.write(f"写入 {options['lines_per_second']} 行/秒，持续 {options['duration']} 秒...")
+        frames_before = hub.frames_sent
+        start = time.perf_counter()
+        producer = asyncio.create_task(produce())
+        tasks = [asyncio.create_task(drain()), asyncio.create_task(monitor())]
+        await asyncio.sleep(options["duration"])
+        stop.set()
+        produced, matching = await producer
+        elapsed = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        delivered = sum(subscription.sent_lines for subscription in hub.subscriptions)
+        frames = hub.frames_sent - frames_before
+
+        for communicator in communicators:
+            await communicator.disconnect()
+
+        sockets = options["sockets"]
+        return {
+            "sockets": sockets,
+            "seconds": round(elapsed, 2),
+            "rate": hub.rate,
+            "overflow": hub.overflow,
+            "filter": log_filter.as_dict() if log_filter is not None else None,
+            "produced_per_second": round(produced / elapsed),
+            "matching_per_second": round(matching / elapsed),
+            "delivered_per_second": round(delivered / elapsed),
+            "delivered_per_socket_per_second": round(delivered / elapsed / sockets, 1),
+            "missed_ratio": round(1 - delivered / (matching * sockets), 4) if matching else None,
+            "frames_per_second": round(frames / elapsed),
+            "latency_ms_median": percentile(latencies, 0.5),
+            "latency_ms_p99": percentile(latencies, 0.99),
+            "loop_lag_ms_median": percentile(lags, 0.5),
+            "loop_lag_ms_p99": percentile(lags, 0.99),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+        }
+
+    def print_result(self, result):
+        self.stdout.write(
+            f"  写入 {result['produced_per_second']:,} 行/秒（匹配过滤条件 {result['matching_per_second']:,} 行/秒）；送达 {result['delivered_per_second']:,} 行/秒"
+            f"（每连接 {result['delivered_per_socket_per_second']:,} 行/秒，限速 {result['rate']}，"
+            f"未送达 {result['missed_ratio']:.1%}，{result['overflow']}）"
+        )
+        self.stdout.write(
+            f"  {result['frames_per_second']:,} 帧/秒；延迟中位 {result['latency_ms_median']} ms，"
+            f"p99 {result['latency_ms_p99']} ms；事件循环延迟中位 {result['loop_lag_ms_median']} ms，"
+            f"p99 {result['loop_lag_ms_p99']} ms；最大内存 {result['max_rss_mb']} MB"
+        )
+
+    def write_report(self, result, options):
+        commit = git_commit()
+        report = {
+            "meta": {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "commit": commit,
+                "sockets": options["sockets"],
+                "lines_per_second": options["lines_per_second"],
+                "duration": options["duration"],
+                "level": options["level"],
+                "keyword": options["keyword"],
+            },
+            "results": [result],
+        }
+        output = options["output"] or os.path.join(
+            settings.BASE_DIR, "benchmarks",
+            f"logstream-{datetime.now():%Y%m%d-%H%M%S}{'-' + commit if commit else ''}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"\n结果已写入 {output}"))
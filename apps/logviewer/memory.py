@@ -0,0 +1,180 @@
+"""
+In-process stand-in for the Redis streams used by the log viewer.
+
+``LOGVIEWER_REDIS_URL = "memory://"`` makes get_redis() return a
+MemoryRedis instead of a redis.asyncio client: the streams live in this
+process, so a log stream can be produced and consumed without a Redis
+server (tests, ``manage.py benchmark_logstream``). Only the commands the
+log viewer uses are implemented, with redis-py's signatures and return
+values (``decode_responses=True``): XADD (with MAXLEN ~), XREAD (with
+BLOCK), XRANGE and XREVRANGE (with exclusive ``(id`` bounds).
+
+The streams are shared by every client of the process and may be written
+from other threads.
+"""
+import asyncio
+import bisect
+import threading
+import time
+
+_streams = {}
+_lock = threading.Lock()
+
+
+def _parse_id(entry_id):
+    ms, _sep, seq = entry_id.partition('-')
+    return int(ms), int(seq or 0)
+
+
+class MemoryStream:
+    """Entries of one stream, oldest first, with ``(ms, seq)`` keys for bisecting."""
+
+    def __init__(self):
+        self.keys = []
+        self.entries = []
+        self.last = (0, 0)
+        # (event loop, future) of blocked XREADs
+        self.waiters = []
+
+    def add(self, fields, maxlen=None):
+        ms = int(time.time() * 1000)
+        key = (ms, 0) if ms > self.last[0] else (self.last[0], self.last[1] + 1)
+        self.last = key
+        entry_id = f'{key[0]}-{key[1]}'
+        self.keys.append(key)
+        self.entries.append((entry_id, {str(name): str(value) for name, value in fields.items()}))
+        # MAXLEN ~: trim in steps, like Redis trims whole nodes
+        if maxlen is not None and len(self.keys) > maxlen + max(maxlen // 10, 1):
+            del self.keys[:-maxlen]
+            del self.entries[:-maxlen]
+        return entry_id
+
+    def after(self, key, count=None):
+        start = bisect.bisect_right(self.keys, key)
+        end = len(self.entries) if count is None else start + count
+        return self.entries[start:end]
+
+    def wake(self):
+        waiters, self.waiters = self.waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def get_stream(name):
+    with _lock:
+        stream = _streams.get(name)
+        if stream is None:
+            stream = _streams[name] = MemoryStream()
+        return stream
+
+
+def reset():
+    """Drop every stream (tests, benchmarks)."""
+    with _lock:
+        _streams.clear()
+
+
+def xadd(name, fields, maxlen=None):
+    """Synchronous XADD, for producers outside the event loop."""
+    stream = get_stream(name)
+    with _lock:
+        entry_id = stream.add(fields, maxlen)
+        stream.wake()
+    return entry_id
+
+
+def xrange(name, min='-', max='+', count=None):
+    """Synchronous XRANGE, for readers outside the event loop."""
+    stream = get_stream(name)
+    with _lock:
+        if min == '-':
+            start = 0
+        elif min.startswith('('):
+            start = bisect.bisect_right(stream.keys, _parse_id(min[1:]))
+        else:
+            start = bisect.bisect_left(stream.keys, _parse_id(min))
+        if max == '+':
+            end = len(stream.keys)
+        elif max.startswith('('):
+            end = bisect.bisect_left(stream.keys, _parse_id(max[1:]))
+        else:
+            end = bisect.bisect_right(stream.keys, _parse_id(max))
+        if count is not None and start + count < end:
+            end = start + count
+        return stream.entries[start:end]
+
+
+class MemoryPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = []
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.commands.append((name, fields, maxlen))
+        return self
+
+    async def execute(self):
+        commands, self.commands = self.commands, []
+        return [xadd(name, fields, maxlen) for name, fields, maxlen in commands]
+
+
+class MemoryRedis:
+    """The redis.asyncio.Redis methods the log viewer calls, backed by this process's streams."""
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        return xadd(name, fields, maxlen)
+
+    def pipeline(self, transaction=True):
+        return MemoryPipeline(self)
+
+    async def xread(self, streams, count=None, block=None):
+        deadline = None if block is None else time.monotonic() + block / 1000
+        targets = [(name, get_stream(name), last_id) for name, last_id in streams.items()]
+        with _lock:
+            targets = [
+                (name, stream, stream.last if last_id == '$' else _parse_id(last_id))
+                for name, stream, last_id in targets
+            ]
+        while True:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            result = []
+            with _lock:
+                for name, stream, key in targets:
+                    entries = stream.after(key, count)
+                    if entries:
+                        result.append([name, entries])
+                if not result and block is not None:
+                    for _name, stream, _key in targets:
+                        stream.waiters.append((loop, future))
+            if result or block is None:
+                return result
+            timeout = None if block == 0 else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                return []
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return []
+
+    async def xrange(self, name, min='-', max='+', count=None):
+        return xrange(name, min, max, count)
+
+    async def xrevrange(self, name, max='+', min='-', count=None):
+        entries = await self.xrange(name, min, max)
+        entries.reverse()
+        return entries if count is None else entries[:count]
+
+    async def aclose(self):
+        pass
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stream', models.CharField(max_length=200, verbose_name='Stream')),
+                ('path', models.CharField(help_text='相对于 LOGVIEWER_ARCHIVE_ROOT 的文件名', max_length=255, verbose_name='File')),
+                ('first_id', models.CharField(max_length=40, verbose_name='First Entry ID')),
+                ('last_id', models.CharField(max_length=40, verbose_name='Last Entry ID')),
+                ('start', models.DateTimeField(help_text='第一行的时间（取自流 ID）', verbose_name='Start')),
+                ('end', models.DateTimeField(help_text='最后一行的时间（取自流 ID）', verbose_name='End')),
+                ('lines', models.PositiveIntegerField(verbose_name='Lines')),
+                ('size', models.PositiveBigIntegerField(help_text='压缩后的字节数', verbose_name='Size')),
+                ('level_counts', models.JSONField(default=dict, help_text='各级别的行数，如 {"INFO": 120, "ERROR": 3}', verbose_name='Level Counts')),
+                ('max_level', models.PositiveSmallIntegerField(default=0, help_text='分段中最高的日志级别数值（ERROR = 40），用于按级别跳过分段', verbose_name='Max Level')),
+                ('bloom', models.BinaryField(help_text='消息中的词与 logger 前缀的 Bloom 过滤器', verbose_name='Bloom Filter')),
+                ('bloom_hashes', models.PositiveSmallIntegerField(verbose_name='Bloom Hashes')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Log Segment',
+                'verbose_name_plural': 'Log Segments',
+                'ordering': ['-start'],
+                'indexes': [models.Index(fields=['stream', 'start'], name='logviewer_l_stream_9a72e0_idx'), models.Index(fields=['stream', 'end'], name='logviewer_l_stream_22b9d3_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class LogSegment(models.Model):
+    """日志归档分段：一个 gzip 压缩的 JSON Lines 文件及其索引（见 archive.py）"""
+
+    stream = models.CharField(_("Stream"), max_length=200)
+
+    path = models.CharField(
+        _("File"),
+        max_length=255,
+        help_text=_("相对于 LOGVIEWER_ARCHIVE_ROOT 的文件名"),
+    )
+
+    first_id = models.CharField(_("First Entry ID"), max_length=40)
+
+    last_id = models.CharField(_("Last Entry ID"), max_length=40)
+
+    start = models.DateTimeField(_("Start"), help_text=_("第一行的时间（取自流 ID）"))
+
+    end = models.DateTimeField(_("End"), help_text=_("最后一行的时间（取自流 ID）"))
+
+    lines = models.PositiveIntegerField(_("Lines"))
+
+    size = models.PositiveBigIntegerField(_("Size"), help_text=_("压缩后的字节数"))
+
+    level_counts = models.JSONField(
+        _("Level Counts"),
+        default=dict,
+        help_text=_("各级别的行数，如 {\"INFO\": 120, \"ERROR\": 3}"),
+    )
+
+    max_level = models.PositiveSmallIntegerField(
+        _("Max Level"),
+        default=0,
+        help_text=_("分段中最高的日志级别数值（ERROR = 40），用于按级别跳过分段"),
+    )
+
+    bloom = models.BinaryField(_("Bloom Filter"), help_text=_("消息中的词与 logger 前缀的 Bloom 过滤器"))
+
+    bloom_hashes = models.PositiveSmallIntegerField(_("Bloom Hashes"))
+
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Log Segment")
+        verbose_name_plural = _("Log Segments")
+        ordering = ["-start"]
+        indexes = [
+            models.Index(fields=["stream", "start"]),
+            models.Index(fields=["stream", "end"]),
+        ]
+
+    def __str__(self):
+        return f"{self.stream} {self.first_id}..{self.last_id}"
@@ -0,0 +1,498 @@
+"""
+Log stream fan-out for LogViewerConsumer.
+
+Log lines are entries of the Redis stream ``LOGVIEWER_STREAM`` (fields
+``level``, ``logger``, ``message``, ``timestamp``). Each process runs one
+LogHub per event loop: a single XREAD BLOCK loop on one Redis connection,
+whatever the number of sockets, and a flush loop that sends every
+``LOGVIEWER_FLUSH_INTERVAL`` seconds one frame per socket with the lines
+that arrived since the previous one::
+
+    {"type": "logs", "dropped": 0, "lines": [{"id": "...", "level": "INFO", ...}, ...]}
+
+Sockets may subscribe with a LogFilter (level threshold, logger prefix,
+message keyword or regex). Regexes run on the hub's event loop and
+Python's ``re`` cannot be interrupted, so only a subset that cannot
+backtrack catastrophically is accepted (see check_regex()) and it is
+matched against the first REGEX_SUBJECT_LENGTH characters of a message.
+Filtering happens here, before fan-out: every
+distinct filter has one Feed, the lines matching it, and sockets with
+equal filters share it, so each line read is tested once per distinct
+filter and encoded to JSON once, not once per socket. A Subscription is
+just a position in its feed, so fanning out costs one slice and one join
+per socket per flush, and a socket only ever receives matching lines.
+
+Slow or flooded sockets cannot hold memory or starve the others:
+
+- a socket receives at most ``LOGVIEWER_CLIENT_RATE`` lines per second
+  (token bucket, bursts up to one second's worth); lines over the rate
+  wait in its queue;
+- the queue holds at most ``LOGVIEWER_CLIENT_BACKLOG`` lines. Beyond that
+  the oldest lines are dropped (``LOGVIEWER_OVERFLOW = "drop"``, the
+  default) or the backlog is thinned to the lines the rate allows, evenly
+  spaced (``"sample"``). ``dropped`` in the next frame says how many lines
+  the socket missed.
+
+LogHub.history() reads older lines straight from the stream (the last N
+matching lines, or those after a given entry ID), up to the entry the
+hub had read when the socket's feed position was set, so history and
+live lines neither overlap nor leave a gap. Exclusive ranges (``(id``)
+need Redis 6.2 or later.
+
+``LOGVIEWER_REDIS_URL = "memory://"`` uses the in-process stand-in in
+memory.py instead of Redis.
+"""
+import asyncio
+import collections
+import functools
+import json
+import logging
+import re
+import re._constants as sre_constants
+import re._parser as sre_parse
+import time
+import weakref
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAM = 'site_logs'
+DEFAULT_FLUSH_INTERVAL = 0.1
+DEFAULT_CLIENT_RATE = 1000
+DEFAULT_CLIENT_BACKLOG = 2000
+DEFAULT_OVERFLOW = 'drop'
+
+# Entries fetched per XREAD and how long it blocks (ms)
+READ_COUNT = 1000
+READ_BLOCK_MS = 1000
+
+# Seconds between reconnection attempts while Redis is unreachable
+RETRY_INTERVAL = 1.0
+
+# Entries fetched per XRANGE/XREVRANGE when reading history, and the most read for one request
+HISTORY_PAGE = 1000
+HISTORY_SCAN_LIMIT = 100000
+
+# Longest keyword or regex a socket may filter on
+MAX_PATTERN_LENGTH = 200
+
+# Characters of a message a regex is matched against
+REGEX_SUBJECT_LENGTH = 1000
+
+# Upper bound on the steps one regex may take on one message, estimated by
+# check_regex(); a million take about 1.5 ms. One unbounded quantifier
+# (``vpc-[0-9a-f]+``, ``timeout.*retry``) fits, two do not
+MAX_REGEX_COST = 2_000_000
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT)
+
+# Constructs whose backtracking cannot be bounded by looking at the pattern
+_UNSAFE = {
+    sre_constants.GROUPREF: 'backreferences',
+    sre_constants.GROUPREF_EXISTS: 'conditional groups',
+    sre_constants.ASSERT: 'lookarounds',
+    sre_constants.ASSERT_NOT: 'lookarounds',
+}
+
+OVERFLOW_POLICIES = ('drop', 'sample')
+
+_STREAM_ID = re.compile(r'^\d+(-\d+)?$')
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_stream_name():
+    return getattr(settings, 'LOGVIEWER_STREAM', DEFAULT_STREAM)
+
+
+def get_redis():
+    """An asyncio Redis client for LOGVIEWER_REDIS_URL (a MemoryRedis for ``memory://``)."""
+    url = getattr(settings, 'LOGVIEWER_REDIS_URL', None) or settings.REDIS_URL
+    if url.startswith('memory://'):
+        from .memory import MemoryRedis
+        return MemoryRedis()
+    import redis.asyncio
+    return redis.asyncio.Redis.from_url(url, decode_responses=True)
+
+
+def encode_entry(entry_id, fields):
+    """One line of a frame: the stream entry's fields and its ID, as JSON."""
+    return json.dumps({'id': entry_id, **fields}, ensure_ascii=False, separators=(',', ':'))
+
+
+def is_stream_id(value):
+    return isinstance(value, str) and bool(_STREAM_ID.match(value))
+
+
+def stream_key(entry_id):
+    ms, _sep, seq = entry_id.partition('-')
+    return int(ms), int(seq or 0)
+
+
+def _regex_cost(items, in_repeat):
+    """Worst-case backtracking factor of parsed regex ``items``; raises ValueError for unsafe constructs."""
+    cost = 1
+    for op, av in items:
+        if op in _UNSAFE:
+            raise ValueError(f'Regexes may not use {_UNSAFE[op]}.')
+        if op in _REPEATS:
+            low, high, item = av
+            variable = low != high
+            if variable and in_repeat:
+                raise ValueError('Regexes may not nest quantifiers, e.g. (a+)+.')
+            cost *= _regex_cost(item, in_repeat or variable)
+            if variable:
+                cost *= REGEX_SUBJECT_LENGTH if high == sre_constants.MAXREPEAT else high - low + 1
+        elif op is sre_constants.BRANCH:
+            if in_repeat:
+                raise ValueError('Regexes may not repeat an alternation, e.g. (a|ab)*.')
+            cost *= sum(_regex_cost(branch, in_repeat) for branch in av[1])
+        elif op is sre_constants.SUBPATTERN:
+            cost *= _regex_cost(av[-1], in_repeat)
+        elif op is sre_constants.ATOMIC_GROUP:
+            cost *= _regex_cost(av, in_repeat)
+    return cost
+
+
+def check_regex(pattern):
+    """
+    Raise ValueError unless ``pattern`` is in the safe subset: no nested
+    quantifiers, no repeated alternations, no backreferences or lookarounds,
+    and at most MAX_REGEX_COST steps on a message of REGEX_SUBJECT_LENGTH
+    characters (the product of the variable quantifiers' ranges, an
+    unbounded one counting as the message length, times the start positions).
+    """
+    try:
+        items = sre_parse.parse(pattern)
+    except re.error as exc:
+        raise ValueError(f'Invalid regex: {exc}.')
+    if REGEX_SUBJECT_LENGTH * _regex_cost(items, False) > MAX_REGEX_COST:
+        raise ValueError('The regex is too expensive: use at most one unbounded quantifier (*, + or {n,}).')
+
+
+@functools.lru_cache(maxsize=64)
+def level_number(name):
+    """The numeric value of a level name; 0 for names the logging module does not know."""
+    number = logging.getLevelName(str(name).upper())
+    return number if isinstance(number, int) else 0
+
+
+class LogFilter:
+    """
+    The lines a socket wants, compiled once: level at or above ``level``,
+    logger ``logger`` or one of its children, message containing
+    ``keyword`` (case-insensitive) and matching ``regex`` (re.search on
+    the first REGEX_SUBJECT_LENGTH characters; see check_regex()). Empty
+    criteria match everything.
+    """
+
+    def __init__(self, level=None, logger=None, keyword=None, regex=None):
+        self.level = level_number(level) if level else 0
+        if level and not self.level:
+            raise ValueError(f'Unknown log level {level!r}.')
+        self.logger = logger or None
+        self.keyword = keyword.casefold() if keyword else None
+        self.regex = None
+        if regex:
+            if len(regex) > MAX_PATTERN_LENGTH:
+                raise ValueError(f'The regex is longer than {MAX_PATTERN_LENGTH} characters.')
+            check_regex(regex)
+            try:
+                self.regex = re.compile(regex)
+            except re.error as exc:
+                raise ValueError(f'Invalid regex: {exc}.')
+        if self.keyword and len(self.keyword) > MAX_PATTERN_LENGTH:
+            raise ValueError(f'The keyword is longer than {MAX_PATTERN_LENGTH} characters.')
+        self.key = (self.level, self.logger, self.keyword, regex or None)
+        self.matches_all = self.key == (0, None, None, None)
+
+    @classmethod
+    def from_message(cls, message):
+        """The filter of a ``subscribe`` message; raises ValueError for bad criteria."""
+        criteria = {name: message.get(name) for name in ('level', 'logger', 'keyword', 'regex')}
+        for name, value in criteria.items():
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f'"{name}" must be a string.')
+        return cls(**criteria)
+
+    def as_dict(self):
+        return {
+            'level': logging.getLevelName(self.level) if self.level else None,
+            'logger': self.logger,
+            'keyword': self.keyword,
+            'regex': self.regex.pattern if self.regex else None,
+        }
+
+    def matches(self, fields):
+        if self.matches_all:
+            return True
+        if self.level and level_number(fields.get('level', '')) < self.level:
+            return False
+        if self.logger:
+            name = fields.get('logger', '')
+            if name != self.logger and not name.startswith(self.logger + '.'):
+                return False
+        message = fields.get('message', '')
+        if self.keyword and self.keyword not in message.casefold():
+            return False
+        if self.regex and not self.regex.search(message, 0, REGEX_SUBJECT_LENGTH):
+            return False
+        return True
+
+
+class Feed:
+    """The encoded lines matching one LogFilter, shared by every socket subscribed with it."""
+
+    def __init__(self, log_filter, backlog):
+        self.filter = log_filter
+        self.backlog = backlog
+        # lines[0] has sequence number ``base``, the next matching line gets ``head``
+        self.lines = []
+        self.base = 0
+        self.head = 0
+        self.subscriptions = set()
+
+    def lines_since(self, position, limit=None):
+        start = position - self.base
+        return self.lines[start:] if limit is None else self.lines[start:start + limit]
+
+    def trim(self):
+        self.head = self.base + len(self.lines)
+        # Keep one backlog's worth for the slowest socket
+        excess = len(self.lines) - 2 * self.backlog
+        if excess > 0:
+            del self.lines[:excess]
+            self.base += excess
+
+
+class Subscription:
+    """One socket's position in its feed, its rate limit and its dropped-line count."""
+
+    def __init__(self, send, feed, rate, backlog, overflow, live=True):
+        self.send = send
+        self.feed = feed
+        self.position = feed.head
+        self.rate = rate
+        self.backlog = backlog
+        self.overflow = overflow
+        # Paused subscriptions (history being sent, or unsubscribed) are skipped by the flush loop
+        self.live = live
+        self.tokens = float(rate)
+        self.refilled = time.monotonic()
+        self.dropped = 0
+        self.sent_lines = 0
+
+    @property
+    def filter(self):
+        return self.feed.filter
+
+    def take(self, now):
+        """The frame to send now, or None."""
+        feed = self.feed
+        self.tokens = min(self.rate, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+        budget = int(self.tokens)
+        start = max(self.position, feed.base)
+        # Lines that left the shared buffer before this socket got them
+        self.dropped += start - self.position
+        waiting = feed.head - start
+        if waiting > self.backlog and self.overflow == 'sample':
+            backlog = feed.lines_since(start)
+            step = len(backlog) / max(budget, 1)
+            lines = [backlog[int(index * step)] for index in range(min(budget, len(backlog)))]
+            self.dropped += waiting - len(lines)
+            self.position = feed.head
+        else:
+            if waiting > self.backlog:
+                self.dropped += waiting - self.backlog
+                start = feed.head - self.backlog
+            lines = feed.lines_since(start, budget)
+            self.position = start + len(lines)
+        if not lines:
+            # Dropped lines are reported with the next lines sent
+            return None
+        self.tokens -= len(lines)
+        self.sent_lines += len(lines)
+        frame = '{"type":"logs","dropped":%d,"lines":[%s]}' % (self.dropped, ','.join(lines))
+        self.dropped = 0
+        return frame
+
+
+class LogHub:
+    """Reads the log stream once and fans it out to every Subscription of this event loop."""
+
+    def __init__(self, client=None, stream=None, flush_interval=None, rate=None, backlog=None, overflow=None):
+        self.client = client
+        self.stream = stream or get_stream_name()
+        self.flush_interval = flush_interval or getattr(
+            settings, 'LOGVIEWER_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        self.rate = rate or getattr(settings, 'LOGVIEWER_CLIENT_RATE', DEFAULT_CLIENT_RATE)
+        self.backlog = backlog or getattr(settings, 'LOGVIEWER_CLIENT_BACKLOG', DEFAULT_CLIENT_BACKLOG)
+        self.overflow = overflow or getattr(settings, 'LOGVIEWER_OVERFLOW', DEFAULT_OVERFLOW)
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'LOGVIEWER_OVERFLOW must be one of {OVERFLOW_POLICIES}, not {self.overflow!r}')
+        # Feeds by LogFilter.key
+        self.feeds = {}
+        self.last_id = '$'
+        # Set once last_id is a real entry ID (see mark())
+        self.started = asyncio.Event()
+        self.subscriptions = set()
+        self.tasks = []
+        self.frames_sent = 0
+
+    def subscribe(self, send, log_filter=None, live=True):
+        """Start receiving frames of the lines matching ``log_filter`` through ``send(frame)``, from the next line read on."""
+        log_filter = log_filter or LogFilter()
+        feed = self.feeds.get(log_filter.key)
+        if feed is None:
+            feed = self.feeds[log_filter.key] = Feed(log_filter, self.backlog)
+        subscription = Subscription(send, feed, self.rate, self.backlog, self.overflow, live)
+        feed.subscriptions.add(subscription)
+        self.subscriptions.add(subscription)
+        if not self.tasks:
+            self.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.live = False
+        self.subscriptions.discard(subscription)
+        feed = subscription.feed
+        feed.subscriptions.discard(subscription)
+        if not feed.subscriptions:
+            self.feeds.pop(feed.filter.key, None)
+        if not self.subscriptions:
+            self.stop()
+
+    def mark(self, subscription):
+        """
+        Move ``subscription`` to the end of its feed; returns the ID of the last
+        entry read, where its history ends. Call once ``started`` is set.
+        """
+        subscription.position = subscription.feed.head
+        return self.last_id
+
+    def start(self):
+        if self.client is None:
+            self.client = get_redis()
+        self.tasks = [asyncio.create_task(self._read()), asyncio.create_task(self._flush())]
+
+    def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        # Sockets opened later start from the end of the stream
+        self.last_id = '$'
+        self.started = asyncio.Event()
+
+    def append(self, entries):
+        feeds = list(self.feeds.values())
+        for entry_id, fields in entries:
+            encoded = None
+            for feed in feeds:
+                if feed.filter.matches(fields):
+                    if encoded is None:
+                        encoded = encode_entry(entry_id, fields)
+                    feed.lines.append(encoded)
+        for feed in feeds:
+            feed.trim()
+
+    async def history(self, log_filter, end, limit, after=None):
+        """
+        Encoded lines matching ``log_filter`` up to entry ``end``, oldest first:
+        the last ``limit`` of them, or those after entry ``after``, of which the
+        newest ``limit`` are kept. Returns ``(lines, dropped, complete)``;
+        ``complete`` is false when the stream was trimmed past ``after`` or more
+        than HISTORY_SCAN_LIMIT entries would have to be read.
+        """
+        if after is None:
+            lines, complete = await self._read_backwards(log_filter, end, limit)
+            return lines, 0, complete
+        lines = collections.deque(maxlen=limit)
+        dropped = 0
+        first = await self.client.xrange(self.stream, count=1)
+        complete = not first or stream_key(first[0][0]) <= stream_key(after)
+        lower = '(' + after
+        scanned = 0
+        while True:
+            if scanned >= HISTORY_SCAN_LIMIT:
+                complete = False
+                break
+            entries = await self.client.xrange(self.stream, min=lower, max=end, count=HISTORY_PAGE)
+            if not entries:
+                break
+            scanned += len(entries)
+            for entry_id, fields in entries:
+                if log_filter.matches(fields):
+                    if len(lines) == limit:
+                        dropped += 1
+                    lines.append(encode_entry(entry_id, fields))
+            lower = '(' + entries[-1][0]
+        return list(lines), dropped, complete
+
+    async def _read_backwards(self, log_filter, end, limit):
+        lines = []
+        upper = end
+        scanned = 0
+        while len(lines) < limit:
+            if scanned >= HISTORY_SCAN_LIMIT:
+                return lines[::-1], False
+            entries = await self.client.xrevrange(self.stream, max=upper, count=HISTORY_PAGE)
+            if not entries:
+                break
+            scanned += len(entries)
+            for entry_id, fields in entries:
+                if log_filter.matches(fields):
+                    lines.append(encode_entry(entry_id, fields))
+                    if len(lines) == limit:
+                        break
+            upper = '(' + entries[-1][0]
+        return lines[::-1], True
+
+    async def _read(self):
+        while True:
+            try:
+                if self.last_id == '$':
+                    # Start from a real ID, so mark() can tell sockets where their history ends
+                    entries = await self.client.xrevrange(self.stream, count=1)
+                    self.last_id = entries[0][0] if entries else '0-0'
+                    self.started.set()
+                response = await self.client.xread({self.stream: self.last_id}, count=READ_COUNT,
+                                                   block=READ_BLOCK_MS)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning('Reading log stream %s failed, retrying', self.stream, exc_info=True)
+                await asyncio.sleep(RETRY_INTERVAL)
+                continue
+            for _stream, entries in response:
+                if entries:
+                    self.last_id = entries[-1][0]
+                    self.append(entries)
+
+    async def _flush(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            now = time.monotonic()
+            for subscription in list(self.subscriptions):
+                if not subscription.live:
+                    continue
+                frame = subscription.take(now)
+                if frame is None:
+                    continue
+                try:
+                    await subscription.send(frame)
+                except Exception:
+                    # The socket is going away; its consumer unsubscribes on disconnect
+                    subscription.live = False
+                else:
+                    self.frames_sent += 1
+
+
+def get_hub():
+    """The LogHub of the running event loop."""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = LogHub()
+    return hub
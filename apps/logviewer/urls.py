@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'logviewer'
+
+urlpatterns = [
+    path('archive/', views.archive_search, name='archive_search'),
+]
@@ -0,0 +1,47 @@
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.template.response import TemplateResponse
+from django.utils.translation import gettext_lazy as _
+
+from .archive import ArchiveSearch
+from .forms import ArchiveSearchForm
+
+
+@staff_member_required
+def archive_search(request):
+    """日志归档搜索：按词、级别、logger 前缀与时间范围查询，按流 ID 翻页（最新的在前）"""
+    form = ArchiveSearchForm(request.GET or None)
+    page = None
+    if form.is_bound and form.is_valid():
+        data = form.cleaned_data
+        search = ArchiveSearch(
+            text=data["q"],
+            level=data["level"] or None,
+            logger=data["logger"] or None,
+            since=data["since"],
+            until=data["until"],
+        )
+        page = search.run(before=data["before"] or None)
+    elif not form.is_bound:
+        page = ArchiveSearch().run()
+
+    next_query = None
+    if page is not None and page.next_before:
+        params = request.GET.copy()
+        params["before"] = page.next_before
+        next_query = params.urlencode()
+    first_query = None
+    if request.GET.get("before"):
+        params = request.GET.copy()
+        del params["before"]
+        first_query = params.urlencode()
+
+    context = {
+        **admin.site.each_context(request),
+        "title": _("Log Archive"),
+        "form": form,
+        "page": page,
+        "next_query": next_query,
+        "first_query": first_query,
+    }
+    return TemplateResponse(request, "logviewer/archive_search.html", context)
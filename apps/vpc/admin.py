@@ -1,8 +1,11 @@
 from django.contrib import admin
-from django.utils.html import format_html, mark_safe
-from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-from apps.admin_enhanced.admin import ReadonlyMixin
+from apps.admin_enhanced.admin import (
+    ColumnSelectionMixin, CountStrategyMixin, FacetCacheMixin, KeysetPaginationMixin, ReadonlyMixin,
+    ReplicaReadsMixin, RowActionsMixin, SearchIndexMixin,
+)
+from apps.admin_enhanced.counts import ApproximateCountStrategy
+from apps.admin_enhanced.search import IdentifierPattern, SearchIndex
 from .models import Vpc
 from apps.instances.models import Instance
 
@@ -25,7 +28,10 @@ class InstanceInline(admin.TabularInline):
 
 
 @admin.register(Vpc)
-class VpcAdmin(ReadonlyMixin, admin.ModelAdmin):
+class VpcAdmin(
+    ReplicaReadsMixin, ColumnSelectionMixin, RowActionsMixin, SearchIndexMixin, FacetCacheMixin,
+    CountStrategyMixin, KeysetPaginationMixin, ReadonlyMixin, admin.ModelAdmin,
+):
     inlines = [InstanceInline]
     list_display = [
         "vpc_id",
@@ -44,84 +50,17 @@ class VpcAdmin(ReadonlyMixin, admin.ModelAdmin):
         "vpc_name",
         "account",
     ]
+    readonly_fields = ["updated_at"]
     list_per_page = 50
-    
-    def action_buttons(self, obj):
-        """操作按钮列 - 根据权限显示不同的按钮"""
-        if not hasattr(self, 'request'):
-            return "-"
-        
-        buttons = []
-        opts = self.model._meta
-        app_label = opts.app_label
-        model_name = opts.model_name
-        
-        # 检查权限
-        has_view_permission = self.has_view_permission(self.request, obj) if hasattr(self, 'has_view_permission') else self.has_change_permission(self.request, obj)
-        has_change_permission = self.has_change_permission(self.request, obj)
-        has_delete_permission = self.has_delete_permission(self.request, obj)
-        
-        # 查看按钮（如果有查看权限或编辑权限）
-        if has_view_permission or has_change_permission:
-            view_modal_url = reverse(
-                'admin_enhanced:view_object_modal',
-                args=[app_label, model_name, obj.pk]
-            )
-            buttons.append(
-                format_html(
-                    '<a href="#" class="btn btn-sm btn-outline-info view-object-btn" '
-                    'data-app-label="{}" data-model-name="{}" data-object-id="{}" '
-                    'data-modal-url="{}">{}</a>',
-                    app_label,
-                    model_name,
-                    obj.pk,
-                    view_modal_url,
-                    _("View")
-                )
-            )
-        
-        # 编辑按钮（需要编辑权限）
-        if has_change_permission:
-            change_url = reverse(
-                f"admin:{app_label}_{model_name}_change",
-                args=[obj.pk]
-            )
-            buttons.append(
-                format_html(
-                    '<a href="{}" class="btn btn-sm btn-outline-primary">{}</a>',
-                    change_url,
-                    _("Edit")
-                )
-            )
-        
-        # 删除按钮（需要删除权限）
-        if has_delete_permission:
-            delete_url = reverse(
-                f"admin:{app_label}_{model_name}_delete",
-                args=[obj.pk]
-            )
-            buttons.append(
-                format_html(
-                    '<a href="{}" class="btn btn-sm btn-outline-danger" '
-                    'onclick="return confirm(\'{}\');">{}</a>',
-                    delete_url,
-                    _("Are you sure you want to delete this item?"),
-                    _("Delete")
-                )
-            )
-        
-        if buttons:
-            return mark_safe('<div class="action-buttons-group">{}</div>'.format(" ".join(buttons)))
-        return "-"
-    
-    action_buttons.short_description = _("Actions")
-    
-    def get_list_display(self, request):
-        """重写以传递 request 对象"""
-        self.request = request
-        return super().get_list_display(request)
-    
-    def get_queryset(self, request):
-        """重写以传递 request 对象"""
-        self.request = request
-        return super().get_queryset(request)
+    # Keyset pagination: seek on the ordering index instead of OFFSET
+    keyset_ordering = ('-pk',)
+    # Exact counts below the threshold, estimates above it, cached per filter set
+    count_strategy = ApproximateCountStrategy()
+    # Indexed search over search_fields (installed by a migration)
+    search_index = SearchIndex()
+    # 粘贴的 VPC ID 直接走唯一索引前缀查询，查不到再走全文搜索
+    search_identifiers = [
+        IdentifierPattern(r"vpc[-_]?[0-9a-f]{8,}", ["vpc_id"], lookup="prefix"),
+    ]
+    # 详情弹窗中按页懒加载的关联实例（每页 20 条，最多 200 条，之后链接到筛选后的实例列表）
+    view_modal_related = {"instances": ["instance_id", "instance_name", "ip"]}
@@ -5,3 +5,9 @@ class VpcConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.vpc"
     verbose_name = "VPC"
+
+    def ready(self):
+        from apps.admin_enhanced import summary
+        from .models import Vpc, VpcStat
+
+        summary.register(Vpc, VpcStat, ["account", "region"])
@@ -0,0 +1,32 @@
+"""
+VPC 的随机数据工厂（generate_vpcs 使用）
+
+只依赖标准库，不导入模型，可以在 bulkgen 的工作进程中运行。
+"""
+
+ACCOUNTS = ["aliyun", "tencent", "aws", "azure", "huawei"]
+REGIONS = ["cn-beijing", "cn-shanghai", "cn-guangzhou", "cn-shenzhen", "us-east-1", "us-west-1"]
+
+VPC_ID_PREFIXES = ["vpc-", "vpc_", "vpc"]
+NAME_PREFIXES = ["production", "development", "testing", "staging", "demo"]
+NAME_SUFFIXES = ["vpc", "network", "net"]
+
+
+class VpcRows:
+    """按批生成 VPC 行（元组，字段顺序见 fields）"""
+
+    fields = ["account", "region", "vpc_id", "vpc_name"]
+
+    def rows(self, rng, count):
+        choice = rng.choice
+        getrandbits = rng.getrandbits
+        return [
+            (
+                choice(ACCOUNTS),
+                choice(REGIONS),
+                # 64 位随机数，千万级数据量下也几乎不会重复
+                f"{choice(VPC_ID_PREFIXES)}{getrandbits(64):016x}",
+                f"{choice(NAME_PREFIXES)}-{choice(NAME_SUFFIXES)}-{rng.randint(1, 99)}",
+            )
+            for _ in range(count)
+        ]
@@ -1,10 +1,13 @@
-import random
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.admin_enhanced import bulkgen
+from apps.admin_enhanced.summary import get_summary
+from apps.vpc.generators import ACCOUNTS, REGIONS, VpcRows
 from apps.vpc.models import Vpc
 
 
 class Command(BaseCommand):
-    help = "生成随机的 VPC 记录"
+    help = "生成随机的 VPC 记录（分批流式写入，内存占用与总数无关）"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -13,61 +16,61 @@ class Command(BaseCommand):
             default=10,
             help="要生成的记录数量（默认：10）",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=bulkgen.DEFAULT_BATCH_SIZE,
+            help=f"每批生成并写入的记录数（默认：{bulkgen.DEFAULT_BATCH_SIZE}）",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="生成数据的工作进程数，写入始终在主进程（默认：1）",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="随机种子；相同种子生成相同数据，与工作进程数无关，因此不要在同一数据库上重复使用（默认随机，运行时会打印）",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="写入的数据库别名（默认：default）",
+        )
 
     def handle(self, *args, **options):
         count = options["count"]
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        database = options["database"]
+        if count < 0 or batch_size < 1 or workers < 1:
+            raise CommandError("--count 不能为负，--batch-size 与 --workers 至少为 1")
+        seed = options["seed"] if options["seed"] is not None else bulkgen.new_seed()
         
-        # 预设的随机数据
-        accounts = ["aliyun", "tencent", "aws", "azure", "huawei"]
-        regions = ["cn-beijing", "cn-shanghai", "cn-guangzhou", "cn-shenzhen", "us-east-1", "us-west-1"]
-        
-        # 生成随机 VPC ID
-        def generate_vpc_id():
-            prefix = random.choice(["vpc-", "vpc_", "vpc"])
-            return f"{prefix}{''.join(random.choices('0123456789abcdef', k=12))}"
-        
-        # 生成随机 VPC 名称
-        def generate_vpc_name():
-            prefixes = ["production", "development", "testing", "staging", "demo"]
-            suffixes = ["vpc", "network", "net"]
-            num = random.randint(1, 99)
-            return f"{random.choice(prefixes)}-{random.choice(suffixes)}-{num}"
-        
-        self.stdout.write(f"开始生成 {count} 条 VPC 记录...")
-        
-        vpcs = []
-        vpc_ids = set()
-        
-        for i in range(count):
-            # 确保 VPC ID 唯一
-            vpc_id = generate_vpc_id()
-            while vpc_id in vpc_ids:
-                vpc_id = generate_vpc_id()
-            vpc_ids.add(vpc_id)
-            
-            vpc = Vpc(
-                account=random.choice(accounts),
-                region=random.choice(regions),
-                vpc_id=vpc_id,
-                vpc_name=generate_vpc_name(),
-            )
-            vpcs.append(vpc)
-        
-        # 批量创建
-        Vpc.objects.bulk_create(vpcs)
+        self.stdout.write(
+            f"开始生成 {count} 条 VPC 记录（种子 {seed}，每批 {batch_size} 条，{workers} 个工作进程）..."
+        )
+        progress = bulkgen.generate(
+            Vpc, VpcRows(), count, batch_size, seed, workers, database, self.stdout.write,
+        )
         
         self.stdout.write(
-            self.style.SUCCESS(f"成功生成 {count} 条 VPC 记录！")
+            self.style.SUCCESS(
+                f"成功生成 {count} 条 VPC 记录！耗时 {progress.elapsed:.1f} 秒，{progress.rate:,.0f} 行/秒"
+            )
         )
         
-        # 显示统计信息
+        # 显示统计信息（读取 VpcStat 汇总表，不逐项 count）
+        stats = get_summary(Vpc)
+        by_account = stats.counts("account", database)
+        by_region = stats.counts("region", database)
         self.stdout.write("\n统计信息：")
-        for account in accounts:
-            count_by_account = Vpc.objects.filter(account=account).count()
-            if count_by_account > 0:
-                self.stdout.write(f"  {account}: {count_by_account} 条")
+        for account in ACCOUNTS:
+            if by_account.get(account, 0) > 0:
+                self.stdout.write(f"  {account}: {by_account[account]} 条")
         
-        for region in regions:
-            count_by_region = Vpc.objects.filter(region=region).count()
-            if count_by_region > 0:
-                self.stdout.write(f"  {region}: {count_by_region} 条")
+        for region in REGIONS:
+            if by_region.get(region, 0) > 0:
+                self.stdout.write(f"  {region}: {by_region[region]} 条")
@@ -0,0 +1,69 @@
+# Indexed changelist search (see apps/admin_enhanced/search.py):
+# FTS5 trigram shadow table + triggers on SQLite, pg_trgm GIN indexes on PostgreSQL.
+#
+# The SQL is what install_search_index() generated for VpcAdmin's
+# search_fields at the time of this migration: ['vpc_id', 'vpc_name', 'account'].
+# It is frozen here so later changes to search.py do not change this
+# migration; 0005 calls install() / uninstall() from this module.
+
+from django.db import migrations
+
+VPC_COLUMNS = '"vpc_id", "vpc_name", "account"'
+
+SQLITE_INSTALL = [
+    f'CREATE VIRTUAL TABLE "vpc_vpc_search" USING fts5({VPC_COLUMNS}, tokenize=\'trigram\')',
+    f'INSERT INTO "vpc_vpc_search"(rowid, {VPC_COLUMNS}) '
+    'SELECT t."id", t."vpc_id", t."vpc_name", t."account" FROM "vpc_vpc" t',
+    f'CREATE TRIGGER "vpc_vpc_search_ai" AFTER INSERT ON "vpc_vpc" BEGIN '
+    f'INSERT INTO "vpc_vpc_search"(rowid, {VPC_COLUMNS}) VALUES (NEW."id", NEW."vpc_id", NEW."vpc_name", NEW."account"); END',
+    f'CREATE TRIGGER "vpc_vpc_search_au" AFTER UPDATE ON "vpc_vpc" BEGIN '
+    f'DELETE FROM "vpc_vpc_search" WHERE rowid = OLD."id"; '
+    f'INSERT INTO "vpc_vpc_search"(rowid, {VPC_COLUMNS}) VALUES (NEW."id", NEW."vpc_id", NEW."vpc_name", NEW."account"); END',
+    'CREATE TRIGGER "vpc_vpc_search_ad" AFTER DELETE ON "vpc_vpc" BEGIN '
+    'DELETE FROM "vpc_vpc_search" WHERE rowid = OLD."id"; END',
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS "vpc_vpc_search_ai"',
+    'DROP TRIGGER IF EXISTS "vpc_vpc_search_au"',
+    'DROP TRIGGER IF EXISTS "vpc_vpc_search_ad"',
+    'DROP TABLE IF EXISTS "vpc_vpc_search"',
+]
+
+# (index, table, column)
+POSTGRES_INDEXES = [
+    ('vpc_vpc_vpc_id_03eaa746_trgm', 'vpc_vpc', 'vpc_id'),
+    ('vpc_vpc_vpc_name_7544b1ab_trgm', 'vpc_vpc', 'vpc_name'),
+    ('vpc_vpc_account_76bb17aa_trgm', 'vpc_vpc', 'account'),
+]
+
+POSTGRES_INSTALL = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+    f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+    for name, table, column in POSTGRES_INDEXES
+]
+
+POSTGRES_UNINSTALL = [f'DROP INDEX IF EXISTS "{name}"' for name, _table, _column in POSTGRES_INDEXES]
+
+
+def _execute(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement, params=None)
+
+
+def install(apps, schema_editor):
+    _execute(schema_editor, {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL})
+
+
+def uninstall(apps, schema_editor):
+    _execute(schema_editor, {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vpc', '0002_rename_vpc_vpc_account_region_idx_vpc_vpc_account_6d0542_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
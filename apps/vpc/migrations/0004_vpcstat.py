@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:06
+# Summary table of Vpc counts, filled from the existing rows (see apps/admin_enhanced/summary.py).
+
+from django.db import migrations, models
+
+from apps.admin_enhanced.summary import populate
+
+
+def fill_vpcstat(apps, schema_editor):
+    populate(
+        apps.get_model('vpc', 'Vpc'), apps.get_model('vpc', 'VpcStat'),
+        ['account', 'region'], schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vpc', '0003_vpc_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VpcStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveBigIntegerField(default=0, verbose_name='Count')),
+                ('account', models.CharField(max_length=100, verbose_name='Account')),
+                ('region', models.CharField(max_length=50, verbose_name='Region')),
+            ],
+            options={
+                'verbose_name': 'VPC Statistic',
+                'verbose_name_plural': 'VPC Statistics',
+                'constraints': [models.UniqueConstraint(fields=('account', 'region'), name='vpc_vpcstat_unique')],
+            },
+        ),
+        migrations.RunPython(fill_vpcstat, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:09
+# Adds Vpc.updated_at (version of the cached object modal).
+#
+# On SQLite the column is added by rebuilding vpc_vpc. The rebuild drops the
+# VPC search index triggers, and it fails while the instance search index
+# triggers exist, because they read vpc_vpc. So the instance index is
+# dropped first (instances 0012 reinstalls it) and the VPC index is
+# reinstalled afterwards; the reverse migration mirrors this.
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# The VPC and instance search indexes as vpc 0003 / instances 0009 installed them (frozen SQL)
+vpc_search_index = import_module('apps.vpc.migrations.0003_vpc_search_index')
+instance_search_index = import_module('apps.instances.migrations.0009_instance_search_index')
+
+
+def reinstall_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    vpc_search_index.uninstall(apps, schema_editor)
+    vpc_search_index.install(apps, schema_editor)
+
+
+def drop_instance_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    instance_search_index.uninstall(apps, schema_editor)
+
+
+def install_instance_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    instance_search_index.install(apps, schema_editor)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vpc', '0004_vpcstat'),
+        ('instances', '0011_instancestat'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_instance_search_index, install_instance_search_index),
+        migrations.RunPython(noop, reinstall_search_index),
+        migrations.AddField(
+            model_name='vpc',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='最后修改时间（详情弹窗缓存的版本号）', verbose_name='Update Time'),
+        ),
+        migrations.RunPython(reinstall_search_index, drop_instance_search_index),
+    ]
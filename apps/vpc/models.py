@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from apps.admin_enhanced.summary import SummaryCount, SummaryManager
+
 
 class Vpc(models.Model):
     """VPC 模型"""
@@ -30,6 +32,15 @@ class Vpc(models.Model):
         help_text=_("VPC 名称")
     )
     
+    updated_at = models.DateTimeField(
+        _("Update Time"),
+        auto_now=True,
+        help_text=_("最后修改时间（详情弹窗缓存的版本号）")
+    )
+    
+    # bulk_create / update / delete 同步维护 VpcStat
+    objects = SummaryManager()
+    
     class Meta:
         verbose_name = _("VPC")
         verbose_name_plural = _("VPCs")
@@ -41,3 +52,24 @@ class Vpc(models.Model):
     
     def __str__(self):
         return f"{self.vpc_name} ({self.vpc_id})"
+
+
+class VpcStat(SummaryCount):
+    """按 (账户, 区域) 汇总的 VPC 数（VPC 没有状态字段），由信号与批量操作增量维护"""
+    
+    account = models.CharField(_("Account"), max_length=100)
+    
+    region = models.CharField(_("Region"), max_length=50)
+    
+    class Meta:
+        verbose_name = _("VPC Statistic")
+        verbose_name_plural = _("VPC Statistics")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "region"],
+                name="vpc_vpcstat_unique",
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.account} / {self.region}: {self.count}"
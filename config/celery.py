@@ -0,0 +1,14 @@
+"""
+Celery application for armoryx.
+Start a worker with: celery -A config worker -l info
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+app = Celery("armoryx")
+# All CELERY_* settings in config/settings/celery.py
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -12,3 +12,19 @@ CELERY_RESULT_SERIALIZER = "json"
 
 CELERY_TIMEZONE = "Asia/Shanghai"
 CELERY_ENABLE_UTC = True
+
+# Tests / local runs without Redis: CELERY_TASK_ALWAYS_EAGER=true runs tasks
+# inline, or point CELERY_BROKER_URL at "memory://" and CELERY_RESULT_BACKEND
+# at "cache+memory://".
+CELERY_TASK_ALWAYS_EAGER = os.environ.get("CELERY_TASK_ALWAYS_EAGER", "false").lower() in ("1", "true", "yes")
+CELERY_TASK_EAGER_PROPAGATES = CELERY_TASK_ALWAYS_EAGER
+CELERY_TASK_TRACK_STARTED = True
+
+# Task events for the monitor (manage.py celery_events): workers publish
+# task-received/started/succeeded/failed, clients publish task-sent.
+CELERY_WORKER_SEND_TASK_EVENTS = True
+CELERY_TASK_SEND_SENT_EVENT = True
+# Tasks kept in the monitor's snapshot (oldest by last event are dropped) and
+# seconds between writes of changed tasks to the database.
+CELERY_MONITOR_MAX_TASKS = int(os.environ.get("CELERY_MONITOR_MAX_TASKS", "10000"))
+CELERY_MONITOR_PERSIST_INTERVAL = float(os.environ.get("CELERY_MONITOR_PERSIST_INTERVAL", "2"))
@@ -2,6 +2,9 @@
 Django Channels and Redis layer settings.
 """
 import os
+from pathlib import Path
+
+from .base import BASE_DIR
 
 ASGI_APPLICATION = "config.asgi.application"
 
@@ -13,3 +16,49 @@ CHANNEL_LAYERS = {
         "CONFIG": {"hosts": [REDIS_URL]},
     }
 }
+
+# Log viewer: Redis stream read by apps/logviewer/stream.py ("memory://" = in-process stand-in)
+LOGVIEWER_REDIS_URL = os.environ.get("LOGVIEWER_REDIS_URL", REDIS_URL)
+LOGVIEWER_STREAM = os.environ.get("LOGVIEWER_STREAM", "site_logs")
+# Per socket: lines per second, queued lines, and what to do when the queue is full ("drop" / "sample")
+LOGVIEWER_CLIENT_RATE = int(os.environ.get("LOGVIEWER_CLIENT_RATE", "1000"))
+LOGVIEWER_CLIENT_BACKLOG = int(os.environ.get("LOGVIEWER_CLIENT_BACKLOG", "2000"))
+LOGVIEWER_OVERFLOW = os.environ.get("LOGVIEWER_OVERFLOW", "drop")
+# Seconds between two frames of a socket
+LOGVIEWER_FLUSH_INTERVAL = float(os.environ.get("LOGVIEWER_FLUSH_INTERVAL", "0.1"))
+
+# Log archive: `manage.py archive_logs` drains the stream into compressed segment files
+# (apps/logviewer/archive.py), one per window of SEGMENT_SECONDS, kept for KEEP_DAYS days (0 = forever)
+LOGVIEWER_ARCHIVE_ROOT = Path(os.environ.get("LOGVIEWER_ARCHIVE_ROOT", BASE_DIR / "log_archive"))
+LOGVIEWER_ARCHIVE_SEGMENT_SECONDS = int(os.environ.get("LOGVIEWER_ARCHIVE_SEGMENT_SECONDS", "600"))
+LOGVIEWER_ARCHIVE_SEGMENT_LINES = int(os.environ.get("LOGVIEWER_ARCHIVE_SEGMENT_LINES", "100000"))
+LOGVIEWER_ARCHIVE_KEEP_DAYS = int(os.environ.get("LOGVIEWER_ARCHIVE_KEEP_DAYS", "30"))
+
+# Warnings and errors of every logger go to stderr (what Python prints when no
+# handler is configured). LOGVIEWER_HANDLER=true also sends records of
+# LOGVIEWER_LEVEL and above to LOGVIEWER_STREAM through a non-blocking handler
+# (apps/logviewer/handlers.py): turn it on for the web and worker processes
+LOGVIEWER_HANDLER = os.environ.get("LOGVIEWER_HANDLER", "false").lower() in ("1", "true", "yes")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "level": os.environ.get("LOG_CONSOLE_LEVEL", "WARNING"),
+        },
+        "logviewer": {
+            "class": "apps.logviewer.handlers.RedisStreamHandler",
+            "level": os.environ.get("LOGVIEWER_LEVEL", "INFO"),
+        },
+    },
+    "loggers": {
+        # Through root's handlers only; Django's own console handler would print them twice
+        "django": {"handlers": [], "level": "INFO"},
+    },
+    "root": {
+        "handlers": ["console", "logviewer"] if LOGVIEWER_HANDLER else ["console"],
+        "level": "INFO",
+    },
+}
@@ -0,0 +1,93 @@
+"""
+Database settings.
+
+DJANGO_SQLITE_PROFILE selects how the SQLite database is tuned:
+
+- "default": Django's stock settings (rollback journal, synchronous=FULL,
+  2 MB page cache, a new connection per request, deferred transactions).
+- "tuned": WAL journal, so readers no longer block the writer or each
+  other; synchronous=NORMAL, which in WAL mode skips the fsync on every
+  commit (a power loss can drop the last commits, never corrupt the
+  file); a 64 MB page cache and 256 MB of memory-mapped I/O per
+  connection; temporary tables and sorts in memory; a 20 s busy timeout;
+  transactions that take the write lock when they begin (BEGIN
+  IMMEDIATE; in WAL mode this never blocks readers), so two transactions
+  cannot deadlock upgrading their locks and fail with "database is
+  locked" despite the timeout; and persistent connections
+  (DJANGO_CONN_MAX_AGE seconds, default 600).
+
+Under ASGI (daphne) Django runs each request's sync code in a thread of its
+own, so connections are only reused by WSGI workers, Celery workers and
+management commands; the pragmas apply everywhere.
+
+``manage.py benchmark_sqlite`` compares the profiles under concurrent
+changelist reads and admin writes.
+
+DJANGO_SQLITE_REPLICA=<path> adds a "replica" database, an SQLite file
+standing in for a read replica: changelists, exports and the object modal
+read from it (see apps/admin_enhanced/routers.py) and ``manage.py
+sync_replica`` copies the primary into it.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import BASE_DIR
+
+SQLITE_PROFILES = {
+    "default": {},
+    "tuned": {
+        "OPTIONS": {
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA cache_size=-65536;"
+                "PRAGMA mmap_size=268435456;"
+                "PRAGMA temp_store=MEMORY"
+            ),
+            # Seconds to wait for a lock (sqlite3_busy_timeout)
+            "timeout": 20,
+            "transaction_mode": "IMMEDIATE",
+        },
+        "CONN_MAX_AGE": int(os.environ.get("DJANGO_CONN_MAX_AGE", "600")),
+        "CONN_HEALTH_CHECKS": True,
+    },
+}
+
+SQLITE_PROFILE = os.environ.get("DJANGO_SQLITE_PROFILE", "default").lower()
+
+if SQLITE_PROFILE not in SQLITE_PROFILES:
+    raise ImproperlyConfigured(
+        f"DJANGO_SQLITE_PROFILE must be one of {', '.join(SQLITE_PROFILES)}, not {SQLITE_PROFILE!r}"
+    )
+
+
+def sqlite_database(name, profile="default"):
+    """Settings of an SQLite database at ``name`` tuned with ``profile``."""
+    tuning = SQLITE_PROFILES[profile]
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name,
+        **tuning,
+        "OPTIONS": dict(tuning.get("OPTIONS", {})),
+    }
+
+
+DATABASES = {
+    "default": sqlite_database(BASE_DIR / "db.sqlite3", SQLITE_PROFILE),
+}
+
+DATABASE_ROUTERS = ["apps.admin_enhanced.routers.ReplicaRouter"]
+
+SQLITE_REPLICA = os.environ.get("DJANGO_SQLITE_REPLICA")
+
+if SQLITE_REPLICA:
+    DATABASES["replica"] = {
+        **sqlite_database(SQLITE_REPLICA, SQLITE_PROFILE),
+        # Tests read the test database through the replica alias
+        "TEST": {"MIRROR": "default"},
+    }
+    ADMIN_ENHANCED_READ_REPLICA = "replica"
+
+# Seconds a user's reads stay on the primary after they save something
+ADMIN_ENHANCED_REPLICA_STICKY_SECONDS = int(os.environ.get("DJANGO_REPLICA_STICKY_SECONDS", "15"))
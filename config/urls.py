@@ -48,6 +48,10 @@ urlpatterns = [
     path("login/", CustomAdminLoginView.as_view(), name="login"),
     # 导出功能 URLs - 移除 /admin_enhanced/ 前缀
     path("export/", include("apps.admin_enhanced.urls")),
+    # Celery 监控（后台导出任务列表等）
+    path("celery/", include("apps.celery_monitor.urls")),
+    # 日志归档搜索
+    path("logs/", include("apps.logviewer.urls")),
 ]
 
 # Django admin URLs - 移除 /admin/ 前缀，直接在根路径下